@@ -4,3 +4,6 @@ class AnalyticsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'padhoplus.analytics'
     verbose_name = 'Analytics'
+    
+    def ready(self):
+        from . import signals  # noqa: F401
@@ -0,0 +1,109 @@
+"""
+Materialized leaderboards.
+
+``materialize`` recomputes one leaderboard scope for its current period with
+a single ``INSERT ... SELECT``, so that students are ranked with ``RANK()``
+over their points. The scope's previous rows for the same period are deleted
+in the same transaction, so readers switch from the old standings to the new
+ones at commit. Past weekly and monthly periods are kept.
+
+Points are the marks scored in submitted tests plus activity from
+DailyActivity. Batch boards only count tests of that batch, because
+activity is not tracked per batch. Per-test standings are served live by
+``padhoplus.assessments.leaderboards`` and are not materialized here.
+"""
+
+from datetime import datetime, time, timedelta
+
+from django.db import connection, transaction
+from django.db.models import F, IntegerField, Sum, Value
+from django.utils import timezone
+
+from padhoplus.assessments.models import TestAttempt
+from .models import DailyActivity, Leaderboard
+
+SCOPES = ('overall', 'weekly', 'monthly', 'batch')
+
+# Activity points per question practiced and per lecture completed.
+QUESTION_POINTS = 1
+LECTURE_POINTS = 2
+
+NO_BATCH = Value(None, output_field=IntegerField())
+
+
+def period(leaderboard_type, today=None):
+    """``(period_start, period_end)`` of the scope's current period."""
+    today = today or timezone.localdate()
+    if leaderboard_type == 'weekly':
+        start = today - timedelta(days=today.weekday())
+        return start, start + timedelta(days=6)
+    if leaderboard_type == 'monthly':
+        start = today.replace(day=1)
+        return start, (start + timedelta(days=32)).replace(day=1) - timedelta(days=1)
+    return None, None
+
+
+def _day_start(day):
+    return timezone.make_aware(datetime.combine(day, time.min))
+
+
+def attempt_points(start=None, end=None, by_batch=False):
+    attempts = TestAttempt.objects.filter(status='submitted')
+    if start is not None:
+        attempts = attempts.filter(
+            submitted_at__gte=_day_start(start), submitted_at__lt=_day_start(end + timedelta(days=1))
+        )
+    return attempts.annotate(
+        uid=F('student_id'), bid=F('test__batch_id') if by_batch else NO_BATCH
+    ).values('uid', 'bid').annotate(points=Sum('score')).values_list('uid', 'bid', 'points').order_by()
+
+
+def activity_points(start=None, end=None):
+    activity = DailyActivity.objects.all()
+    if start is not None:
+        activity = activity.filter(date__range=(start, end))
+    return activity.annotate(uid=F('user_id'), bid=NO_BATCH).values('uid', 'bid').annotate(
+        points=Sum(F('questions_practiced') * QUESTION_POINTS + F('lectures_watched') * LECTURE_POINTS)
+    ).values_list('uid', 'bid', 'points').order_by()
+
+
+def materialize(leaderboard_type, today=None):
+    """Replace the scope's rows for its current period; returns the number of rows."""
+    start, end = period(leaderboard_type, today)
+    if leaderboard_type == 'batch':
+        sources = [attempt_points(by_batch=True)]
+    else:
+        sources = [attempt_points(start, end), activity_points(start, end)]
+
+    selects, source_params = [], []
+    for queryset in sources:
+        sql, params = queryset.query.sql_with_params()
+        selects.append(sql)
+        source_params.extend(params)
+
+    columns = (
+        'user_id', 'batch_id', 'leaderboard_type', 'rank', 'score',
+        'period_start', 'period_end', 'created_at', 'updated_at',
+    )
+    sql = (
+        f'INSERT INTO {Leaderboard._meta.db_table} ({", ".join(columns)}) '
+        'SELECT uid, bid, %s, RANK() OVER (PARTITION BY bid ORDER BY SUM(points) DESC), SUM(points), '
+        '%s, %s, %s, %s '
+        f'FROM ({" UNION ALL ".join(selects)}) points '
+        'GROUP BY uid, bid HAVING SUM(points) > 0'
+    )
+    now = timezone.now()
+    date_field = Leaderboard._meta.get_field('period_start')
+    timestamp = Leaderboard._meta.get_field('created_at').get_db_prep_save(now, connection)
+    params = [
+        leaderboard_type,
+        date_field.get_db_prep_save(start, connection),
+        date_field.get_db_prep_save(end, connection),
+        timestamp, timestamp,
+    ] + source_params
+
+    with transaction.atomic():
+        Leaderboard.objects.filter(leaderboard_type=leaderboard_type, period_start=start).delete()
+        with connection.cursor() as cursor:
+            cursor.execute(sql, params)
+            return cursor.rowcount
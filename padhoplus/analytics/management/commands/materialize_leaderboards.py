@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand
+from padhoplus.analytics.leaderboards import SCOPES, materialize
+
+
+class Command(BaseCommand):
+    help = 'Recomputes the materialized overall, weekly, monthly and batch leaderboards for the current period'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--scope', action='append', choices=SCOPES,
+            help='Scope to materialize; repeat for several (default: all)'
+        )
+
+    def handle(self, *args, **options):
+        # Meant to run from cron every few minutes; each scope swaps in one transaction.
+        for scope in options['scope'] or SCOPES:
+            rows = materialize(scope)
+            self.stdout.write(self.style.SUCCESS(f'Materialized {rows} {scope} leaderboard rows'))
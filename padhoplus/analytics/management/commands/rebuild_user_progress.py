@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+from padhoplus.analytics.progress import rebuild_progress
+
+
+class Command(BaseCommand):
+    help = 'Rebuilds every UserProgress row from watch history, test attempts and practice sessions'
+
+    def handle(self, *args, **options):
+        # One INSERT ... SELECT over all event tables; see analytics/progress.py.
+        rows = rebuild_progress()
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt {rows} user progress rows'))
@@ -0,0 +1,36 @@
+# Generated by Django 5.2.8 on 2026-10-18 15:15
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, Max
+
+
+def drop_duplicate_subject_rows(apps, schema_editor):
+    # Keep the most recent subject-level row per (user, batch, subject).
+    UserProgress = apps.get_model('analytics', 'UserProgress')
+    duplicates = UserProgress.objects.filter(topic__isnull=True).values(
+        'user', 'batch', 'subject'
+    ).annotate(keep=Max('pk'), rows=Count('pk')).filter(rows__gt=1).values_list(
+        'user', 'batch', 'subject', 'keep'
+    )
+    for user_id, batch_id, subject_id, keep in duplicates:
+        UserProgress.objects.filter(
+            user_id=user_id, batch_id=batch_id, subject_id=subject_id, topic__isnull=True
+        ).exclude(pk=keep).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('analytics', '0002_initial'),
+        ('batches', '0006_search_vector'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RunPython(drop_duplicate_subject_rows, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='userprogress',
+            constraint=models.UniqueConstraint(condition=models.Q(('topic__isnull', True)), fields=('user', 'batch', 'subject'), name='user_progress_unique_subject_row'),
+        ),
+    ]
@@ -0,0 +1,20 @@
+# Generated by Django 5.2.8 on 2026-10-18 15:32
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('analytics', '0003_user_progress_unique_subject_row'),
+        ('batches', '0006_search_vector'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='leaderboard',
+            index=models.Index(fields=['leaderboard_type', 'batch', 'period_start', 'rank', 'id'], name='leaderboard_page_idx'),
+        ),
+    ]
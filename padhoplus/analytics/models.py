@@ -27,6 +27,15 @@ class UserProgress(models.Model):
     class Meta:
         db_table = 'user_progress'
         unique_together = ['user', 'batch', 'subject', 'topic']
+        constraints = [
+            # NULL topics never collide in unique_together, so subject-level
+            # rows need their own arbiter for upserts.
+            models.UniqueConstraint(
+                fields=['user', 'batch', 'subject'],
+                condition=models.Q(topic__isnull=True),
+                name='user_progress_unique_subject_row',
+            ),
+        ]
         ordering = ['-last_activity_at']
     
     def __str__(self):
@@ -155,6 +164,12 @@ class Leaderboard(models.Model):
     class Meta:
         db_table = 'leaderboards'
         ordering = ['rank']
+        indexes = [
+            models.Index(
+                fields=['leaderboard_type', 'batch', 'period_start', 'rank', 'id'],
+                name='leaderboard_page_idx'
+            ),
+        ]
     
     def __str__(self):
         return f"{self.user.username} - Rank {self.rank} ({self.get_leaderboard_type_display()})"
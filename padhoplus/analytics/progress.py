@@ -0,0 +1,272 @@
+"""
+Incremental writes to DailyActivity and UserProgress.
+
+Callers pass already-aggregated deltas; each call turns them into one
+``INSERT ... ON CONFLICT DO UPDATE`` per table that adds the deltas onto
+existing rows, so producers never read-modify-write these rows.
+
+UserProgress contributions are defined once per event source (watch history,
+test responses, submitted attempts, completed practice sessions) as grouped
+querysets. Events run them filtered to the row that just changed and add the
+result; ``rebuild_progress`` runs them unfiltered and rebuilds the whole table
+with one ``INSERT ... SELECT`` over their ``UNION ALL``.
+"""
+
+from collections import Counter, defaultdict
+
+from django.db import connection, transaction
+from django.db.models import (
+    Count, DecimalField, Exists, ExpressionWrapper, F, IntegerField, OuterRef, Q,
+    Subquery, Sum, Value
+)
+from django.db.models.functions import Coalesce, NullIf
+from django.utils import timezone
+
+from padhoplus.assessments.models import PracticeSession, Question, TestAttempt, TestResponse
+from padhoplus.batches.models import Enrollment, Schedule
+from padhoplus.content.models import WatchHistory
+from padhoplus.upsert import upsert
+from . import snapshots
+from .models import DailyActivity, UserProgress
+
+ACTIVITY_FIELDS = (
+    'time_spent_minutes', 'lectures_watched', 'questions_practiced', 'tests_taken', 'doubts_asked'
+)
+PROGRESS_FIELDS = (
+    'lectures_watched', 'time_spent_minutes', 'questions_attempted', 'questions_correct', 'tests_taken'
+)
+
+# Column layout shared by every contribution queryset, so they can be UNION-ed.
+KEY_COLUMNS = ('uid', 'bid', 'sid', 'tid')
+VALUE_COLUMNS = ('watched', 'minutes', 'attempted', 'correct', 'taken', 'score_sum')
+VALUE_FIELDS = dict(zip(VALUE_COLUMNS, (
+    'lectures_watched', 'time_spent_minutes', 'questions_attempted', 'questions_correct', 'tests_taken',
+)))
+
+ZERO = Value(0, output_field=IntegerField())
+ZERO_SCORE = Value(0, output_field=DecimalField(max_digits=12, decimal_places=4))
+
+
+def _increments(fields):
+    return {field: f'{{table}}.{field} + EXCLUDED.{field}' for field in fields}
+
+
+def record_activity(deltas):
+    """Add ``{(user_id, date): {field: delta}}`` onto DailyActivity rows."""
+    now = timezone.now()
+    rows = [
+        dict(
+            user_id=user_id, date=day, created_at=now, updated_at=now,
+            **{field: values.get(field, 0) for field in ACTIVITY_FIELDS}
+        )
+        for (user_id, day), values in deltas.items()
+        if any(values.values())
+    ]
+    updates = _increments(ACTIVITY_FIELDS)
+    updates['updated_at'] = 'EXCLUDED.updated_at'
+    return upsert(DailyActivity, rows, ['user_id', 'date'], updates)
+
+
+def increment_progress(deltas):
+    """Add ``{(user_id, batch_id, subject_id, topic_id): {field: delta}}`` onto UserProgress rows.
+
+    ``average_test_score`` in a delta is the mean over its ``tests_taken`` and
+    is folded into the stored running average. Rows without a topic are
+    arbitrated by the partial unique constraint on (user, batch, subject)
+    because NULL topics never conflict in the four-column one.
+    """
+    now = timezone.now()
+    with_topic, without_topic = [], []
+    for (user_id, batch_id, subject_id, topic_id), values in deltas.items():
+        if not any(values.values()):
+            continue
+        row = dict(
+            user_id=user_id, batch_id=batch_id, subject_id=subject_id, topic_id=topic_id,
+            total_lectures=0, strength_level=None, last_activity_at=now, created_at=now,
+            average_test_score=values.get('average_test_score', 0),
+            **{field: values.get(field, 0) for field in PROGRESS_FIELDS}
+        )
+        (with_topic if topic_id is not None else without_topic).append(row)
+
+    updates = _increments(PROGRESS_FIELDS)
+    updates['average_test_score'] = (
+        'COALESCE(({table}.average_test_score * {table}.tests_taken'
+        ' + EXCLUDED.average_test_score * EXCLUDED.tests_taken) * 1.0'
+        ' / NULLIF({table}.tests_taken + EXCLUDED.tests_taken, 0), {table}.average_test_score)'
+    )
+    updates['last_activity_at'] = 'EXCLUDED.last_activity_at'
+    snapshots.invalidate(row['user_id'] for row in with_topic + without_topic)
+    return (
+        upsert(UserProgress, with_topic, ['user_id', 'batch_id', 'subject_id', 'topic_id'], updates)
+        + upsert(
+            UserProgress, without_topic, ['user_id', 'batch_id', 'subject_id'], updates,
+            conflict_where='topic_id IS NULL'
+        )
+    )
+
+
+def _contributions(queryset, keys, **values):
+    values = {column: values.get(column, ZERO_SCORE if column == 'score_sum' else ZERO) for column in VALUE_COLUMNS}
+    return queryset.annotate(**keys).values(*KEY_COLUMNS).annotate(**values).values_list(
+        *KEY_COLUMNS, *VALUE_COLUMNS
+    ).order_by()
+
+
+def watch_contributions(history):
+    # Whole minutes per lecture, matching what the heartbeat pipeline adds.
+    return _contributions(
+        history,
+        dict(uid=F('user_id'), bid=F('lecture__batch_id'), sid=F('lecture__subject_id'), tid=F('lecture__topic_id')),
+        watched=Count('pk', filter=Q(is_completed=True)),
+        minutes=Sum(F('watched_duration') / 60),
+    )
+
+
+def response_contributions(responses):
+    answered = Q(selected_answer__isnull=False) & ~Q(selected_answer='')
+    return _contributions(
+        responses,
+        dict(
+            uid=F('attempt__student_id'), bid=F('attempt__test__batch_id'),
+            sid=F('question__subject_id'), tid=F('question__topic_id'),
+        ),
+        attempted=Count('pk', filter=answered),
+        correct=Count('pk', filter=answered & Q(is_correct=True)),
+    )
+
+
+def attempt_contributions(attempts):
+    """Tests count once, on the subject-level row of the test's subject.
+
+    Mixed tests without a subject are attributed to the subject contributing
+    most of their questions; scores are percentages of total_marks, or of the
+    question marks when total_marks was never filled in.
+    """
+    main_subject = Question.objects.filter(tests=OuterRef('test_id')).values('subject_id').annotate(
+        questions=Count('pk')
+    ).order_by('-questions', 'subject_id').values('subject_id')[:1]
+    question_marks = Question.objects.filter(tests=OuterRef('test_id')).order_by().values('tests').annotate(
+        total=Sum('marks')
+    ).values('total')
+    possible = Coalesce(NullIf(F('test__total_marks'), Value(0)), Subquery(question_marks))
+    percentage = ExpressionWrapper(
+        F('score') * Value(100.0) / possible, output_field=DecimalField(max_digits=12, decimal_places=4)
+    )
+    return _contributions(
+        attempts.filter(status='submitted'),
+        dict(
+            uid=F('student_id'), bid=F('test__batch_id'),
+            sid=Coalesce(F('test__subject_id'), Subquery(main_subject), output_field=IntegerField()),
+            tid=Value(None, output_field=IntegerField()),
+        ),
+        taken=Count('pk'),
+        score_sum=Coalesce(Sum(percentage), ZERO_SCORE),
+    ).filter(sid__isnull=False)
+
+
+def practice_contributions(sessions):
+    """Practice sessions carry no batch; use the student's active enrollment
+    whose schedule covers the subject, else their latest active enrollment."""
+    enrollments = Enrollment.objects.filter(
+        student=OuterRef('student_id'), status='active'
+    ).order_by('-enrolled_at').values('batch_id')
+    covering = enrollments.filter(
+        Exists(Schedule.objects.filter(batch=OuterRef('batch_id'), subject=OuterRef(OuterRef('subject_id'))))
+    )
+    batch = Coalesce(Subquery(covering[:1]), Subquery(enrollments[:1]), output_field=IntegerField())
+    return _contributions(
+        sessions.filter(is_completed=True),
+        dict(uid=F('student_id'), bid=batch, sid=F('subject_id'), tid=F('topic_id')),
+        attempted=Sum(F('correct_count') + F('incorrect_count')),
+        correct=Sum('correct_count'),
+    ).filter(bid__isnull=False)
+
+
+def _apply(*querysets):
+    deltas = defaultdict(Counter)
+    for queryset in querysets:
+        for row in queryset:
+            key, values = row[:len(KEY_COLUMNS)], dict(zip(VALUE_COLUMNS, row[len(KEY_COLUMNS):]))
+            delta = deltas[key]
+            for column, field in VALUE_FIELDS.items():
+                delta[field] += values[column] or 0
+            delta['score_sum'] += values['score_sum'] or 0
+    for delta in deltas.values():
+        score_sum = delta.pop('score_sum')
+        if delta['tests_taken']:
+            delta['average_test_score'] = score_sum / delta['tests_taken']
+    return increment_progress(deltas)
+
+
+def attempt_submitted(attempt):
+    attempts_submitted([attempt])
+
+
+def attempts_submitted(attempts):
+    """For attempts submitted together, e.g. finalized after their time ran out."""
+    ids = [attempt.pk for attempt in attempts]
+    today = timezone.localdate()
+    activity = defaultdict(Counter)
+    for attempt in attempts:
+        activity[(attempt.student_id, today)]['tests_taken'] += 1
+    with transaction.atomic():
+        _apply(
+            response_contributions(TestResponse.objects.filter(attempt__in=ids)),
+            attempt_contributions(TestAttempt.objects.filter(pk__in=ids)),
+        )
+        record_activity(activity)
+
+
+def practice_completed(session):
+    with transaction.atomic():
+        _apply(practice_contributions(PracticeSession.objects.filter(pk=session.pk)))
+        record_activity({(session.student_id, timezone.localdate()): {
+            'questions_practiced': session.correct_count + session.incorrect_count,
+        }})
+
+
+def lecture_completed(history):
+    """For completions written outside the heartbeat pipeline."""
+    lecture = history.lecture
+    with transaction.atomic():
+        increment_progress({
+            (history.user_id, lecture.batch_id, lecture.subject_id, lecture.topic_id): {'lectures_watched': 1},
+        })
+        record_activity({(history.user_id, timezone.localdate()): {'lectures_watched': 1}})
+
+
+def rebuild_progress():
+    """Replace every UserProgress row with totals recomputed from the event tables."""
+    sources = [
+        watch_contributions(WatchHistory.objects.all()),
+        response_contributions(TestResponse.objects.filter(attempt__status='submitted')),
+        attempt_contributions(TestAttempt.objects.all()),
+        practice_contributions(PracticeSession.objects.all()),
+    ]
+    selects, params = [], []
+    for queryset in sources:
+        sql, source_params = queryset.query.sql_with_params()
+        selects.append(sql)
+        params.extend(source_params)
+
+    now = timezone.now()
+    columns = (
+        'user_id', 'batch_id', 'subject_id', 'topic_id', 'lectures_watched', 'time_spent_minutes',
+        'questions_attempted', 'questions_correct', 'tests_taken', 'average_test_score',
+        'total_lectures', 'strength_level', 'last_activity_at', 'created_at',
+    )
+    sql = (
+        f'INSERT INTO {UserProgress._meta.db_table} ({", ".join(columns)}) '
+        'SELECT uid, bid, sid, tid, SUM(watched), SUM(minutes), SUM(attempted), SUM(correct), SUM(taken), '
+        'COALESCE(SUM(score_sum) * 1.0 / NULLIF(SUM(taken), 0), 0), 0, NULL, %s, %s '
+        f'FROM ({" UNION ALL ".join(selects)}) events '
+        'GROUP BY uid, bid, sid, tid'
+    )
+    timestamp = UserProgress._meta.get_field('created_at').get_db_prep_save(now, connection)
+    with transaction.atomic():
+        UserProgress.objects.all().delete()
+        with connection.cursor() as cursor:
+            cursor.execute(sql, [timestamp, timestamp] + params)
+            rows = cursor.rowcount
+    snapshots.invalidate_all()
+    return rows
@@ -67,6 +67,18 @@ class UserAchievementSerializer(serializers.ModelSerializer):
         read_only_fields = ['id', 'earned_at']
 
 
+class LeaderboardEntrySerializer(serializers.ModelSerializer):
+    student_name = serializers.CharField(source='user.full_name', read_only=True)
+    
+    class Meta:
+        model = Leaderboard
+        fields = [
+            'id', 'user_id', 'student_name', 'batch', 'leaderboard_type',
+            'rank', 'score', 'period_start', 'period_end', 'updated_at'
+        ]
+        read_only_fields = fields
+
+
 class LeaderboardSerializer(serializers.ModelSerializer):
     user = UserSerializer(read_only=True)
     type_display = serializers.CharField(source='get_leaderboard_type_display', read_only=True)
@@ -0,0 +1,26 @@
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from padhoplus.batches.models import Enrollment
+from padhoplus.users.models import User
+from . import snapshots
+from .models import Streak, UserAchievement
+
+
+@receiver(post_save, sender=User)
+def user_changed(sender, instance, **kwargs):
+    snapshots.invalidate([instance.pk])
+
+
+@receiver(post_save, sender=Enrollment)
+@receiver(post_delete, sender=Enrollment)
+def enrollment_changed(sender, instance, **kwargs):
+    snapshots.invalidate([instance.student_id])
+
+
+@receiver(post_save, sender=Streak)
+@receiver(post_delete, sender=Streak)
+@receiver(post_save, sender=UserAchievement)
+@receiver(post_delete, sender=UserAchievement)
+def dashboard_input_changed(sender, instance, **kwargs):
+    snapshots.invalidate([instance.user_id])
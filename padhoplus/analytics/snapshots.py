@@ -0,0 +1,56 @@
+"""
+Short-lived per-user dashboard snapshots.
+
+The student dashboard payload is cached per user for
+``DASHBOARD_CACHE_TIMEOUT`` seconds. Writers that change its inputs (progress
+upserts, enrollments, streaks, achievements, profile edits) drop the user's
+snapshot; a table-wide rebuild bumps the shared version so every snapshot
+is orphaned at once.
+"""
+
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+VERSION_KEY = 'dashboard:version'
+SNAPSHOT_KEY = 'dashboard:{version}:{user_id}'
+
+
+def _version():
+    version = cache.get(VERSION_KEY)
+    if version is None:
+        cache.add(VERSION_KEY, int(time.time() * 1000), timeout=None)
+        version = cache.get(VERSION_KEY)
+    return version
+
+
+def _keys(user_ids):
+    version = _version()
+    return [SNAPSHOT_KEY.format(version=version, user_id=user_id) for user_id in user_ids]
+
+
+def get_or_build(user_id, build):
+    key, = _keys([user_id])
+    snapshot = cache.get(key)
+    if snapshot is None:
+        snapshot = build()
+        cache.set(key, snapshot, settings.DASHBOARD_CACHE_TIMEOUT)
+    return snapshot
+
+
+def invalidate(user_ids):
+    user_ids = {user_id for user_id in user_ids if user_id is not None}
+    if not user_ids:
+        return
+    # Dropped again on commit in case a reader rebuilt from pre-commit data.
+    cache.delete_many(_keys(user_ids))
+    transaction.on_commit(lambda: cache.delete_many(_keys(user_ids)))
+
+
+def invalidate_all():
+    try:
+        cache.incr(VERSION_KEY)
+    except ValueError:
+        cache.set(VERSION_KEY, int(time.time() * 1000), timeout=None)
@@ -1,16 +1,21 @@
 from rest_framework import viewsets, status, permissions
 from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
+from rest_framework.pagination import CursorPagination
 from rest_framework.response import Response
 from django.utils import timezone
-from django.db.models import Sum, Avg, Count, Q, Min
+from django.utils.dateparse import parse_date
+from django.db.models import Sum, Avg, Count, Q, Min, F
 from datetime import timedelta
+from . import snapshots
 from .models import (
     UserProgress, DailyActivity, Streak,
     Achievement, UserAchievement, Leaderboard
 )
 from .serializers import (
     UserProgressSerializer, DailyActivitySerializer, StreakSerializer,
-    AchievementSerializer, UserAchievementSerializer, LeaderboardSerializer
+    AchievementSerializer, UserAchievementSerializer, LeaderboardSerializer,
+    LeaderboardEntrySerializer
 )
 
 
@@ -29,14 +34,15 @@ class ProgressViewSet(viewsets.ModelViewSet):
     
     def get_queryset(self):
         user = self.request.user
+        queryset = UserProgress.objects.select_related('subject', 'topic__subject')
         if user.is_platform_admin():
-            return UserProgress.objects.all()
+            return queryset
         elif user.is_teacher():
-            return UserProgress.objects.filter(batch__faculty=user)
+            return queryset.filter(batch__faculty=user)
         elif user.is_parent():
             children_ids = user.children.values_list('id', flat=True) if hasattr(user, 'children') else []
-            return UserProgress.objects.filter(user_id__in=children_ids)
-        return UserProgress.objects.filter(user=user)
+            return queryset.filter(user_id__in=children_ids)
+        return queryset.filter(user=user)
     
     @action(detail=False, methods=['get'])
     def summary(self, request):
@@ -48,17 +54,20 @@ class ProgressViewSet(viewsets.ModelViewSet):
         else:
             progress = UserProgress.objects.filter(user=user)
         
-        total_time = progress.aggregate(total=Sum('time_spent_minutes'))['total'] or 0
-        total_lectures = progress.aggregate(total=Sum('lectures_watched'))['total'] or 0
-        total_questions = progress.aggregate(total=Sum('questions_attempted'))['total'] or 0
-        total_correct = progress.aggregate(total=Sum('questions_correct'))['total'] or 0
-        
-        subject_progress = progress.values(
+        # One grouped pass; the overall totals are the sum of the subject rows.
+        subject_progress = list(progress.values(
             'subject__name', 'subject__slug'
         ).annotate(
             total_time=Sum('time_spent_minutes'),
             total_lectures=Sum('lectures_watched'),
-        )
+            total_questions=Sum('questions_attempted'),
+            total_correct=Sum('questions_correct'),
+        ).order_by('subject__name'))
+        
+        total_time = sum(row['total_time'] or 0 for row in subject_progress)
+        total_lectures = sum(row['total_lectures'] or 0 for row in subject_progress)
+        total_questions = sum(row.pop('total_questions') or 0 for row in subject_progress)
+        total_correct = sum(row.pop('total_correct') or 0 for row in subject_progress)
         
         return Response({
             'total_time_minutes': total_time,
@@ -66,7 +75,7 @@ class ProgressViewSet(viewsets.ModelViewSet):
             'total_questions_attempted': total_questions,
             'total_correct': total_correct,
             'overall_accuracy': round((total_correct / total_questions * 100) if total_questions > 0 else 0, 2),
-            'subject_progress': list(subject_progress)
+            'subject_progress': subject_progress
         })
     
     @action(detail=False, methods=['get'])
@@ -188,60 +197,53 @@ class DashboardViewSet(viewsets.ViewSet):
                 status=status.HTTP_401_UNAUTHORIZED
             )
         
-        # Get basic user info
-        name = user.get_full_name() or user.username
-        email = user.email
-        
-        # Get enrollments
+        return Response(snapshots.get_or_build(user.pk, lambda: self.build_student_dashboard(user)))
+    
+    def build_student_dashboard(self, user):
         from padhoplus.batches.models import Enrollment
-        try:
-            enrolled_count = Enrollment.objects.filter(student=user, status='active').count()
-        except:
-            enrolled_count = 0
-        
-        # Get progress statistics
-        progress = UserProgress.objects.filter(user=user)
-        total_watch_time = progress.aggregate(Sum('time_spent_minutes'))['time_spent_minutes__sum'] or 0
-        total_tests = progress.aggregate(Sum('tests_taken'))['tests_taken__sum'] or 0
-        avg_score = progress.aggregate(Avg('average_test_score'))['average_test_score__avg'] or 0
-        
-        # Get streak
-        try:
-            streak_obj, _ = Streak.objects.get_or_create(user=user)
-            current_streak = streak_obj.current_streak
-        except:
-            current_streak = 0
-        
-        # Get achievements
-        achievements_list = []
-        try:
-            achievements = UserAchievement.objects.filter(user=user).select_related('achievement')
-            achievements_list = [
-                {
-                    'id': ua.achievement.id,
-                    'name': ua.achievement.name,
-                    'icon': ua.achievement.icon or '🏆',
-                    'earnedAt': ua.earned_at.strftime('%b %d, %Y')
-                }
-                for ua in achievements
-            ]
-        except:
-            pass
         
-        return Response({
+        enrolled_count = Enrollment.objects.filter(student=user, status='active').count()
+        
+        # Each row's average covers its own tests, so the overall average is
+        # weighted by tests_taken rather than averaged across rows.
+        stats = UserProgress.objects.filter(user=user).aggregate(
+            total_watch_time=Sum('time_spent_minutes'),
+            total_tests=Sum('tests_taken'),
+            weighted_score=Sum(F('average_test_score') * F('tests_taken')),
+        )
+        total_tests = stats['total_tests'] or 0
+        avg_score = (stats['weighted_score'] or 0) / total_tests if total_tests else 0
+        
+        # Read-only: a missing streak row means no streak yet.
+        current_streak = Streak.objects.filter(user=user).values_list(
+            'current_streak', flat=True
+        ).first() or 0
+        
+        achievements = UserAchievement.objects.filter(user=user).select_related('achievement')
+        achievements_list = [
+            {
+                'id': ua.achievement.id,
+                'name': ua.achievement.name,
+                'icon': ua.achievement.icon or '🏆',
+                'earnedAt': ua.earned_at.strftime('%b %d, %Y')
+            }
+            for ua in achievements
+        ]
+        
+        return {
             'success': True,
-            'name': name,
-            'email': email,
+            'name': user.get_full_name() or user.username,
+            'email': user.email,
             'enrolled_batches': enrolled_count,
-            'total_watch_time': int(total_watch_time),
+            'total_watch_time': int(stats['total_watch_time'] or 0),
             'streak': {
                 'current': current_streak,
             },
-            'avg_score': float(avg_score) if avg_score else 0,
+            'avg_score': round(float(avg_score), 2),
             'total_tests': int(total_tests),
             'achievements_earned': achievements_list,
             'continue_watching': [],
-        })
+        }
     
     @action(detail=False, methods=['get'])
     def parent(self, request):
@@ -379,3 +381,48 @@ class DashboardViewSet(viewsets.ViewSet):
             'total_tests': total_tests,
             'pending_doubts': pending_doubts
         })
+
+
+class LeaderboardPagination(CursorPagination):
+    ordering = ('rank', 'id')
+    page_size = 50
+
+
+class LeaderboardViewSet(viewsets.ReadOnlyModelViewSet):
+    """Materialized leaderboards; see analytics/leaderboards.py.
+    
+    ``?type=overall|weekly|monthly|batch`` (``batch`` also needs ``?batch=<id>``).
+    Weekly and monthly boards default to the latest materialized period;
+    ``?period_start=YYYY-MM-DD`` selects an earlier one.
+    """
+    serializer_class = LeaderboardEntrySerializer
+    permission_classes = [permissions.IsAuthenticated]
+    pagination_class = LeaderboardPagination
+    
+    def get_queryset(self):
+        params = self.request.query_params
+        leaderboard_type = params.get('type', 'overall')
+        if leaderboard_type not in ('overall', 'weekly', 'monthly', 'batch'):
+            raise ValidationError({'type': 'Must be one of overall, weekly, monthly or batch.'})
+        
+        queryset = Leaderboard.objects.filter(leaderboard_type=leaderboard_type)
+        if leaderboard_type == 'batch':
+            batch_id = params.get('batch')
+            if not batch_id or not batch_id.isdigit():
+                raise ValidationError({'batch': 'A batch id is required for batch leaderboards.'})
+            queryset = queryset.filter(batch_id=batch_id)
+        else:
+            queryset = queryset.filter(batch__isnull=True)
+        
+        if leaderboard_type in ('weekly', 'monthly'):
+            if params.get('period_start'):
+                period_start = parse_date(params['period_start'])
+                if period_start is None:
+                    raise ValidationError({'period_start': 'Use the YYYY-MM-DD format.'})
+            else:
+                period_start = queryset.order_by('-period_start').values_list(
+                    'period_start', flat=True
+                ).first()
+            queryset = queryset.filter(period_start=period_start)
+        
+        return queryset.select_related('user')
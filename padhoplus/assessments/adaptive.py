@@ -0,0 +1,186 @@
+"""
+Adaptive practice-set selection.
+
+Questions are weighted by how weak the student is in their topic, how well
+their difficulty fits the student's accuracy there, and how long ago the
+student last saw them:
+
+* weakness - ``1 - accuracy``, where accuracy is the Laplace-smoothed share
+  of correct answers in the topic's UserProgress rows, so unseen topics
+  start at 0.5;
+* difficulty fit - 1 when the difficulty (easy/medium/hard = 0/1/2) equals
+  ``2 * accuracy`` and falling linearly from there;
+* staleness - 1 for unseen questions, otherwise ``1 - 0.5 ** (days / half-life)``
+  since the last attempt, with a small floor.
+
+Weakness and fit are the same for every question of a (topic, difficulty)
+bucket, so the candidate pool is cached as one ``array`` of ids per bucket
+(under the sampling pool version, so question edits invalidate it) and each
+student's accuracies as a sorted topic-id array with a parallel float array.
+Selection then costs O(buckets + count): a bucket is drawn by weighted mass
+and a question inside it by rejection on staleness, without scoring every
+question in the pool.
+"""
+
+import bisect
+import random
+from array import array
+from collections import defaultdict
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Sum
+from django.utils import timezone
+
+from padhoplus.analytics.models import UserProgress
+from . import sampling
+from .models import PracticeSession, Question, TestResponse
+
+POOL_KEY = 'adaptive:pool:{version}:{subject_id}:{topic_id}:{difficulty}'
+PROFILE_KEY = 'adaptive:profile:{user_id}:{subject_id}'
+
+LEVELS = {'easy': 0, 'medium': 1, 'hard': 2}
+NO_TOPIC = 0
+
+WEAKNESS_WEIGHT = 0.6
+FIT_WEIGHT = 0.4
+# Keeps strong topics and ill-fitting difficulties from disappearing entirely.
+MIN_BUCKET_SCORE = 0.05
+STALENESS_HALF_LIFE_DAYS = 7
+MIN_STALENESS = 0.02
+# Rejection attempts per pick before taking the stalest remaining question.
+MAX_REJECTIONS = 32
+
+
+def pool(subject_id, topic_id=None, difficulty=None):
+    """``{(topic_id, level): array('q', question_ids)}`` of active questions."""
+    key = POOL_KEY.format(
+        version=sampling.pool_version(), subject_id=subject_id, topic_id=topic_id, difficulty=difficulty
+    )
+    buckets = cache.get(key)
+    if buckets is None:
+        rows = sampling.candidates(subject_id=subject_id, topic_id=topic_id, difficulty=difficulty).order_by(
+        ).values_list('pk', 'topic_id', 'difficulty')
+        buckets = defaultdict(lambda: array('q'))
+        for pk, question_topic, question_difficulty in rows:
+            buckets[(question_topic or NO_TOPIC, LEVELS.get(question_difficulty, 1))].append(pk)
+        buckets = dict(buckets)
+        cache.set(key, buckets, settings.SAMPLING_POOL_CACHE_TIMEOUT)
+    return buckets
+
+
+def profile(user_id, subject_id):
+    """``(array('q', topic_ids), array('f', accuracies))`` sorted by topic id.
+
+    Cached for ``ADAPTIVE_PROFILE_TIMEOUT`` seconds without invalidation:
+    accuracies move slowly, while recency is always read fresh.
+    """
+    key = PROFILE_KEY.format(user_id=user_id, subject_id=subject_id)
+    cached = cache.get(key)
+    if cached is None:
+        rows = UserProgress.objects.filter(user_id=user_id, subject_id=subject_id).values('topic_id').annotate(
+            attempted=Sum('questions_attempted'), correct=Sum('questions_correct')
+        ).order_by()
+        cached = build_profile(
+            (row['topic_id'] or NO_TOPIC, row['attempted'] or 0, row['correct'] or 0) for row in rows
+        )
+        cache.set(key, cached, settings.ADAPTIVE_PROFILE_TIMEOUT)
+    return cached
+
+
+def build_profile(rows):
+    """The arrays ``profile`` caches, from ``(topic_id, attempted, correct)`` rows.
+
+    Sorted here rather than in SQL: the subject-level row maps to ``NO_TOPIC``
+    from a NULL topic, which PostgreSQL sorts last and SQLite first.
+    """
+    topics, accuracies = array('q'), array('f')
+    for topic_id, attempted, correct in sorted(rows):
+        topics.append(topic_id)
+        accuracies.append((correct + 1) / (attempted + 2))
+    return topics, accuracies
+
+
+def accuracy(profile, topic_id):
+    topics, accuracies = profile
+    index = bisect.bisect_left(topics, topic_id)
+    if index < len(topics) and topics[index] == topic_id:
+        return accuracies[index]
+    if topic_id != NO_TOPIC:
+        # Unseen topic: fall back to the subject-level row, else an even prior.
+        return accuracy(profile, NO_TOPIC)
+    return 0.5
+
+
+def bucket_score(topic_accuracy, level):
+    fit = 1 - abs(level - 2 * topic_accuracy) / 2
+    return max(MIN_BUCKET_SCORE, WEAKNESS_WEIGHT * (1 - topic_accuracy) + FIT_WEIGHT * fit)
+
+
+def last_seen(user_id, subject_id):
+    """``{question_id: (last attempt time, bucket)}`` for the student's questions in the subject."""
+    seen = {}
+    answered = TestResponse.objects.filter(
+        attempt__student_id=user_id, question__subject_id=subject_id
+    ).values_list('question_id', 'question__topic_id', 'question__difficulty', 'updated_at')
+    practiced = PracticeSession.questions.through.objects.filter(
+        practicesession__student_id=user_id, question__subject_id=subject_id
+    ).values_list('question_id', 'question__topic_id', 'question__difficulty', 'practicesession__started_at')
+    for question_id, topic_id, difficulty, when in list(answered) + list(practiced):
+        if question_id not in seen or when > seen[question_id][0]:
+            seen[question_id] = (when, (topic_id or NO_TOPIC, LEVELS.get(difficulty, 1)))
+    return seen
+
+
+def staleness(when, now):
+    """In (0, 1]; questions just attempted stay possible, only unlikely."""
+    if when is None:
+        return 1.0
+    days = max((now - when).total_seconds(), 0) / 86400
+    return max(MIN_STALENESS, 1 - 0.5 ** (days / STALENESS_HALF_LIFE_DAYS))
+
+
+def select_ids(user_id, subject_id, count, topic_id=None, difficulty=None):
+    buckets = pool(subject_id, topic_id, difficulty)
+    student = profile(user_id, subject_id)
+    seen = last_seen(user_id, subject_id)
+    now = timezone.now()
+
+    def weight(pk):
+        return staleness(seen[pk][0], now) if pk in seen else 1.0
+
+    keys = list(buckets)
+    scores = {key: bucket_score(accuracy(student, key[0]), key[1]) for key in keys}
+    # A bucket's mass is its score times the summed staleness of its questions.
+    masses = {key: scores[key] * len(buckets[key]) for key in keys}
+    for pk, (_, key) in seen.items():
+        if key in masses:
+            masses[key] -= scores[key] * (1 - weight(pk))
+
+    chosen, taken = [], set()
+    taken_from = defaultdict(int)
+    while len(chosen) < count and keys:
+        key = random.choices(keys, weights=[max(masses[key], 1e-9) for key in keys])[0]
+        ids = buckets[key]
+        pick = None
+        for _ in range(MAX_REJECTIONS):
+            candidate = ids[random.randrange(len(ids))]
+            if candidate not in taken and random.random() < weight(candidate):
+                pick = candidate
+                break
+        if pick is None:
+            pick = max((pk for pk in ids if pk not in taken), key=weight)
+        taken.add(pick)
+        chosen.append(pick)
+        masses[key] -= scores[key] * weight(pick)
+        taken_from[key] += 1
+        if taken_from[key] == len(ids):
+            keys.remove(key)
+    return chosen
+
+
+def select(user, count, subject_id, topic_id=None, difficulty=None):
+    """The selected questions, in selection order, with subject and topic loaded."""
+    ids = select_ids(user.pk, subject_id, count, topic_id=topic_id or None, difficulty=difficulty or None)
+    questions = Question.objects.select_related('subject', 'topic').in_bulk(ids)
+    return [questions[pk] for pk in ids if pk in questions]
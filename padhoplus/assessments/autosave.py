@@ -0,0 +1,117 @@
+"""
+Batched autosave of in-progress test responses.
+
+A client sends the current state of every question it changed since its
+last save, with a ``sequence`` number that grows with each save of the
+attempt. A save costs a fixed number of queries however many answers it
+carries:
+
+* question ids are checked against the test's cached answer key (see
+  grading.py), so no Question rows are loaded;
+* the sequence is claimed with one conditional ``UPDATE`` on the attempt,
+  which also refuses attempts that are no longer in progress. A save whose
+  sequence is not above ``last_sequence`` is a retry or arrived after a
+  newer one, and is acknowledged without writing anything, so clients can
+  debounce and retry freely;
+* all answers are written with one ``INSERT ... ON CONFLICT DO UPDATE``.
+  ``time_spent_seconds`` keeps the larger value, so a late save never
+  winds a question's time back.
+
+Saves without a sequence are never treated as stale, but they take the same
+conditional ``UPDATE`` (without moving ``last_sequence``), so no save is
+written to an attempt that was submitted or abandoned meanwhile.
+"""
+
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from padhoplus.upsert import upsert
+from . import grading
+from .models import TestAttempt, TestResponse
+
+
+class AttemptClosed(Exception):
+    """The attempt was submitted or abandoned before the save arrived."""
+
+
+def claim(attempt, sequence=None):
+    """Advance ``attempt.last_sequence`` to ``sequence``; False for a stale save.
+
+    With no sequence the attempt is only checked (and its row locked until
+    the end of the transaction) as still in progress.
+    """
+    if sequence is None:
+        if TestAttempt.objects.filter(pk=attempt.pk, status='started').update(
+            last_sequence=F('last_sequence')
+        ):
+            return True
+        raise AttemptClosed()
+    claimed = TestAttempt.objects.filter(
+        pk=attempt.pk, status='started', last_sequence__lt=sequence
+    ).update(last_sequence=sequence)
+    if claimed:
+        attempt.last_sequence = sequence
+        return True
+    current = TestAttempt.objects.filter(pk=attempt.pk).values_list('status', 'last_sequence').first()
+    if current is None or current[0] != 'started':
+        raise AttemptClosed()
+    attempt.last_sequence = current[1]
+    return False
+
+
+def row(attempt_id, question_id, selected_answer, time_spent_seconds, is_marked_for_review, now):
+    return {
+        'attempt_id': attempt_id,
+        'question_id': question_id,
+        'selected_answer': selected_answer or None,
+        'is_correct': False,
+        'marks_obtained': 0,
+        'time_spent_seconds': time_spent_seconds,
+        'is_marked_for_review': is_marked_for_review,
+        'created_at': now,
+        'updated_at': now,
+    }
+
+
+def accepted(attempt, deltas):
+    """The deltas on questions of the attempt's test, the last one per question, and the rejected ids."""
+    key = grading.answer_key(attempt.test_id)
+    latest, rejected = {}, set()
+    for delta in deltas:
+        if delta['question_id'] in key:
+            # A question repeated within one save: the last entry wins.
+            latest[delta['question_id']] = delta
+        else:
+            rejected.add(delta['question_id'])
+    return [latest[question_id] for question_id in sorted(latest)], sorted(rejected)
+
+
+def write(rows):
+    """Upsert response rows built by ``row``."""
+    return upsert(TestResponse, rows, ['attempt_id', 'question_id'], {
+        'selected_answer': 'EXCLUDED.selected_answer',
+        'time_spent_seconds': '{greatest}({table}.time_spent_seconds, EXCLUDED.time_spent_seconds)',
+        'is_marked_for_review': 'EXCLUDED.is_marked_for_review',
+        'updated_at': 'EXCLUDED.updated_at',
+    })
+
+
+def save(attempt, deltas, sequence=None):
+    """Store ``deltas`` for ``attempt``; returns the summary sent back to the client."""
+    deltas, rejected = accepted(attempt, deltas)
+    now = timezone.now()
+    rows = [
+        row(attempt.pk, delta['question_id'], delta['selected_answer'],
+            delta['time_spent_seconds'], delta['is_marked_for_review'], now)
+        for delta in deltas
+    ]
+    with transaction.atomic():
+        if not claim(attempt, sequence):
+            return result(0, rejected, attempt.last_sequence, duplicate=True)
+        write(rows)
+    return result(len(rows), rejected, attempt.last_sequence)
+
+
+def result(saved, rejected, last_sequence, duplicate=False):
+    return {'saved': saved, 'rejected': rejected, 'duplicate': duplicate, 'last_sequence': last_sequence}
@@ -0,0 +1,313 @@
+"""
+Write-behind store for the answers of in-progress test attempts.
+
+With ``RESPONSE_BUFFER_ENABLED``, autosaves (see autosave.py) do not touch
+the database. Each save is kept in two places:
+
+* the ``RESPONSE_BUFFER_CACHE_ALIAS`` cache: one entry per (attempt,
+  question) holding ``(sequence, selected_answer, time_spent_seconds,
+  is_marked_for_review)``, and one per attempt holding its highest
+  sequence. A save is one ``get_many`` and one ``set_many``, made while
+  holding a per-attempt lock taken with ``cache.add``. Overlapping saves of
+  an attempt therefore take turns, and a lower sequence can never overwrite
+  a newer draft or lower the attempt's sequence;
+* an append-only journal in ``RESPONSE_JOURNAL_DIR``, one file per process,
+  which survives the cache losing the entries or the process dying before
+  they are flushed.
+
+Drafts reach ``test_responses`` when the attempt is submitted or finalized,
+and every ``RESPONSE_BUFFER_FLUSH_INTERVAL`` seconds for the attempts saved
+through this process. A flush writes every draft of those attempts with one
+upsert and raises their ``last_sequence``, so saves the database already
+has are skipped when a journal is replayed. After each periodic flush the
+process starts a new journal file and removes the flushed ones.
+
+Each process holds an exclusive ``flock`` on its journal files while they
+are in use, so ``recover()`` (the ``recover_responses`` command, run when
+workers start) replays and removes only the files of processes that died.
+
+The cache should be shared between workers and must not evict drafts
+before they are flushed (e.g. Redis with ``maxmemory-policy noeviction``).
+"""
+
+import fcntl
+import json
+import logging
+import os
+import socket
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from glob import glob
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from django.db.models import Case, Value, When
+from django.db.models.functions import Greatest
+from django.utils import timezone
+
+from padhoplus.counters import WriteBehindBuffer
+from . import autosave, grading
+from .models import TestAttempt
+
+logger = logging.getLogger(__name__)
+
+DRAFT_KEY = 'drafts:{attempt_id}:{question_id}'
+SEQUENCE_KEY = 'drafts:{attempt_id}:sequence'
+LOCK_KEY = 'drafts:{attempt_id}:lock'
+
+# Seconds a save may hold its attempt's lock; one left by a dead worker expires.
+LOCK_TIMEOUT = 5
+LOCK_POLL = 0.005
+
+
+def enabled():
+    return settings.RESPONSE_BUFFER_ENABLED
+
+
+def get_cache():
+    return caches[settings.RESPONSE_BUFFER_CACHE_ALIAS]
+
+
+class Journal:
+    """Append-only, per-process log of saves, as JSON lines."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._file = None
+        self._pid = None
+        self._sealed = []
+
+    def _open(self):
+        directory = settings.RESPONSE_JOURNAL_DIR
+        os.makedirs(directory, exist_ok=True)
+        name = f'{socket.gethostname()}-{os.getpid()}-{uuid.uuid4().hex[:8]}.journal'
+        journal = open(os.path.join(directory, name), 'ab', buffering=0)
+        fcntl.flock(journal, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        return journal
+
+    def append(self, record):
+        line = (json.dumps(record, separators=(',', ':')) + '\n').encode()
+        with self._lock:
+            if self._file is None or self._pid != os.getpid():
+                # After a fork the parent's file (and its lock) is not ours.
+                self._file, self._pid, self._sealed = self._open(), os.getpid(), []
+            self._file.write(line)
+            if settings.RESPONSE_JOURNAL_FSYNC:
+                os.fsync(self._file.fileno())
+
+    def seal(self):
+        """Send further appends to a new file; returns every file sealed so far."""
+        with self._lock:
+            if self._file is not None and self._pid == os.getpid():
+                self._sealed.append(self._file)
+                self._file = None
+            return list(self._sealed)
+
+    def discard(self, sealed):
+        """Remove sealed files whose saves have been flushed; still locked until closed."""
+        with self._lock:
+            for journal in sealed:
+                try:
+                    os.unlink(journal.name)
+                except FileNotFoundError:
+                    pass
+                journal.close()
+                self._sealed.remove(journal)
+
+
+journal = Journal()
+
+
+def draft_keys(attempt_id, question_ids):
+    return {DRAFT_KEY.format(attempt_id=attempt_id, question_id=pk): pk for pk in question_ids}
+
+
+def drafts(attempt_id, test_id):
+    """``({question_id: draft}, highest sequence)`` held in the cache for an attempt."""
+    keys = draft_keys(attempt_id, grading.answer_key(test_id))
+    sequence_key = SEQUENCE_KEY.format(attempt_id=attempt_id)
+    found = get_cache().get_many([*keys, sequence_key])
+    sequence = found.pop(sequence_key, 0)
+    return {keys[key]: draft for key, draft in found.items()}, sequence
+
+
+@contextmanager
+def locked(cache, attempt_id):
+    """Hold the attempt's draft lock; raises TimeoutError if it stays taken."""
+    key, token = LOCK_KEY.format(attempt_id=attempt_id), uuid.uuid4().hex
+    deadline = time.monotonic() + LOCK_TIMEOUT
+    while not cache.add(key, token, LOCK_TIMEOUT):
+        if time.monotonic() > deadline:
+            raise TimeoutError(f'Draft lock of attempt {attempt_id} is still held')
+        time.sleep(LOCK_POLL)
+    try:
+        yield
+    finally:
+        if cache.get(key) == token:
+            cache.delete(key)
+
+
+def merge(current, sequence, delta):
+    """Fold a delta saved at ``sequence`` into a question's current draft."""
+    spent = delta['time_spent_seconds']
+    if current is None:
+        return (sequence, delta['selected_answer'] or None, spent, delta['is_marked_for_review'])
+    if sequence < current[0]:
+        return (current[0], current[1], max(current[2], spent), current[3])
+    return (sequence, delta['selected_answer'] or None, max(current[2], spent), delta['is_marked_for_review'])
+
+
+def save(attempt, deltas, sequence=None):
+    """Keep ``deltas`` for ``attempt`` without writing to the database.
+
+    Same arguments and result as ``autosave.save``, which it falls back to
+    when the cache cannot be reached. Saves without a sequence get the next
+    one after the attempt's highest.
+    """
+    deltas, rejected = autosave.accepted(attempt, deltas)
+    by_question = {delta['question_id']: delta for delta in deltas}
+    keys = draft_keys(attempt.pk, by_question)
+    sequence_key = SEQUENCE_KEY.format(attempt_id=attempt.pk)
+    cache = get_cache()
+    try:
+        with locked(cache, attempt.pk):
+            current = cache.get_many([*keys, sequence_key])
+            last_sequence = max(current.get(sequence_key, 0), attempt.last_sequence)
+            if sequence is None:
+                sequence = last_sequence + 1
+            elif sequence <= last_sequence:
+                return autosave.result(0, rejected, last_sequence, duplicate=True)
+
+            updates = {sequence_key: sequence}
+            for key, question_id in keys.items():
+                updates[key] = merge(current.get(key), sequence, by_question[question_id])
+            cache.set_many(updates, settings.RESPONSE_BUFFER_TIMEOUT)
+    except Exception:
+        logger.exception('Draft cache unavailable; saving attempt %s directly', attempt.pk)
+        return autosave.save(attempt, deltas, sequence)
+
+    buffer.add(attempt.pk, None)
+    if settings.RESPONSE_BUFFER_FLUSH_INTERVAL > 0:
+        journal.append({
+            'attempt': attempt.pk,
+            'sequence': sequence,
+            'responses': [
+                [delta['question_id'], delta['selected_answer'] or None,
+                 delta['time_spent_seconds'], delta['is_marked_for_review']]
+                for delta in deltas
+            ],
+        })
+    return autosave.result(len(deltas), rejected, sequence)
+
+
+def persist(answers, sequences):
+    """Write ``{(attempt_id, question_id): draft}`` and raise each attempt's ``last_sequence``."""
+    now = timezone.now()
+    rows = [
+        autosave.row(attempt_id, question_id, answer, spent, review, now)
+        for (attempt_id, question_id), (_, answer, spent, review) in sorted(answers.items())
+    ]
+    with transaction.atomic():
+        autosave.write(rows)
+        if sequences:
+            TestAttempt.objects.filter(pk__in=sequences).update(last_sequence=Greatest(
+                'last_sequence',
+                Case(*[When(pk=pk, then=Value(sequence)) for pk, sequence in sequences.items()])
+            ))
+    return len(rows)
+
+
+class DraftBuffer(WriteBehindBuffer):
+    """Attempt ids saved through this process since the last flush."""
+
+    interval_setting = 'RESPONSE_BUFFER_FLUSH_INTERVAL'
+
+    def _merge(self, pending, key, value):
+        pending[key] = value
+
+    def _write(self, pending):
+        answers, sequences = {}, {}
+        started = TestAttempt.objects.filter(pk__in=pending, status='started').values_list('pk', 'test_id')
+        for attempt_id, test_id in started:
+            found, sequence = drafts(attempt_id, test_id)
+            answers.update({(attempt_id, question_id): draft for question_id, draft in found.items()})
+            if sequence:
+                sequences[attempt_id] = sequence
+        return persist(answers, sequences)
+
+    def write_attempts(self, attempt_ids):
+        """Write the drafts of ``attempt_ids`` now, in one upsert, ahead of the periodic flush."""
+        return self._write(dict.fromkeys(attempt_ids))
+
+    def flush(self):
+        # Saves journaled from here on belong to the next flush.
+        sealed = journal.seal()
+        written = super().flush()
+        journal.discard(sealed)
+        return written
+
+
+buffer = DraftBuffer()
+
+
+def flush_attempts(attempts):
+    """Write the attempts' drafts now; call before grading or closing them."""
+    if enabled():
+        buffer.write_attempts(attempt.pk for attempt in attempts)
+
+
+def flush_attempt(attempt):
+    flush_attempts([attempt])
+
+
+def discard(attempt):
+    """Drop the drafts of a closed attempt."""
+    if enabled():
+        keys = draft_keys(attempt.pk, grading.answer_key(attempt.test_id))
+        get_cache().delete_many([*keys, SEQUENCE_KEY.format(attempt_id=attempt.pk)])
+
+
+def replay(path):
+    """Apply the saves in a journal file that the database does not have yet."""
+    latest = {}
+    with open(path, 'rb') as lines:
+        for line in lines:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                # A line cut short by the crash.
+                continue
+            for question_id, answer, spent, review in record['responses']:
+                key = (record['attempt'], question_id)
+                latest[key] = merge(latest.get(key), record['sequence'], {
+                    'selected_answer': answer, 'time_spent_seconds': spent, 'is_marked_for_review': review
+                })
+
+    stored = dict(TestAttempt.objects.filter(
+        pk__in={attempt_id for attempt_id, _ in latest}, status='started'
+    ).values_list('pk', 'last_sequence'))
+    answers, sequences = {}, {}
+    for (attempt_id, question_id), draft in latest.items():
+        if attempt_id in stored and draft[0] > stored[attempt_id]:
+            answers[(attempt_id, question_id)] = draft
+            sequences[attempt_id] = max(sequences.get(attempt_id, 0), draft[0])
+    return persist(answers, sequences)
+
+
+def recover():
+    """Replay and remove journals left by dead processes; returns ``(files, rows)``."""
+    files = rows = 0
+    for path in sorted(glob(os.path.join(settings.RESPONSE_JOURNAL_DIR, '*.journal'))):
+        with open(path, 'rb') as handle:
+            try:
+                fcntl.flock(handle, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                # Its process is alive and will flush it.
+                continue
+            rows += replay(path)
+            os.unlink(path)
+            files += 1
+    return files, rows
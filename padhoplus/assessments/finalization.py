@@ -0,0 +1,95 @@
+"""
+Finalization of attempts whose time ran out.
+
+An attempt's deadline is ``started_at + duration_minutes`` of its test, or
+the test's ``end_datetime`` when that comes first. Attempts still
+``started`` more than ``ATTEMPT_GRACE_SECONDS`` past their deadline are
+picked up oldest first through the ``(status, started_at)`` index, in
+chunks of locked rows, and closed the way ``submit`` closes them:
+
+* drafts are flushed (see drafts.py) and the chunk is graded with
+  ``grading.grade_attempts``;
+* attempts with at least one answer become ``submitted`` at their deadline
+  and feed the live leaderboard and UserProgress; the rest are marked
+  ``abandoned``. Only a shared leaderboard backend is written to: the
+  ``memory`` one lives in this process, where no web worker reads it, and
+  the workers' own sets reload the attempts from the database.
+
+Each affected test is re-ranked once, after all chunks of a pass.
+"""
+
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import DurationField, ExpressionWrapper, F, Q, Value
+from django.utils import timezone
+
+from padhoplus.analytics import progress
+from . import drafts, grading, leaderboards, ranking
+from .models import TestAttempt, TestResponse
+
+DURATION = ExpressionWrapper(F('test__duration_minutes') * Value(timedelta(minutes=1)), output_field=DurationField())
+
+
+def expired(now=None):
+    """Attempts still open past their deadline and the grace period, oldest first."""
+    cutoff = (now or timezone.now()) - timedelta(seconds=settings.ATTEMPT_GRACE_SECONDS)
+    return TestAttempt.objects.filter(status='started', started_at__lt=cutoff).annotate(
+        ends_at=F('started_at') + DURATION
+    ).filter(Q(ends_at__lt=cutoff) | Q(test__end_datetime__lt=cutoff)).order_by('started_at', 'pk')
+
+
+def deadline(attempt):
+    ends_at = attempt.started_at + timedelta(minutes=attempt.test.duration_minutes)
+    if attempt.test.end_datetime and attempt.test.end_datetime < ends_at:
+        return attempt.test.end_datetime
+    return ends_at
+
+
+def finalize(attempts):
+    """Grade and close ``attempts``; returns the submitted ones."""
+    drafts.flush_attempts(attempts)
+    grading.grade_attempts(attempts)
+    answered = set(TestResponse.objects.filter(
+        attempt__in=[attempt.pk for attempt in attempts], selected_answer__gt=''
+    ).values_list('attempt_id', flat=True).distinct())
+
+    for attempt in attempts:
+        attempt.submitted_at = deadline(attempt)
+        attempt.time_taken_seconds = max(0, int((attempt.submitted_at - attempt.started_at).total_seconds()))
+        attempt.status = 'submitted' if attempt.pk in answered else 'abandoned'
+    TestAttempt.objects.bulk_update(attempts, [
+        'status', 'score', 'correct_count', 'incorrect_count', 'unattempted_count',
+        'time_taken_seconds', 'submitted_at'
+    ])
+    submitted = [attempt for attempt in attempts if attempt.status == 'submitted']
+    if submitted:
+        progress.attempts_submitted(submitted)
+    return submitted
+
+
+def finalize_expired(now=None, chunk_size=500):
+    """One pass over every expired attempt; returns ``(finalized, affected test ids)``."""
+    finalized, tests = 0, set()
+    while True:
+        with transaction.atomic():
+            # Concurrent workers skip each other's chunks instead of waiting.
+            chunk = list(expired(now).select_related('test', 'student').select_for_update(
+                skip_locked=True, of=('self',)
+            )[:chunk_size])
+            if not chunk:
+                break
+            submitted = finalize(chunk)
+        if leaderboards.backend().shared:
+            for attempt in submitted:
+                leaderboards.record(attempt)
+        for attempt in chunk:
+            drafts.discard(attempt)
+        finalized += len(chunk)
+        tests.update(attempt.test_id for attempt in submitted)
+        if len(chunk) < chunk_size:
+            break
+    for test_id in sorted(tests):
+        ranking.rerank(test_id)
+    return finalized, tests
@@ -0,0 +1,169 @@
+"""
+Bulk grading of submitted test attempts.
+
+A test's answer key (question type, normalised correct answer, marks and
+negative marks per question) is built with one query and cached per test;
+signals.py drops it whenever the test's questions change. Grading then runs
+over the attempt's responses in memory with Decimal arithmetic and writes
+them back with a single ``bulk_update``.
+
+Answers are compared per question type:
+
+* ``mcq`` - case-insensitive match of the option.
+* ``msq`` - the set of selected options must equal the correct set, in any
+  order (``"A,C"``, ``"C A"``). Options are single letters separated by
+  commas or whitespace; anything else (``"Option A"``, ``"CA"``) is wrong.
+* ``numerical`` - within ``NUMERICAL_ANSWER_TOLERANCE`` of the key, or inside
+  an inclusive ``low:high`` range when the key is written as one.
+* ``subjective`` - not auto-graded; left unmarked and not counted.
+"""
+
+import re
+from collections import defaultdict
+from decimal import Decimal, InvalidOperation
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils import timezone
+
+from .models import Question, TestResponse
+
+ANSWER_KEY = 'grading:answer-key:{test_id}'
+ZERO = Decimal('0')
+
+
+def _options(answer):
+    tokens = [token for token in re.split(r'[\s,]+', (answer or '').upper()) if token]
+    if not all(re.fullmatch(r'[A-Z]', token) for token in tokens):
+        return None
+    return frozenset(tokens)
+
+
+def _number(answer):
+    try:
+        value = Decimal((answer or '').strip())
+    except InvalidOperation:
+        return None
+    return value if value.is_finite() else None
+
+
+def _numerical_key(answer):
+    low, sep, high = (answer or '').partition(':')
+    if sep:
+        low, high = _number(low), _number(high)
+        if low is not None and high is not None:
+            return (min(low, high), max(low, high))
+        return None
+    value = _number(answer)
+    if value is None:
+        return None
+    tolerance = Decimal(str(settings.NUMERICAL_ANSWER_TOLERANCE))
+    return (value - tolerance, value + tolerance)
+
+
+def normalise(question_type, answer):
+    """Comparable form of ``answer``; None when it cannot be graded."""
+    if question_type == 'msq':
+        return _options(answer) or None
+    if question_type == 'numerical':
+        return _number(answer)
+    if question_type == 'subjective':
+        return None
+    return (answer or '').strip().upper() or None
+
+
+def parse_key(question_type, correct_answer):
+    """Comparable form of a question's ``correct_answer``."""
+    if question_type == 'numerical':
+        return _numerical_key(correct_answer)
+    return normalise(question_type, correct_answer)
+
+
+def build_answer_key(test_id):
+    rows = Question.objects.filter(tests=test_id).values_list(
+        'pk', 'question_type', 'correct_answer', 'marks', 'negative_marks'
+    ).order_by()
+    return {
+        pk: (question_type, parse_key(question_type, correct_answer), marks, negative_marks)
+        for pk, question_type, correct_answer, marks, negative_marks in rows
+    }
+
+
+def answer_key(test_id):
+    """``{question_id: (type, correct, marks, negative_marks)}`` for the test."""
+    cache_key = ANSWER_KEY.format(test_id=test_id)
+    key = cache.get(cache_key)
+    if key is None:
+        key = build_answer_key(test_id)
+        cache.set(cache_key, key, settings.ANSWER_KEY_CACHE_TIMEOUT)
+    return key
+
+
+def invalidate(test_ids):
+    cache.delete_many([ANSWER_KEY.format(test_id=test_id) for test_id in test_ids])
+
+
+def grade(entry, selected_answer):
+    """Return ``(is_correct, marks)``; ``is_correct`` is None when not graded."""
+    question_type, correct, marks, negative_marks = entry
+    if not (selected_answer or '').strip() or correct is None:
+        return None, ZERO
+    answer = normalise(question_type, selected_answer)
+    if answer is None:
+        # Answered, but not something the key could ever match.
+        is_correct = False
+    elif question_type == 'numerical':
+        low, high = correct
+        is_correct = low <= answer <= high
+    else:
+        is_correct = answer == correct
+    return is_correct, (marks if is_correct else -negative_marks)
+
+
+def grade_attempts(attempts):
+    """Grade every response of ``attempts`` and fill in their scores and counts.
+
+    Responses are read with one query and written back with one
+    ``bulk_update``; saving the attempts is left to the caller.
+    """
+    keys = {test_id: answer_key(test_id) for test_id in {attempt.test_id for attempt in attempts}}
+    by_attempt = defaultdict(list)
+    responses = list(TestResponse.objects.filter(attempt__in=[attempt.pk for attempt in attempts]).only(
+        'pk', 'attempt_id', 'question_id', 'selected_answer', 'is_correct', 'marks_obtained'
+    ))
+    for response in responses:
+        by_attempt[response.attempt_id].append(response)
+
+    now = timezone.now()
+    for attempt in attempts:
+        key = keys[attempt.test_id]
+        correct_count = incorrect_count = 0
+        score = ZERO
+        for response in by_attempt[attempt.pk]:
+            entry = key.get(response.question_id)
+            is_correct, marks = grade(entry, response.selected_answer) if entry else (None, ZERO)
+            response.is_correct = bool(is_correct)
+            response.marks_obtained = marks
+            response.updated_at = now
+            if is_correct is None:
+                continue
+            score += marks
+            if is_correct:
+                correct_count += 1
+            else:
+                incorrect_count += 1
+
+        attempt.score = max(ZERO, score)
+        attempt.correct_count = correct_count
+        attempt.incorrect_count = incorrect_count
+        attempt.unattempted_count = len(key) - (correct_count + incorrect_count)
+
+    TestResponse.objects.bulk_update(
+        responses, ['is_correct', 'marks_obtained', 'updated_at'], batch_size=500
+    )
+    return attempts
+
+
+def grade_attempt(attempt):
+    """Grade one attempt; see ``grade_attempts``."""
+    return grade_attempts([attempt])[0]
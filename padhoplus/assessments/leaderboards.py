@@ -0,0 +1,454 @@
+"""
+Live per-test leaderboards.
+
+Each test's submitted attempts are kept in a sorted set ordered by score
+(descending) then time taken (ascending), both folded into one numeric
+sort score so the same structure works in Redis and in process. Submissions
+are added as they happen (O(log n)); top-K pages and a student's rank with
+the attempts around it are read without touching ``test_attempts``.
+
+Ranks follow ``ranking.rerank``: attempts equal on score and time share a
+rank, which is one more than the number of attempts strictly ahead.
+
+A test's set is rebuilt from ``TestAttempt`` the first time it is used, so
+a restarted worker (or a flushed Redis) recovers on demand. The ``memory``
+backend keeps the sets in the current process, where submissions handled by
+other processes never arrive, so it also reloads a set once it is
+``LEADERBOARD_MEMORY_TTL`` seconds old; set ``LEADERBOARD_BACKEND = 'redis'``
+to share the sets between workers and see every submission at once.
+
+In Redis one worker at a time rebuilds a set, holding a ``SET NX`` lock. It
+reads the attempts only once it holds the lock and writes them to a
+``:next`` key that replaces the live set with ``RENAME``. Submissions
+recorded while the lock is held go to both keys, so a rebuild never drops
+them. Readers keep the old set until the swap. The set is reloaded every
+``LEADERBOARD_REDIS_TTL`` seconds, which repairs any drift from the
+database.
+"""
+
+import json
+import random
+import threading
+import time
+import uuid
+
+from django.conf import settings
+
+from .models import TestAttempt
+
+SET_KEY = 'leaderboard:{test_id}'
+
+# Time taken is folded into the low digits of the sort score.
+TIME_SLOTS = 10 ** 6
+
+
+def sort_score(score, time_taken_seconds):
+    time_taken = min(max(int(time_taken_seconds or 0), 0), TIME_SLOTS - 1)
+    return float(int(round(score * 100)) * TIME_SLOTS + (TIME_SLOTS - 1 - time_taken))
+
+
+def entry(attempt, student_name):
+    return {
+        'attempt_id': attempt.pk,
+        'student_id': attempt.student_id,
+        'student_name': student_name,
+        'score': f'{attempt.score:.2f}',
+        'time_taken': attempt.time_taken_seconds,
+        'correct_count': attempt.correct_count,
+    }
+
+
+class _Node:
+    __slots__ = ('score', 'member', 'next', 'span')
+
+    def __init__(self, score, member, level):
+        self.score = score
+        self.member = member
+        self.next = [None] * level
+        self.span = [0] * level
+
+
+class SortedSet:
+    """Indexable skip list in descending score order, as Redis keeps its
+    sorted sets: insert, delete, rank and rank lookups are all O(log n)."""
+
+    MAX_LEVEL = 32
+    P = 0.25
+
+    def __init__(self):
+        self.head = _Node(None, None, self.MAX_LEVEL)
+        self.level = 1
+        self.scores = {}
+        self.details = {}
+
+    def __len__(self):
+        return len(self.scores)
+
+    @staticmethod
+    def _before(node, score, member):
+        # Descending score; equal scores by member so the order is total.
+        return node.score > score or (node.score == score and node.member < member)
+
+    def _random_level(self):
+        level = 1
+        while level < self.MAX_LEVEL and random.random() < self.P:
+            level += 1
+        return level
+
+    def add(self, member, score, details=None):
+        if details is not None:
+            self.details[member] = details
+        if self.scores.get(member) == score:
+            return
+        if member in self.scores:
+            self._delete(member, self.scores[member])
+        self.scores[member] = score
+
+        update = [None] * self.MAX_LEVEL
+        rank = [0] * self.MAX_LEVEL
+        node = self.head
+        for i in reversed(range(self.level)):
+            rank[i] = 0 if i == self.level - 1 else rank[i + 1]
+            while node.next[i] is not None and self._before(node.next[i], score, member):
+                rank[i] += node.span[i]
+                node = node.next[i]
+            update[i] = node
+
+        level = self._random_level()
+        if level > self.level:
+            for i in range(self.level, level):
+                rank[i] = 0
+                update[i] = self.head
+                self.head.span[i] = len(self.scores) - 1
+            self.level = level
+
+        new = _Node(score, member, level)
+        for i in range(level):
+            new.next[i] = update[i].next[i]
+            update[i].next[i] = new
+            new.span[i] = update[i].span[i] - (rank[0] - rank[i])
+            update[i].span[i] = rank[0] - rank[i] + 1
+        for i in range(level, self.level):
+            update[i].span[i] += 1
+
+    def _delete(self, member, score):
+        update = [None] * self.MAX_LEVEL
+        node = self.head
+        for i in reversed(range(self.level)):
+            while node.next[i] is not None and self._before(node.next[i], score, member):
+                node = node.next[i]
+            update[i] = node
+        target = node.next[0]
+        for i in range(self.level):
+            if update[i].next[i] is target:
+                update[i].span[i] += target.span[i] - 1
+                update[i].next[i] = target.next[i]
+            else:
+                update[i].span[i] -= 1
+        while self.level > 1 and self.head.next[self.level - 1] is None:
+            self.level -= 1
+
+    def remove(self, member):
+        score = self.scores.pop(member, None)
+        self.details.pop(member, None)
+        if score is not None:
+            self._delete(member, score)
+
+    def position(self, member):
+        """0-based position of ``member``, or None."""
+        score = self.scores.get(member)
+        if score is None:
+            return None
+        traversed = 0
+        node = self.head
+        for i in reversed(range(self.level)):
+            while node.next[i] is not None and (
+                self._before(node.next[i], score, member) or node.next[i].member == member
+            ):
+                traversed += node.span[i]
+                node = node.next[i]
+            if node.member == member:
+                return traversed - 1
+        return None
+
+    def count_above(self, score):
+        """Number of members with a strictly higher score."""
+        traversed = 0
+        node = self.head
+        for i in reversed(range(self.level)):
+            while node.next[i] is not None and node.next[i].score > score:
+                traversed += node.span[i]
+                node = node.next[i]
+        return traversed
+
+    def range(self, start, stop):
+        """``(member, score, details)`` for positions ``start``..``stop`` inclusive."""
+        stop = min(stop, len(self) - 1)
+        if start > stop:
+            return []
+        traversed = 0
+        node = self.head
+        for i in reversed(range(self.level)):
+            while node.next[i] is not None and traversed + node.span[i] <= start + 1:
+                traversed += node.span[i]
+                node = node.next[i]
+        items = []
+        while node is not None and len(items) <= stop - start:
+            items.append((node.member, node.score, self.details.get(node.member)))
+            node = node.next[0]
+        return items
+
+
+class MemoryBackend:
+    # Writes made by other processes never reach these sets.
+    shared = False
+
+    def __init__(self, ttl=None):
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._sets = {}
+        self._loaded_at = {}
+
+    def loaded(self, key):
+        # A stale set stays readable until the reload replaces it.
+        loaded_at = self._loaded_at.get(key)
+        if loaded_at is None:
+            return False
+        return not self.ttl or time.monotonic() - loaded_at < self.ttl
+
+    def replace(self, key, load):
+        sorted_set = SortedSet()
+        for member, score, details in load():
+            sorted_set.add(member, score, details)
+        with self._lock:
+            self._sets[key] = sorted_set
+            self._loaded_at[key] = time.monotonic()
+
+    def add(self, key, member, score, details):
+        with self._lock:
+            self._sets[key].add(member, score, details)
+
+    def remove(self, key, member):
+        with self._lock:
+            self._sets[key].remove(member)
+
+    def count(self, key):
+        return len(self._sets[key])
+
+    def position(self, key, member):
+        with self._lock:
+            return self._sets[key].position(member)
+
+    def count_above(self, key, score):
+        with self._lock:
+            return self._sets[key].count_above(score)
+
+    def range(self, key, start, stop):
+        with self._lock:
+            return self._sets[key].range(start, stop)
+
+    def clear(self):
+        with self._lock:
+            self._sets.clear()
+            self._loaded_at.clear()
+
+
+class RedisBackend:
+    """The same operations on a Redis sorted set plus a hash of entries."""
+
+    shared = True
+
+    # Longer than any rebuild takes; a crashed rebuilder releases it this late.
+    REBUILD_LOCK_TIMEOUT = 60
+
+    def __init__(self, url, ttl=None):
+        import redis
+
+        self.client = redis.Redis.from_url(url)
+        self.ttl = ttl
+
+    def loaded(self, key):
+        return bool(self.client.exists(f'{key}:loaded'))
+
+    # ZREVRANGE lists equal scores by member as strings, descending; members
+    # are the zero-padded complement of the attempt id so ties come out by
+    # ascending id, as they do in SortedSet.
+    MEMBER_SPACE = 10 ** 15
+
+    def _member(self, attempt_id):
+        return f'{self.MEMBER_SPACE - attempt_id:015d}'
+
+    def _attempt_id(self, member):
+        return self.MEMBER_SPACE - int(member)
+
+    def replace(self, key, load):
+        lock, token = f'{key}:rebuild', uuid.uuid4().hex
+        if not self.client.set(lock, token, nx=True, ex=self.REBUILD_LOCK_TIMEOUT):
+            # Another worker is rebuilding; the current set stays readable.
+            return
+        next_key, next_details = f'{key}:next', f'{key}:next:details'
+        self.client.delete(next_key, next_details)
+        # Read only now, so every attempt committed before the lock was
+        # taken is in ``items`` and every later one is written to :next.
+        items = load()
+        if items:
+            pipe = self.client.pipeline()
+            pipe.zadd(next_key, {self._member(member): score for member, score, _ in items})
+            pipe.hset(next_details, mapping={
+                self._member(member): json.dumps(details) for member, _, details in items
+            })
+            pipe.execute()
+
+        def swap(pipe):
+            if pipe.get(lock) != token.encode():
+                pipe.multi()
+                return
+            has_set, has_details = pipe.exists(next_key), pipe.exists(next_details)
+            pipe.multi()
+            if has_set:
+                pipe.rename(next_key, key)
+            else:
+                pipe.delete(key)
+            if has_details:
+                pipe.rename(next_details, f'{key}:details')
+            else:
+                pipe.delete(f'{key}:details')
+            pipe.set(f'{key}:loaded', 1, px=int(self.ttl * 1000) if self.ttl else None)
+            pipe.delete(lock)
+
+        self.client.transaction(swap, lock, next_key, next_details)
+
+    def _write(self, key, apply):
+        """Run ``apply(pipe, set_key)`` for the live set and, while a rebuild
+        holds the lock, for the set being rebuilt."""
+        lock = f'{key}:rebuild'
+
+        def write(pipe):
+            rebuilding = pipe.exists(lock)
+            pipe.multi()
+            apply(pipe, key)
+            if rebuilding:
+                apply(pipe, f'{key}:next')
+
+        self.client.transaction(write, lock)
+
+    def add(self, key, member, score, details):
+        def apply(pipe, set_key):
+            pipe.zadd(set_key, {self._member(member): score})
+            pipe.hset(f'{set_key}:details', self._member(member), json.dumps(details))
+
+        self._write(key, apply)
+
+    def remove(self, key, member):
+        def apply(pipe, set_key):
+            pipe.zrem(set_key, self._member(member))
+            pipe.hdel(f'{set_key}:details', self._member(member))
+
+        self._write(key, apply)
+
+    def count(self, key):
+        return self.client.zcard(key)
+
+    def position(self, key, member):
+        return self.client.zrevrank(key, self._member(member))
+
+    def count_above(self, key, score):
+        return self.client.zcount(key, f'({score}', '+inf')
+
+    def range(self, key, start, stop):
+        items = self.client.zrevrange(key, start, stop, withscores=True)
+        if not items:
+            return []
+        details = self.client.hmget(f'{key}:details', [member for member, _ in items])
+        return [
+            (self._attempt_id(member), score, json.loads(raw) if raw else None)
+            for (member, score), raw in zip(items, details)
+        ]
+
+    def clear(self):
+        keys = list(self.client.scan_iter(SET_KEY.format(test_id='*')))
+        if keys:
+            self.client.delete(*keys)
+
+
+_backend = None
+_backend_lock = threading.Lock()
+
+
+def backend():
+    global _backend
+    if _backend is None:
+        with _backend_lock:
+            if _backend is None:
+                if settings.LEADERBOARD_BACKEND == 'redis':
+                    _backend = RedisBackend(settings.LEADERBOARD_REDIS_URL, ttl=settings.LEADERBOARD_REDIS_TTL)
+                else:
+                    _backend = MemoryBackend(ttl=settings.LEADERBOARD_MEMORY_TTL)
+    return _backend
+
+
+def rebuild(test_id):
+    """Reload a test's leaderboard from its submitted attempts."""
+    def load():
+        attempts = TestAttempt.objects.filter(test_id=test_id, status='submitted').select_related('student').only(
+            'pk', 'student_id', 'score', 'time_taken_seconds', 'correct_count',
+            'student__first_name', 'student__last_name', 'student__username',
+        )
+        return [
+            (attempt.pk, sort_score(attempt.score, attempt.time_taken_seconds), entry(attempt, attempt.student.full_name))
+            for attempt in attempts
+        ]
+
+    backend().replace(SET_KEY.format(test_id=test_id), load)
+
+
+def _key(test_id):
+    key = SET_KEY.format(test_id=test_id)
+    if not backend().loaded(key):
+        rebuild(test_id)
+    return key
+
+
+def record(attempt):
+    """Add or move a submitted attempt."""
+    key = _key(attempt.test_id)
+    backend().add(
+        key, attempt.pk, sort_score(attempt.score, attempt.time_taken_seconds),
+        entry(attempt, attempt.student.full_name)
+    )
+
+
+def _ranked(key, start, items):
+    """Attach competition ranks to consecutive items starting at ``start``."""
+    ranked = []
+    previous_score = rank = None
+    for offset, (member, score, details) in enumerate(items):
+        if score != previous_score:
+            rank = backend().count_above(key, score) + 1 if offset == 0 else start + offset + 1
+            previous_score = score
+        ranked.append(dict(details, rank=rank))
+    return ranked
+
+
+def top(test_id, limit=50, offset=0):
+    key = _key(test_id)
+    return _ranked(key, offset, backend().range(key, offset, offset + limit - 1))
+
+
+def standing(test_id, attempt_id, neighbours=5):
+    """The attempt's entry and rank with up to ``neighbours`` attempts either side,
+    or None when it is not on the leaderboard."""
+    key = _key(test_id)
+    position = backend().position(key, attempt_id)
+    if position is None:
+        return None
+    neighbours = max(0, neighbours)
+    start = max(0, position - neighbours)
+    around = _ranked(key, start, backend().range(key, start, position + neighbours))
+    me = around[position - start]
+    return {
+        'rank': me['rank'],
+        'total': backend().count(key),
+        'entry': me,
+        'neighbours': around,
+    }
@@ -0,0 +1,41 @@
+import logging
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+from padhoplus.assessments.finalization import finalize_expired
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    help = 'Grades and closes test attempts left open past their deadline'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=500)
+        parser.add_argument(
+            '--loop', action='store_true',
+            help='Keep running as a worker, one pass every --interval seconds'
+        )
+        parser.add_argument('--interval', type=float, default=settings.ATTEMPT_FINALIZE_INTERVAL)
+
+    def run_pass(self, chunk_size):
+        finalized, tests = finalize_expired(chunk_size=chunk_size)
+        if finalized or not self.loop:
+            self.stdout.write(self.style.SUCCESS(
+                f'Finalized {finalized} attempts across {len(tests)} tests'
+            ))
+
+    def handle(self, *args, **options):
+        self.loop = options['loop']
+        if not self.loop:
+            self.run_pass(options['chunk_size'])
+            return
+        while True:
+            close_old_connections()
+            try:
+                self.run_pass(options['chunk_size'])
+            except Exception:
+                logger.exception('Finalization pass failed; retrying after the interval')
+            time.sleep(options['interval'])
@@ -0,0 +1,10 @@
+from django.core.management.base import BaseCommand
+from padhoplus.assessments import drafts
+
+
+class Command(BaseCommand):
+    help = 'Replays autosave journals left behind by dead worker processes into test responses'
+
+    def handle(self, *args, **options):
+        files, rows = drafts.recover()
+        self.stdout.write(self.style.SUCCESS(f'Replayed {files} journals ({rows} responses)'))
@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+from padhoplus.assessments.models import TestAttempt
+from padhoplus.assessments.ranking import rerank
+
+
+class Command(BaseCommand):
+    help = 'Recomputes rank and percentile for submitted attempts of the given tests (default: all tests)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('test_ids', nargs='*', type=int)
+
+    def handle(self, *args, **options):
+        test_ids = options['test_ids'] or TestAttempt.objects.filter(
+            status='submitted'
+        ).values_list('test_id', flat=True).distinct().order_by('test_id')
+        ranked = sum(rerank(test_id) for test_id in test_ids)
+        self.stdout.write(self.style.SUCCESS(f'Ranked {ranked} attempts'))
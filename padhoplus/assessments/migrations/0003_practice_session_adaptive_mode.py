@@ -0,0 +1,18 @@
+# Generated by Django 5.2.8 on 2026-10-18 15:37
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('assessments', '0002_initial'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='practicesession',
+            name='mode',
+            field=models.CharField(choices=[('practice', 'Practice (Untimed)'), ('quiz', 'Quiz (Timed)'), ('adaptive', 'Adaptive')], default='practice', max_length=20),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.8 on 2026-10-18 15:44
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('assessments', '0003_practice_session_adaptive_mode'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='testattempt',
+            name='last_sequence',
+            field=models.BigIntegerField(default=0),
+        ),
+    ]
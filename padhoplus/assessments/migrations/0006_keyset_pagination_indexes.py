@@ -0,0 +1,24 @@
+# Generated by Django 5.2.8 on 2026-10-18 15:59
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('assessments', '0005_test_attempt_status_started_index'),
+        ('batches', '0006_search_vector'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='question',
+            index=models.Index(fields=['is_active', '-created_at', '-id'], name='question_keyset_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='testattempt',
+            index=models.Index(fields=['student', '-started_at', '-id'], name='attempt_keyset_idx'),
+        ),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 5.2.8 on 2026-10-18 16:03
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('assessments', '0006_keyset_pagination_indexes'),
+        ('batches', '0007_hot_path_indexes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='question',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['subject', 'topic', 'difficulty'], name='question_pool_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='testattempt',
+            index=models.Index(fields=['test', 'status', '-score', 'time_taken_seconds'], name='attempt_test_score_idx'),
+        ),
+    ]
@@ -46,6 +46,14 @@ class Question(models.Model):
     class Meta:
         db_table = 'questions'
         ordering = ['subject', 'topic', '-created_at']
+        indexes = [
+            models.Index(fields=['is_active', '-created_at', '-id'], name='question_keyset_idx'),
+            # Sampling pools filter active questions by subject, topic and difficulty.
+            models.Index(
+                fields=['subject', 'topic', 'difficulty'], name='question_pool_idx',
+                condition=models.Q(is_active=True)
+            ),
+        ]
     
     def __str__(self):
         return f"{self.subject.name} - {self.question_text[:50]}"
@@ -105,6 +113,11 @@ class Test(models.Model):
     
     @property
     def question_count(self):
+        # Prefer the count annotated by the list views; count() reuses
+        # prefetched questions when there are any.
+        annotated = getattr(self, 'questions_total', None)
+        if annotated is not None:
+            return annotated
         return self.questions.count()
 
 
@@ -130,6 +143,9 @@ class TestAttempt(models.Model):
     rank = models.IntegerField(blank=True, null=True)
     percentile = models.DecimalField(max_digits=5, decimal_places=2, blank=True, null=True)
     
+    # Highest autosave sequence number applied; see autosave.py.
+    last_sequence = models.BigIntegerField(default=0)
+    
     started_at = models.DateTimeField(auto_now_add=True)
     submitted_at = models.DateTimeField(blank=True, null=True)
     
@@ -137,6 +153,13 @@ class TestAttempt(models.Model):
         db_table = 'test_attempts'
         unique_together = ['test', 'student']
         ordering = ['-started_at']
+        indexes = [
+            # Scanned by finalization.expired() for attempts still open.
+            models.Index(fields=['status', 'started_at'], name='attempt_status_started_idx'),
+            models.Index(fields=['student', '-started_at', '-id'], name='attempt_keyset_idx'),
+            # Ranking and leaderboard order within a test; see ranking.py.
+            models.Index(fields=['test', 'status', '-score', 'time_taken_seconds'], name='attempt_test_score_idx'),
+        ]
     
     def __str__(self):
         return f"{self.student.username} - {self.test.title}"
@@ -168,6 +191,7 @@ class PracticeSession(models.Model):
     MODE_CHOICES = [
         ('practice', 'Practice (Untimed)'),
         ('quiz', 'Quiz (Timed)'),
+        ('adaptive', 'Adaptive'),
     ]
     
     student = models.ForeignKey(User, on_delete=models.CASCADE, related_name='practice_sessions')
@@ -0,0 +1,114 @@
+"""
+Pre-rendered test paper bundles.
+
+A bundle is a test rendered once with ``TestPaperSerializer``, which has the
+same fields as ``TestSerializer`` but public question fields only (no
+answers or solutions). The JSON is stored gzip-compressed in the
+``PAPER_CACHE_ALIAS`` cache, together with its ETag. No Last-Modified is
+sent: question edits and question-list changes don't move the test's
+``updated_at``. Serving a bundle copies the stored bytes: gzip-capable
+clients get them as they are, and other clients get them decompressed.
+
+Bundles are built when a test is saved as scheduled or live (see
+signals.py), so the herd at the start of a test finds them ready. Bundle
+keys embed a per-test version, read before the test is loaded. Edits to the
+test, its question list or any of its questions bump that version (again on
+commit), so a build that overlaps an edit is stored under a version that is
+never read again and the next request builds afresh.
+"""
+
+import gzip
+import hashlib
+import re
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from django.db.models import Prefetch
+from django.http import HttpResponse
+from django.utils.cache import patch_vary_headers
+from rest_framework.renderers import JSONRenderer
+
+from padhoplus import conditional
+from .models import Question, Test
+from .serializers import TestPaperSerializer
+
+BUNDLE_KEY = 'paper:{test_id}:{version}'
+VERSION_KEY = 'paper:version:{test_id}'
+PREBUILT_STATUSES = ('scheduled', 'live')
+
+
+def get_cache():
+    return caches[settings.PAPER_CACHE_ALIAS]
+
+
+def _version(test_id):
+    cache = get_cache()
+    key = VERSION_KEY.format(test_id=test_id)
+    version = cache.get(key)
+    if version is None:
+        # Time based, as in catalog_cache, so an evicted version never
+        # comes back matching a bundle stored before the eviction.
+        cache.add(key, int(time.time() * 1000), timeout=None)
+        version = cache.get(key)
+    return version
+
+
+def _bump(test_id):
+    cache = get_cache()
+    key = VERSION_KEY.format(test_id=test_id)
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, int(time.time() * 1000), timeout=None)
+
+
+def build(test_id, version=None):
+    """Render, compress and store the bundle; returns ``(body, etag)``."""
+    if version is None:
+        version = _version(test_id)
+    test = Test.objects.select_related('batch', 'subject').prefetch_related(
+        Prefetch('questions', queryset=Question.objects.select_related('subject', 'topic').order_by('pk'))
+    ).get(pk=test_id)
+    body = gzip.compress(JSONRenderer().render(TestPaperSerializer(test).data), mtime=0)
+    entry = (body, '"%s"' % hashlib.sha1(body).hexdigest())
+    get_cache().set(BUNDLE_KEY.format(test_id=test_id, version=version), entry, settings.PAPER_CACHE_TIMEOUT)
+    return entry
+
+
+def bundle(test_id):
+    version = _version(test_id)
+    return get_cache().get(BUNDLE_KEY.format(test_id=test_id, version=version)) or build(test_id, version)
+
+
+def invalidate(test_ids):
+    test_ids = list(test_ids)
+    for test_id in test_ids:
+        _bump(test_id)
+
+    def bump_again():
+        # Discards anything built from pre-commit data while the writing
+        # transaction was still open.
+        for test_id in test_ids:
+            _bump(test_id)
+
+    transaction.on_commit(bump_again)
+
+
+def accepts_gzip(request):
+    return bool(re.search(r'\bgzip\b', request.META.get('HTTP_ACCEPT_ENCODING', '')))
+
+
+def serve(request, test_id):
+    body, etag = bundle(test_id)
+    response = conditional.not_modified(request, etag, None)
+    if response is not None:
+        return response
+    if accepts_gzip(request):
+        response = HttpResponse(body, content_type='application/json')
+        response['Content-Encoding'] = 'gzip'
+    else:
+        response = HttpResponse(gzip.decompress(body), content_type='application/json')
+    patch_vary_headers(response, ('Accept-Encoding',))
+    return conditional.apply_validators(response, etag, None, per_user=False)
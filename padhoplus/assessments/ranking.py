@@ -0,0 +1,92 @@
+"""
+Deferred rank and percentile computation for submitted test attempts.
+
+Submissions only mark their test as needing a re-rank. ``buffer`` coalesces
+those marks per test and every ``RANKING_INTERVAL`` seconds recomputes each
+marked test with a single ``UPDATE ... FROM`` over ``RANK()`` window
+functions. Workers coordinate through the cache: a re-rank first takes a
+per-test lock with ``cache.add`` that lasts one interval, and records when
+it started. A worker whose marks all predate the last recorded re-rank drops
+them; one that finds the lock taken keeps its marks for its next flush. So
+a test is re-ranked at most once per interval across all workers, however
+many students submit in it.
+
+Attempts are ordered by score, then by time taken, the same order
+``TestViewSet.leaderboard`` lists them in; attempts equal on both share a
+rank. The percentile is the share of submitted attempts ranked strictly
+below the attempt.
+"""
+
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection
+
+from padhoplus.counters import WriteBehindBuffer
+from .models import TestAttempt
+
+ORDERING = ('-score', 'time_taken_seconds')
+RANK_WINDOW = 'ORDER BY score DESC, time_taken_seconds ASC'
+RERANK_LOCK = 'ranking:lock:{test_id}'
+RERANKED_AT = 'ranking:reranked-at:{test_id}'
+
+
+def rerank(test_id):
+    """Recompute rank and percentile for every submitted attempt of a test."""
+    table = connection.ops.quote_name(TestAttempt._meta.db_table)
+    sql = (
+        f'UPDATE {table} SET rank = ranked.position, percentile = ranked.percentile '
+        'FROM ('
+        f'  SELECT id, RANK() OVER ({RANK_WINDOW}) AS position,'
+        f'    ROUND((COUNT(*) OVER () - RANK() OVER ({RANK_WINDOW})) * 100.0 / COUNT(*) OVER (), 2)'
+        '      AS percentile'
+        f'  FROM {table} WHERE test_id = %s AND status = %s'
+        ') ranked '
+        f'WHERE {table}.id = ranked.id'
+    )
+    with connection.cursor() as cursor:
+        cursor.execute(sql, [test_id, 'submitted'])
+        return cursor.rowcount
+
+
+class RankingBuffer(WriteBehindBuffer):
+    interval_setting = 'RANKING_INTERVAL'
+
+    def _merge(self, pending, key, value):
+        # Keep the latest mark: it is the one a re-rank has to start after.
+        pending[key] = max(pending.get(key, value), value)
+
+    def _write(self, pending):
+        interval = settings.RANKING_INTERVAL
+        if interval <= 0 or self._stopped.is_set():
+            # Written through, or the final flush at exit: nothing to wait for.
+            return sum(rerank(test_id) for test_id in sorted(pending))
+
+        ranked = 0
+        deferred = {}
+        for test_id, marked_at in sorted(pending.items()):
+            reranked_at = cache.get(RERANKED_AT.format(test_id=test_id))
+            if reranked_at is not None and reranked_at >= marked_at:
+                continue
+            if not cache.add(RERANK_LOCK.format(test_id=test_id), True, interval):
+                deferred[test_id] = marked_at
+                continue
+            started_at = time.time()
+            ranked += rerank(test_id)
+            # Outlives the lock so workers retrying after it expires can
+            # still see their marks were covered.
+            cache.set(RERANKED_AT.format(test_id=test_id), started_at, interval * 3)
+        if deferred:
+            with self._lock:
+                for test_id, marked_at in deferred.items():
+                    self._merge(self._pending, test_id, marked_at)
+        return ranked
+
+
+buffer = RankingBuffer()
+
+
+def schedule(test_id):
+    """Mark ``test_id`` for the next re-rank."""
+    buffer.add(test_id, time.time())
@@ -0,0 +1,113 @@
+"""
+Random question sampling without ``ORDER BY random()``.
+
+Each distinct filter (subject, topic, difficulty, type) has a pool of
+candidate question ids cached for ``SAMPLING_POOL_CACHE_TIMEOUT`` seconds, and
+samples are drawn from it in Python. The pools sit under a shared version key
+that signals.py bumps on any question change, so edits show up on the next
+draw. Pools larger than ``SAMPLING_POOL_CACHE_LIMIT`` only cache their size.
+On PostgreSQL they are then sampled with ``TABLESAMPLE SYSTEM``, which reads
+a fraction of the table's pages instead of sorting all of it. Other backends
+load the ids and sample them in Python.
+
+Questions the student has already answered in tests or practice can be
+excluded. They are used to top up the sample when too few fresh ones are
+left.
+"""
+
+import random
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connections
+from django.db.models.expressions import RawSQL
+
+from .models import PracticeSession, Question, TestResponse
+
+VERSION_KEY = 'sampling:version'
+POOL_KEY = 'sampling:pool:{version}:{filters}'
+
+# TABLESAMPLE draws this many times the expected rows, to absorb page clustering.
+OVERSAMPLE = 3
+
+
+def pool_version():
+    version = cache.get(VERSION_KEY)
+    if version is None:
+        cache.add(VERSION_KEY, int(time.time() * 1000), timeout=None)
+        version = cache.get(VERSION_KEY)
+    return version
+
+
+def invalidate():
+    try:
+        cache.incr(VERSION_KEY)
+    except ValueError:
+        cache.set(VERSION_KEY, int(time.time() * 1000), timeout=None)
+
+
+def candidates(**filters):
+    return Question.objects.filter(is_active=True, **{
+        field: value for field, value in filters.items() if value not in (None, '')
+    })
+
+
+def pool(**filters):
+    """``{'ids': [...]}`` for the filter, or ``{'size': n}`` when the pool is too large to cache."""
+    key = POOL_KEY.format(
+        version=pool_version(),
+        filters=':'.join(f'{field}={value}' for field, value in sorted(filters.items())),
+    )
+    cached = cache.get(key)
+    if cached is None:
+        ids = list(candidates(**filters).order_by().values_list('pk', flat=True))
+        cached = {'ids': ids} if len(ids) <= settings.SAMPLING_POOL_CACHE_LIMIT else {'size': len(ids)}
+        cache.set(key, cached, settings.SAMPLING_POOL_CACHE_TIMEOUT)
+    return cached
+
+
+def _table_sample(queryset, count, size):
+    percent = min(100.0, 100.0 * count * OVERSAMPLE / max(size, 1))
+    sample = RawSQL(
+        f'SELECT id FROM {Question._meta.db_table} TABLESAMPLE SYSTEM (%s)', [percent]
+    )
+    return list(queryset.filter(pk__in=sample).order_by().values_list('pk', flat=True))
+
+
+def attempted_ids(student):
+    answered = TestResponse.objects.filter(attempt__student=student).values_list('question_id', flat=True)
+    practiced = PracticeSession.questions.through.objects.filter(
+        practicesession__student=student
+    ).values_list('question_id', flat=True)
+    return set(answered.union(practiced))
+
+
+def sample_ids(count, exclude_attempted_by=None, **filters):
+    """Up to ``count`` distinct random question ids matching ``filters``."""
+    if count <= 0:
+        return []
+    candidate = pool(**filters)
+    if 'ids' in candidate:
+        ids = candidate['ids']
+    elif connections[Question.objects.db].vendor == 'postgresql':
+        ids = _table_sample(candidates(**filters), count, candidate['size'])
+        if len(ids) < count:
+            ids = list(candidates(**filters).order_by().values_list('pk', flat=True))
+    else:
+        ids = list(candidates(**filters).order_by().values_list('pk', flat=True))
+
+    seen = attempted_ids(exclude_attempted_by) if exclude_attempted_by is not None else set()
+    fresh = [pk for pk in ids if pk not in seen]
+    chosen = random.sample(fresh, min(count, len(fresh)))
+    if len(chosen) < count and seen:
+        repeats = [pk for pk in ids if pk in seen]
+        chosen += random.sample(repeats, min(count - len(chosen), len(repeats)))
+    return chosen
+
+
+def sample(count, exclude_attempted_by=None, **filters):
+    """The sampled questions, in sample order, with subject and topic loaded."""
+    ids = sample_ids(count, exclude_attempted_by, **filters)
+    questions = Question.objects.select_related('subject', 'topic').in_bulk(ids)
+    return [questions[pk] for pk in ids if pk in questions]
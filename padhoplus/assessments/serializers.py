@@ -67,6 +67,18 @@ class TestSerializer(serializers.ModelSerializer):
         return test
 
 
+class TestPaperSerializer(TestSerializer):
+    """What students receive: TestSerializer without answers or solutions."""
+    questions = QuestionPublicSerializer(many=True, read_only=True)
+    question_count = serializers.SerializerMethodField()
+    
+    class Meta(TestSerializer.Meta):
+        fields = [field for field in TestSerializer.Meta.fields if field not in ('question_ids', 'subject_id')]
+    
+    def get_question_count(self, obj):
+        return len(obj.questions.all())
+
+
 class TestListSerializer(serializers.ModelSerializer):
     subject_name = serializers.CharField(source='subject.name', read_only=True)
     batch_name = serializers.CharField(source='batch.name', read_only=True)
@@ -98,6 +110,20 @@ class TestResponseSerializer(serializers.ModelSerializer):
         read_only_fields = ['id', 'is_correct', 'marks_obtained', 'created_at']
 
 
+class ResponseDeltaSerializer(serializers.Serializer):
+    question_id = serializers.IntegerField()
+    selected_answer = serializers.CharField(max_length=100, allow_blank=True, allow_null=True, default=None)
+    time_spent_seconds = serializers.IntegerField(min_value=0, default=0)
+    is_marked_for_review = serializers.BooleanField(default=False)
+
+
+class ResponseBatchSerializer(serializers.Serializer):
+    sequence = serializers.IntegerField(min_value=1, required=False)
+    responses = serializers.ListField(
+        child=ResponseDeltaSerializer(), allow_empty=False, max_length=500
+    )
+
+
 class TestAttemptSerializer(serializers.ModelSerializer):
     test = TestListSerializer(read_only=True)
     test_id = serializers.IntegerField(write_only=True)
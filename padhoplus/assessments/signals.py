@@ -0,0 +1,43 @@
+from django.db import transaction
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete
+from django.dispatch import receiver
+
+from . import grading, papers, sampling
+from .models import Question, Test
+
+
+@receiver(post_save, sender=Question)
+@receiver(pre_delete, sender=Question)
+def question_changed(sender, instance, **kwargs):
+    test_ids = list(instance.tests.values_list('pk', flat=True))
+    grading.invalidate(test_ids)
+    papers.invalidate(test_ids)
+
+
+@receiver(post_save, sender=Question)
+@receiver(post_delete, sender=Question)
+def question_pool_changed(sender, **kwargs):
+    sampling.invalidate()
+
+
+@receiver(m2m_changed, sender=Test.questions.through)
+def test_questions_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    if not reverse and action.startswith('post_'):
+        test_ids = [instance.pk]
+    elif reverse and action == 'pre_clear':
+        # question.tests.clear(): collect the tests while they are still linked.
+        test_ids = list(instance.tests.values_list('pk', flat=True))
+    elif reverse and action in ('post_add', 'post_remove'):
+        test_ids = pk_set
+    else:
+        return
+    grading.invalidate(test_ids)
+    papers.invalidate(test_ids)
+
+
+@receiver(post_save, sender=Test)
+def test_saved(sender, instance, **kwargs):
+    papers.invalidate([instance.pk])
+    if instance.status in papers.PREBUILT_STATUSES and instance.is_active:
+        # Built after commit so the bundle sees the saved row and its questions.
+        transaction.on_commit(lambda: papers.build(instance.pk))
@@ -2,12 +2,16 @@ from rest_framework import viewsets, status, permissions
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from django.utils import timezone
-from django.db.models import Q, Avg, Count
+from django.db.models import Q, Avg, Count, Prefetch, prefetch_related_objects
+from padhoplus.analytics import progress
+from padhoplus.pagination import KeysetPagination
+from padhoplus.batches import entitlements
+from . import adaptive, autosave, drafts, grading, leaderboards, papers, ranking, sampling
 from .models import Question, Test, TestAttempt, TestResponse, PracticeSession
 from .serializers import (
     QuestionSerializer, QuestionPublicSerializer, TestSerializer,
     TestListSerializer, TestAttemptSerializer, TestResponseSerializer,
-    PracticeSessionSerializer
+    ResponseBatchSerializer, ResponseDeltaSerializer, PracticeSessionSerializer
 )
 
 
@@ -28,6 +32,7 @@ class IsEnrolledStudent(permissions.BasePermission):
 class QuestionViewSet(viewsets.ModelViewSet):
     queryset = Question.objects.filter(is_active=True)
     permission_classes = [IsTeacherOrAdmin]
+    pagination_class = KeysetPagination
     
     def get_serializer_class(self):
         if self.request.user.is_authenticated and (
@@ -53,7 +58,7 @@ class QuestionViewSet(viewsets.ModelViewSet):
         if question_type:
             queryset = queryset.filter(question_type=question_type)
         
-        return queryset.select_related('subject', 'topic')
+        return queryset.select_related('subject', 'topic__subject')
     
     def perform_create(self, serializer):
         serializer.save(created_by=self.request.user)
@@ -63,17 +68,15 @@ class QuestionViewSet(viewsets.ModelViewSet):
         subject = request.query_params.get('subject')
         topic = request.query_params.get('topic')
         difficulty = request.query_params.get('difficulty')
+        question_type = request.query_params.get('type')
         count = int(request.query_params.get('count', 10))
+        exclude_attempted = request.query_params.get('exclude_attempted') in ('1', 'true')
         
-        queryset = self.get_queryset()
-        if subject:
-            queryset = queryset.filter(subject__slug=subject)
-        if topic:
-            queryset = queryset.filter(topic__slug=topic)
-        if difficulty:
-            queryset = queryset.filter(difficulty=difficulty)
-        
-        questions = queryset.order_by('?')[:count]
+        questions = sampling.sample(
+            count,
+            exclude_attempted_by=request.user if exclude_attempted else None,
+            subject__slug=subject, topic__slug=topic, difficulty=difficulty, question_type=question_type
+        )
         serializer = QuestionPublicSerializer(questions, many=True)
         return Response(serializer.data)
 
@@ -93,11 +96,7 @@ class TestViewSet(viewsets.ModelViewSet):
         
         if user.is_authenticated:
             if user.is_student():
-                from padhoplus.batches.models import Enrollment
-                enrolled_batches = Enrollment.objects.filter(
-                    student=user, status='active'
-                ).values_list('batch_id', flat=True)
-                queryset = queryset.filter(batch_id__in=enrolled_batches)
+                queryset = queryset.filter(batch_id__in=entitlements.active_batch_ids(self.request))
             elif user.is_teacher():
                 queryset = queryset.filter(Q(created_by=user) | Q(batch__faculty=user))
         
@@ -115,11 +114,27 @@ class TestViewSet(viewsets.ModelViewSet):
         if status_param:
             queryset = queryset.filter(status=status_param)
         
-        return queryset.select_related('batch', 'subject')
+        queryset = queryset.select_related('batch', 'subject')
+        if self.action == 'list':
+            return queryset.annotate(questions_total=Count('questions'))
+        if self.action == 'retrieve' and user.is_authenticated and (user.is_teacher() or user.is_platform_admin()):
+            # Only staff are served the test itself; everyone else gets the paper.
+            return queryset.prefetch_related(
+                Prefetch('questions', queryset=Question.objects.select_related('subject', 'topic__subject'))
+            )
+        return queryset
     
     def perform_create(self, serializer):
         serializer.save(created_by=self.request.user)
     
+    def retrieve(self, request, *args, **kwargs):
+        user = request.user
+        if user.is_authenticated and (user.is_teacher() or user.is_platform_admin()):
+            return super().retrieve(request, *args, **kwargs)
+        # Everyone else gets the pre-rendered paper, which carries no answers.
+        test = self.get_object()
+        return papers.serve(request, test.pk)
+    
     @action(detail=False, methods=['get'], permission_classes=[permissions.IsAuthenticated])
     def upcoming(self, request):
         now = timezone.now()
@@ -132,13 +147,9 @@ class TestViewSet(viewsets.ModelViewSet):
         )
         
         if user.is_student():
-            from padhoplus.batches.models import Enrollment
-            enrolled_batches = Enrollment.objects.filter(
-                student=user, status='active'
-            ).values_list('batch_id', flat=True)
-            queryset = queryset.filter(batch_id__in=enrolled_batches)
+            queryset = queryset.filter(batch_id__in=entitlements.active_batch_ids(request))
         
-        tests = queryset.select_related('batch', 'subject')[:10]
+        tests = queryset.select_related('batch', 'subject').annotate(questions_total=Count('questions'))[:10]
         serializer = TestListSerializer(tests, many=True)
         return Response(serializer.data)
     
@@ -148,10 +159,7 @@ class TestViewSet(viewsets.ModelViewSet):
         user = request.user
         
         if user.is_student():
-            from padhoplus.batches.models import Enrollment
-            if not Enrollment.objects.filter(
-                student=user, batch=test.batch, status='active'
-            ).exists():
+            if not entitlements.is_enrolled(request, test.batch_id):
                 return Response(
                     {'error': 'You must be enrolled in this batch to take this test'},
                     status=status.HTTP_403_FORBIDDEN
@@ -179,40 +187,80 @@ class TestViewSet(viewsets.ModelViewSet):
     @action(detail=True, methods=['get'])
     def leaderboard(self, request, pk=None):
         test = self.get_object()
-        attempts = TestAttempt.objects.filter(
-            test=test,
-            status='submitted'
-        ).order_by('-score', 'time_taken_seconds')[:50]
-        
-        leaderboard = []
-        for i, attempt in enumerate(attempts, 1):
-            leaderboard.append({
-                'rank': i,
-                'student_name': attempt.student.full_name,
-                'score': attempt.score,
-                'time_taken': attempt.time_taken_seconds,
-                'correct_count': attempt.correct_count
-            })
+        leaderboard = [
+            {
+                'rank': entry['rank'],
+                'student_name': entry['student_name'],
+                'score': entry['score'],
+                'time_taken': entry['time_taken'],
+                'correct_count': entry['correct_count']
+            }
+            for entry in leaderboards.top(test.pk, limit=50)
+        ]
         
         return Response(leaderboard)
+    
+    @action(detail=True, methods=['get'], permission_classes=[permissions.IsAuthenticated])
+    def my_rank(self, request, pk=None):
+        try:
+            neighbours = int(request.query_params.get('neighbours', 5))
+        except ValueError:
+            return Response(
+                {'error': 'neighbours must be an integer'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        test = self.get_object()
+        attempt_id = TestAttempt.objects.filter(
+            test=test, student=request.user, status='submitted'
+        ).values_list('pk', flat=True).first()
+        standing = attempt_id and leaderboards.standing(
+            test.pk, attempt_id, neighbours=min(max(neighbours, 0), 25)
+        )
+        if not standing:
+            return Response(
+                {'error': 'You have not submitted this test'},
+                status=status.HTTP_404_NOT_FOUND
+            )
+        return Response(standing)
+
+
+def attempt_details():
+    """Prefetches for everything TestAttemptSerializer renders."""
+    return [
+        Prefetch('test', queryset=Test.objects.select_related('batch', 'subject').annotate(
+            questions_total=Count('questions')
+        )),
+        Prefetch('responses', queryset=TestResponse.objects.select_related('question__subject', 'question__topic')),
+    ]
+
+
+class TestAttemptPagination(KeysetPagination):
+    ordering = ('-started_at', '-id')
 
 
 class TestAttemptViewSet(viewsets.ModelViewSet):
     serializer_class = TestAttemptSerializer
     permission_classes = [permissions.IsAuthenticated]
+    pagination_class = TestAttemptPagination
     
     def get_queryset(self):
         user = self.request.user
         if user.is_platform_admin():
-            return TestAttempt.objects.all()
+            queryset = TestAttempt.objects.all()
         elif user.is_teacher():
-            return TestAttempt.objects.filter(
+            queryset = TestAttempt.objects.filter(
                 Q(test__created_by=user) | Q(test__batch__faculty=user)
             )
         elif user.is_parent():
             children_ids = user.children.values_list('id', flat=True) if hasattr(user, 'children') else []
-            return TestAttempt.objects.filter(student_id__in=children_ids)
-        return TestAttempt.objects.filter(student=user)
+            queryset = TestAttempt.objects.filter(student_id__in=children_ids)
+        else:
+            queryset = TestAttempt.objects.filter(student=user)
+        # Writes serialize the attempt after changing its responses, so only
+        # reads may take them from a prefetch.
+        if self.request.method not in permissions.SAFE_METHODS:
+            return queryset
+        return queryset.prefetch_related(*attempt_details())
     
     @action(detail=True, methods=['post'])
     def submit_response(self, request, pk=None):
@@ -230,30 +278,72 @@ class TestAttemptViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_400_BAD_REQUEST
             )
         
-        question_id = request.data.get('question_id')
-        selected_answer = request.data.get('selected_answer')
-        time_spent = request.data.get('time_spent_seconds', 0)
+        serializer = ResponseDeltaSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        delta = serializer.validated_data
         
         try:
-            question = Question.objects.get(id=question_id)
+            question = Question.objects.get(id=delta['question_id'])
         except Question.DoesNotExist:
             return Response(
                 {'error': 'Question not found'},
                 status=status.HTTP_404_NOT_FOUND
             )
         
-        response, created = TestResponse.objects.update_or_create(
-            attempt=attempt,
-            question=question,
-            defaults={
-                'selected_answer': selected_answer,
-                'time_spent_seconds': time_spent
-            }
-        )
+        if drafts.enabled():
+            # Buffered drafts win over the table, so go through them and write this one now.
+            saved = drafts.save(attempt, [delta])
+            if saved['rejected']:
+                return Response(
+                    {'error': 'Question not found'},
+                    status=status.HTTP_404_NOT_FOUND
+                )
+            drafts.flush_attempt(attempt)
+            response = TestResponse.objects.get(attempt=attempt, question=question)
+        else:
+            response, created = TestResponse.objects.update_or_create(
+                attempt=attempt,
+                question=question,
+                defaults={
+                    'selected_answer': delta['selected_answer'],
+                    'time_spent_seconds': delta['time_spent_seconds']
+                }
+            )
         
         serializer = TestResponseSerializer(response)
         return Response(serializer.data)
     
+    @action(detail=True, methods=['post'])
+    def save_responses(self, request, pk=None):
+        attempt = self.get_object()
+        
+        if attempt.student_id != request.user.pk:
+            return Response(
+                {'error': 'You can only submit responses for your own attempts'},
+                status=status.HTTP_403_FORBIDDEN
+            )
+        
+        serializer = ResponseBatchSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        
+        if attempt.status != 'started':
+            return Response(
+                {'error': 'Test already submitted'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        save = drafts.save if drafts.enabled() else autosave.save
+        try:
+            result = save(
+                attempt, serializer.validated_data['responses'],
+                sequence=serializer.validated_data.get('sequence')
+            )
+        except autosave.AttemptClosed:
+            return Response(
+                {'error': 'Test already submitted'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        return Response(result)
+    
     @action(detail=True, methods=['post'])
     def submit(self, request, pk=None):
         attempt = self.get_object()
@@ -270,46 +360,21 @@ class TestAttemptViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_400_BAD_REQUEST
             )
         
-        correct_count = 0
-        incorrect_count = 0
-        total_score = 0
-        
-        for response in attempt.responses.all():
-            question = response.question
-            if response.selected_answer:
-                if response.selected_answer.upper() == question.correct_answer.upper():
-                    response.is_correct = True
-                    response.marks_obtained = question.marks
-                    correct_count += 1
-                    total_score += float(question.marks)
-                else:
-                    response.is_correct = False
-                    response.marks_obtained = -float(question.negative_marks)
-                    incorrect_count += 1
-                    total_score -= float(question.negative_marks)
-                response.save()
-        
-        unattempted = attempt.test.questions.count() - (correct_count + incorrect_count)
+        drafts.flush_attempt(attempt)
+        grading.grade_attempt(attempt)
         
         attempt.status = 'submitted'
-        attempt.score = max(0, total_score)
-        attempt.correct_count = correct_count
-        attempt.incorrect_count = incorrect_count
-        attempt.unattempted_count = unattempted
         attempt.submitted_at = timezone.now()
         attempt.time_taken_seconds = request.data.get('time_taken_seconds', 0)
         attempt.save()
+        drafts.discard(attempt)
         
-        all_attempts = TestAttempt.objects.filter(
-            test=attempt.test,
-            status='submitted'
-        ).order_by('-score')
+        leaderboards.record(attempt)
+        ranking.schedule(attempt.test_id)
         
-        for i, att in enumerate(all_attempts, 1):
-            att.rank = i
-            att.percentile = round((1 - (i / all_attempts.count())) * 100, 2)
-            att.save()
+        progress.attempt_submitted(attempt)
         
+        prefetch_related_objects([attempt], *attempt_details())
         serializer = self.get_serializer(attempt)
         return Response(serializer.data)
     
@@ -371,14 +436,17 @@ class PracticeSessionViewSet(viewsets.ModelViewSet):
         mode = request.data.get('mode', 'practice')
         difficulty = request.data.get('difficulty')
         count = int(request.data.get('count', 10))
-        
-        queryset = Question.objects.filter(subject_id=subject_id, is_active=True)
-        if topic_id:
-            queryset = queryset.filter(topic_id=topic_id)
-        if difficulty:
-            queryset = queryset.filter(difficulty=difficulty)
-        
-        questions = queryset.order_by('?')[:count]
+        exclude_attempted = request.data.get('exclude_attempted') in (True, 'true', '1')
+        
+        # Sampled once: the session and the response must hold the same questions.
+        if mode == 'adaptive':
+            questions = adaptive.select(request.user, count, subject_id, topic_id=topic_id, difficulty=difficulty)
+        else:
+            questions = sampling.sample(
+                count,
+                exclude_attempted_by=request.user if exclude_attempted else None,
+                subject_id=subject_id, topic_id=topic_id, difficulty=difficulty
+            )
         
         session = PracticeSession.objects.create(
             student=request.user,
@@ -386,7 +454,7 @@ class PracticeSessionViewSet(viewsets.ModelViewSet):
             topic_id=topic_id,
             mode=mode,
             difficulty=difficulty,
-            total_questions=questions.count()
+            total_questions=len(questions)
         )
         session.questions.set(questions)
         
@@ -408,6 +476,7 @@ class PracticeSessionViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_403_FORBIDDEN
             )
         
+        was_completed = session.is_completed
         session.correct_count = request.data.get('correct_count', 0)
         session.incorrect_count = request.data.get('incorrect_count', 0)
         session.time_taken_seconds = request.data.get('time_taken_seconds', 0)
@@ -415,5 +484,8 @@ class PracticeSessionViewSet(viewsets.ModelViewSet):
         session.completed_at = timezone.now()
         session.save()
         
+        if not was_completed:
+            progress.practice_completed(session)
+        
         serializer = self.get_serializer(session)
         return Response(serializer.data)
@@ -4,3 +4,6 @@ class BatchesConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'padhoplus.batches'
     verbose_name = 'Batches'
+    
+    def ready(self):
+        from . import signals  # noqa: F401
@@ -0,0 +1,179 @@
+"""
+Read-through cache for the public batch catalog.
+
+Rendered JSON bytes are stored under keys that embed a catalog-wide version
+and, for detail pages, a per-slug version. Signal handlers in signals.py bump
+those versions when batch data changes, so stale entries are never read again
+and simply age out of the backend. Each entry also carries the ETag computed
+when it was built, so revalidations that hit the cache are answered without touching the database.
+
+Every payload here carries ``enrolled_count``, which enrollments move with
+``.update()`` and so without touching ``updated_at``. Validators therefore
+include an enrollment version bumped by ``enrollments_changed()``, and no
+Last-Modified is sent: a client revalidating by date alone would be told
+stale counts are current.
+"""
+
+import hashlib
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from django.http import HttpResponse
+from django.utils.http import urlencode
+from rest_framework.renderers import JSONRenderer
+
+from padhoplus import conditional
+
+CATALOG_VERSION_KEY = 'catalog:version'
+BATCH_VERSION_KEY = 'catalog:version:batch:{slug}'
+ENROLLMENT_VERSION_KEY = 'catalog:version:enrollments'
+
+
+class CacheStats:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def record(self, hit):
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    def snapshot(self):
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_ratio': round(self.hits / total, 4) if total else 0,
+            }
+
+
+stats = CacheStats()
+
+
+def get_cache():
+    return caches[settings.CATALOG_CACHE_ALIAS]
+
+
+def _fresh_version():
+    # Time based so a version key evicted from the backend never comes back
+    # with a value that matches entries written before the eviction.
+    return int(time.time() * 1000)
+
+
+def _versions(*keys):
+    cache = get_cache()
+    found = cache.get_many(keys)
+    versions = []
+    for key in keys:
+        version = found.get(key)
+        if version is None:
+            cache.add(key, _fresh_version(), timeout=None)
+            version = cache.get(key)
+        versions.append(version)
+    return versions
+
+
+def _bump(key):
+    cache = get_cache()
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, _fresh_version(), timeout=None)
+
+
+def _bump_now_and_on_commit(key):
+    # The second bump discards anything rebuilt from pre-commit data while
+    # the writing transaction was still open.
+    _bump(key)
+    transaction.on_commit(lambda: _bump(key))
+
+
+def invalidate_catalog():
+    _bump_now_and_on_commit(CATALOG_VERSION_KEY)
+
+
+def invalidate_batch(slug):
+    if slug:
+        _bump_now_and_on_commit(BATCH_VERSION_KEY.format(slug=slug))
+
+
+def enrollments_changed():
+    # Only the validators use this version; cached bodies keep their counts
+    # until CATALOG_CACHE_TIMEOUT and are rebuilt with a new ETag after that.
+    _bump_now_and_on_commit(ENROLLMENT_VERSION_KEY)
+
+
+def _request_digest(request):
+    params = sorted(
+        (key, value)
+        for key in request.query_params
+        for value in request.query_params.getlist(key)
+        if value != ''
+    )
+    raw = f'{request.get_host()}|{request.path}|{urlencode(params)}'
+    return hashlib.md5(raw.encode()).hexdigest()
+
+
+def list_key(request, name):
+    catalog_version, = _versions(CATALOG_VERSION_KEY)
+    return f'catalog:{name}:{catalog_version}:{_request_digest(request)}'
+
+
+def detail_key(request, slug):
+    catalog_version, batch_version = _versions(
+        CATALOG_VERSION_KEY, BATCH_VERSION_KEY.format(slug=slug)
+    )
+    return f'catalog:detail:{slug}:{catalog_version}.{batch_version}:{_request_digest(request)}'
+
+
+def cached_response(request, key_func, build, state_func=None):
+    """Serve the rendered JSON stored for this request, or build and store it.
+
+    ``state_func`` returns the ``(row_count, latest_timestamp)`` states used
+    for the ETag, along with the enrollment version; the cache key is mixed
+    in so version bumps from signals also invalidate client copies. Requests
+    negotiated to another renderer (e.g. the browsable API) bypass the cache.
+    """
+    renderer = getattr(request, 'accepted_renderer', None)
+    if renderer is None or renderer.format != 'json':
+        return build()
+
+    cache = get_cache()
+    key = key_func()
+    entry = cache.get(key)
+    if entry is not None:
+        stats.record(hit=True)
+        body, etag = entry
+        if etag is not None:
+            response = conditional.not_modified(request, etag, None)
+            if response is not None:
+                return response
+    else:
+        stats.record(hit=False)
+        etag = None
+        if state_func is not None:
+            enrollment_version, = _versions(ENROLLMENT_VERSION_KEY)
+            etag, _ = conditional.build_validators(
+                request, [*state_func(), (enrollment_version, None)], per_user=False, extra=key
+            )
+            response = conditional.not_modified(request, etag, None)
+            if response is not None:
+                return response
+        response = build()
+        if response.status_code != 200:
+            return response
+        body = JSONRenderer().render(response.data)
+        cache.set(key, (body, etag), settings.CATALOG_CACHE_TIMEOUT)
+
+    response = HttpResponse(body, content_type='application/json')
+    if etag is not None:
+        conditional.apply_validators(response, etag, None, per_user=False)
+    return response
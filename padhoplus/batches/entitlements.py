@@ -0,0 +1,57 @@
+"""
+Which batches a student is entitled to, resolved once per request.
+
+``active_batch_ids(request)`` loads the ids of the user's active
+enrollments with one query and keeps them on the request, so every
+permission check and queryset filter of that request reuses them. Across
+requests they are shared through the cache for ``ENTITLEMENT_CACHE_TIMEOUT``
+seconds (0 turns the shared copy off); signals.py drops a user's entry when
+one of their enrollments is saved or deleted. Bulk ``update()`` calls on
+enrollments bypass those signals and are only picked up after the timeout.
+"""
+
+from django.conf import settings
+from django.core.cache import cache
+
+from .models import Enrollment
+
+ENTITLEMENT_KEY = 'entitlements:{user_id}'
+
+
+def load(user_id):
+    return frozenset(
+        Enrollment.objects.filter(student_id=user_id, status='active').values_list('batch_id', flat=True)
+    )
+
+
+def _for_user(user_id):
+    timeout = settings.ENTITLEMENT_CACHE_TIMEOUT
+    if timeout <= 0:
+        return load(user_id)
+    key = ENTITLEMENT_KEY.format(user_id=user_id)
+    batch_ids = cache.get(key)
+    if batch_ids is None:
+        batch_ids = load(user_id)
+        cache.set(key, batch_ids, timeout)
+    return batch_ids
+
+
+def active_batch_ids(request):
+    """Ids of the batches ``request.user`` is actively enrolled in."""
+    if not request.user.is_authenticated:
+        return frozenset()
+    # Memoized on the HttpRequest, which a DRF Request wraps and shares.
+    http_request = getattr(request, '_request', request)
+    batch_ids = getattr(http_request, '_active_batch_ids', None)
+    if batch_ids is None:
+        batch_ids = _for_user(request.user.pk)
+        http_request._active_batch_ids = batch_ids
+    return batch_ids
+
+
+def is_enrolled(request, batch_id):
+    return batch_id is not None and batch_id in active_batch_ids(request)
+
+
+def invalidate(user_ids):
+    cache.delete_many([ENTITLEMENT_KEY.format(user_id=user_id) for user_id in user_ids])
@@ -0,0 +1,88 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from padhoplus import loadtest
+
+DEFAULT_MIX = 'catalog=4,heartbeats=3,mock_test=1,doubts=2'
+# Options that must be at least 1.
+COUNTS = ('iterations', 'concurrency', 'students', 'heartbeats', 'autosaves')
+
+
+def parse_mix(value):
+    try:
+        mix = {name.strip(): float(weight) for name, weight in (part.split('=') for part in value.split(','))}
+    except ValueError:
+        raise CommandError(f'--mix must look like {DEFAULT_MIX}')
+    if any(weight < 0 for weight in mix.values()):
+        raise CommandError('--mix weights cannot be negative')
+    if not any(mix.values()):
+        raise CommandError('--mix needs at least one scenario with a positive weight')
+    return mix
+
+
+class Command(BaseCommand):
+    help = 'Replays realistic request mixes against the in-process WSGI app and reports latency per endpoint'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--mix', default=DEFAULT_MIX,
+            help=f'Scenario weights, from {", ".join(loadtest.SCENARIOS)} (default {DEFAULT_MIX})'
+        )
+        parser.add_argument('--iterations', type=int, default=500, help='Scenario runs in total')
+        parser.add_argument('--duration', type=float, help='Stop after this many seconds instead')
+        parser.add_argument(
+            '--concurrency', type=int, default=4,
+            help='Worker threads; SQLite serialises writers, so measure concurrency on PostgreSQL'
+        )
+        parser.add_argument('--students', type=int, default=200, help='Generated students to log in')
+        parser.add_argument('--heartbeats', type=int, default=5, help='Heartbeat requests per heartbeats run')
+        parser.add_argument('--autosaves', type=int, default=5, help='Autosave requests per mock test')
+        parser.add_argument('--prefix', default='load', help='Prefix passed to generate_load_data')
+        parser.add_argument('--seed', type=int, default=42)
+
+    def handle(self, *args, **options):
+        for name in COUNTS:
+            if options[name] < 1:
+                raise CommandError(f'--{name} must be at least 1')
+        if options['duration'] is not None and options['duration'] <= 0:
+            raise CommandError('--duration must be positive')
+        try:
+            population = loadtest.Population(options['prefix'], options['students'])
+            bench = loadtest.Benchmark(
+                population, parse_mix(options['mix']), concurrency=options['concurrency'],
+                heartbeats=options['heartbeats'], autosaves=options['autosaves'], seed=options['seed']
+            )
+        except ValueError as exc:
+            raise CommandError(str(exc))
+
+        if options['duration'] is not None:
+            budget, iterations = f'{options["duration"]:g}s', None
+        else:
+            budget, iterations = f'{options["iterations"]} iterations', options['iterations']
+        self.stdout.write(
+            f'Running {budget} on {options["concurrency"]} threads as {len(population.students)} students'
+        )
+        rows = bench.run(iterations=iterations, duration=options['duration'])
+        self.report(bench, rows)
+
+    def report(self, bench, rows):
+        self.stdout.write(
+            f'\n{"endpoint":44} {"requests":>8} {"errors":>6} {"req/s":>8} '
+            f'{"p50 ms":>8} {"p95 ms":>8} {"p99 ms":>8} {"max ms":>8}'
+        )
+        for row in rows:
+            self.stdout.write(
+                f'{row["endpoint"]:44} {row["requests"]:>8} {row["errors"]:>6} {row["throughput"]:>8.1f} '
+                + ' '.join(f'{row[column] * 1000:>8.1f}' for column in ('p50', 'p95', 'p99', 'max'))
+            )
+        total = sum(row['requests'] for row in rows)
+        errors = sum(row['errors'] for row in rows)
+        self.stdout.write(
+            f'\n{total} requests, {errors} errors in {bench.elapsed:.1f}s ({total / bench.elapsed:.1f} req/s)'
+        )
+        for name, stats in sorted(bench.scenarios.items()):
+            line = f'  {name:12} {stats["runs"]:>6} runs, {stats["failures"]} failed'
+            if stats['skipped']:
+                line += f', {stats["skipped"]} skipped (no student left who has not sat the live test)'
+            self.stdout.write(line)
+        if errors:
+            self.stdout.write(self.style.WARNING('Some requests failed; their latencies are included above.'))
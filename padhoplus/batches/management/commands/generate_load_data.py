@@ -0,0 +1,271 @@
+import random
+import time
+from datetime import date, time as clock
+from decimal import Decimal
+from itertools import islice
+
+from django.contrib.auth.hashers import make_password
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+
+from padhoplus import search
+from padhoplus.assessments import sampling
+from padhoplus.assessments.models import Question, Test, TestAttempt
+from padhoplus.batches.models import Batch, BatchFAQ, BatchSubjectFaculty, Enrollment, Schedule, Subject, Topic
+from padhoplus.content.models import Lecture, WatchHistory
+from padhoplus.doubts.models import Doubt, DoubtResponse
+from padhoplus.users.models import Faculty, User
+
+SUBJECTS = {
+    'Physics': ['Mechanics', 'Optics', 'Thermodynamics', 'Electrostatics', 'Magnetism', 'Modern Physics'],
+    'Chemistry': ['Organic', 'Inorganic', 'Physical', 'Equilibrium', 'Kinetics', 'Electrochemistry'],
+    'Mathematics': ['Algebra', 'Calculus', 'Trigonometry', 'Coordinate Geometry', 'Vectors', 'Probability'],
+    'Biology': ['Botany', 'Zoology', 'Genetics', 'Ecology', 'Human Physiology', 'Cell Biology'],
+}
+
+WORDS = (
+    'why does the velocity change when acceleration is constant friction torque momentum '
+    'capacitor charge flux lens refraction entropy enthalpy equilibrium titration oxidation '
+    'isomerism benzene integration limits matrices probability parabola vector sequence cell'
+).split()
+
+# Enrollment j of student i is in batch (i * ENROLLMENT_STRIDE + j) % batches,
+# so enrollments and watch history can be derived without keeping them in memory.
+ENROLLMENT_STRIDE = 31
+
+
+def chunks(rows, size):
+    rows = iter(rows)
+    while chunk := list(islice(rows, size)):
+        yield chunk
+
+
+class Command(BaseCommand):
+    help = 'Generates a large synthetic dataset with chunked bulk_create for load tests and capacity planning'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=10000, help='Students to generate')
+        parser.add_argument('--teachers', type=int, help='Teachers to generate (default: one per 200 students)')
+        parser.add_argument('--batches', type=int, default=50, help='Batches to generate')
+        parser.add_argument('--lectures-per-batch', type=int, default=40)
+        parser.add_argument('--enrollments-per-user', type=int, default=2)
+        parser.add_argument('--questions', type=int, default=2000, help='Questions in the bank')
+        parser.add_argument('--tests-per-batch', type=int, default=4, help='The first is live, the rest completed')
+        parser.add_argument('--questions-per-test', type=int, default=30)
+        parser.add_argument('--attempts', type=int, default=20000, help='Submitted attempts on completed tests')
+        parser.add_argument('--watch-history', type=int, default=100000, help='Watch history rows')
+        parser.add_argument('--doubts', type=int, default=20000, help='Doubts; every other one gets a response')
+        parser.add_argument('--chunk-size', type=int, default=5000, help='Rows per INSERT')
+        parser.add_argument('--prefix', default='load', help='Prefix of generated usernames and slugs')
+        parser.add_argument('--password', default='padhoplus-load', help='Password of every generated user')
+        parser.add_argument('--seed', type=int, default=42)
+
+    def handle(self, *args, **options):
+        self.prefix = options['prefix']
+        self.chunk_size = options['chunk_size']
+        self.rng = random.Random(options['seed'])
+        if User.objects.filter(username__startswith=f'{self.prefix}_').exists():
+            raise CommandError(f'Users prefixed {self.prefix}_ already exist; pass another --prefix.')
+        if options['batches'] < 1 or options['users'] < 1:
+            raise CommandError('--users and --batches must be at least 1.')
+
+        started = time.perf_counter()
+        self.catalog()
+        self.people(options['users'], options['teachers'] or max(1, options['users'] // 200), options['password'])
+        self.batches(options['batches'], options['lectures_per_batch'])
+        self.enrollments(options['enrollments_per_user'])
+        self.assessments(
+            options['questions'], options['tests_per_batch'], options['questions_per_test'], options['attempts']
+        )
+        self.watch_history(options['watch_history'])
+        self.doubts(options['doubts'])
+        self.finish()
+        self.stdout.write(self.style.SUCCESS(f'Generated load data in {time.perf_counter() - started:.1f}s'))
+
+    def bulk(self, model, rows, keep_pks=True):
+        """bulk_create ``rows`` ``--chunk-size`` at a time, one transaction per chunk; returns the new pks."""
+        pks, count, started = [], 0, time.perf_counter()
+        for chunk in chunks(rows, self.chunk_size):
+            with transaction.atomic():
+                created = model.objects.bulk_create(chunk)
+            count += len(created)
+            if keep_pks:
+                pks += [row.pk for row in created]
+        elapsed = time.perf_counter() - started
+        self.stdout.write(
+            f'  {model._meta.db_table:24} {count:>10} rows in {elapsed:7.1f}s ({count / max(elapsed, 1e-6):,.0f}/s)'
+        )
+        return pks
+
+    def catalog(self):
+        subjects = Subject.objects.bulk_create([
+            Subject(name=name, slug=f'{self.prefix}-{name.lower()}', order=order)
+            for order, name in enumerate(SUBJECTS)
+        ])
+        self.topics = Topic.objects.bulk_create([
+            Topic(subject=subject, name=name, slug=name.lower().replace(' ', '-'), chapter_number=number + 1)
+            for subject in subjects for number, name in enumerate(SUBJECTS[subject.name])
+        ])
+        self.subjects = subjects
+
+    def people(self, students, teachers, password):
+        # Hashed once: per-user hashing would dominate the run.
+        hashed = make_password(password)
+        self.students = self.bulk(User, (
+            User(
+                username=f'{self.prefix}_student_{i}', email=f'{self.prefix}_student_{i}@example.com',
+                password=hashed, role='student', target_exam='jee_main'
+            )
+            for i in range(students)
+        ))
+        self.teachers = self.bulk(User, (
+            User(
+                username=f'{self.prefix}_teacher_{i}', email=f'{self.prefix}_teacher_{i}@example.com',
+                password=hashed, role='teacher', first_name='Faculty', last_name=str(i)
+            )
+            for i in range(teachers)
+        ))
+        self.faculty = self.bulk(Faculty, (
+            Faculty(user_id=pk, designation=f'{self.subjects[i % len(self.subjects)].name} faculty', is_featured=i < 10)
+            for i, pk in enumerate(self.teachers)
+        ))
+
+    def batches(self, count, lectures_per_batch):
+        self.batch_ids = self.bulk(Batch, (
+            Batch(
+                name=f'Load Batch {i}', slug=f'{self.prefix}-batch-{i}', description='Complete preparation batch',
+                target_exam=['jee_main', 'neet'][i % 2], target_class='class_12', start_date=date(2026, 4, 1),
+                status='ongoing', price=Decimal('4999'), is_featured=i < 10
+            )
+            for i in range(count)
+        ))
+        self.bulk(BatchSubjectFaculty, (
+            BatchSubjectFaculty(batch_id=batch, subject=subject, faculty_id=self.faculty[(i + j) % len(self.faculty)])
+            for i, batch in enumerate(self.batch_ids) for j, subject in enumerate(self.subjects)
+        ), keep_pks=False)
+        self.bulk(Schedule, (
+            Schedule(batch_id=batch, subject=subject, day=day, start_time=clock(9 + j), end_time=clock(10 + j))
+            for batch in self.batch_ids for j, subject in enumerate(self.subjects) for day in ('mon', 'wed', 'fri')
+        ), keep_pks=False)
+        self.bulk(BatchFAQ, (
+            BatchFAQ(batch_id=batch, question=question, answer='Yes.', order=order)
+            for batch in self.batch_ids
+            for order, question in enumerate(['Are classes live?', 'Are recordings available?'])
+        ), keep_pks=False)
+
+        pks = self.bulk(Lecture, (
+            Lecture(
+                batch_id=batch, subject=self.topics[order % len(self.topics)].subject,
+                topic=self.topics[order % len(self.topics)], teacher_id=self.teachers[order % len(self.teachers)],
+                title=f'Lecture {order + 1}', video_url='https://videos.padhoplus.com/lecture.mp4',
+                duration_minutes=60, order=order, is_demo=order < 2, is_free=order < 1
+            )
+            for batch in self.batch_ids for order in range(lectures_per_batch)
+        ))
+        self.lectures_per_batch = lectures_per_batch
+        self.lectures = {
+            batch: pks[i * lectures_per_batch:(i + 1) * lectures_per_batch] for i, batch in enumerate(self.batch_ids)
+        }
+
+    def enrolled(self, student_index, j):
+        return self.batch_ids[(student_index * ENROLLMENT_STRIDE + j) % len(self.batch_ids)]
+
+    def enrollments(self, per_user):
+        self.per_user = min(per_user, len(self.batch_ids))
+        self.enrollment_count = len(self.students) * self.per_user
+        self.bulk(Enrollment, (
+            Enrollment(student_id=student, batch_id=self.enrolled(i, j), status='active', amount_paid=Decimal('4999'))
+            for i, student in enumerate(self.students) for j in range(self.per_user)
+        ), keep_pks=False)
+
+    def assessments(self, count, tests_per_batch, questions_per_test, attempts):
+        self.bulk(Question, (
+            Question(
+                subject=self.topics[i % len(self.topics)].subject, topic=self.topics[i % len(self.topics)],
+                question_text=f'Question {i}: ' + ' '.join(self.rng.choices(WORDS, k=12)),
+                difficulty=['easy', 'medium', 'hard'][i % 3], option_a='1', option_b='2', option_c='3', option_d='4',
+                correct_answer='ABCD'[i % 4]
+            )
+            for i in range(count)
+        ), keep_pks=False)
+        pool = {
+            subject.pk: list(Question.objects.filter(subject=subject).values_list('pk', flat=True))
+            for subject in self.subjects
+        }
+
+        tests = Test.objects.bulk_create([
+            Test(
+                batch_id=batch, subject=self.subjects[j % len(self.subjects)], title=f'Mock test {j + 1}',
+                test_type='mock', status='live' if j == 0 else 'completed', duration_minutes=180,
+                created_by_id=self.teachers[0]
+            )
+            for batch in self.batch_ids for j in range(tests_per_batch)
+        ])
+        self.bulk(Test.questions.through, (
+            Test.questions.through(test_id=test.pk, question_id=question)
+            for test in tests
+            for question in self.rng.sample(pool[test.subject_id], min(questions_per_test, len(pool[test.subject_id])))
+        ), keep_pks=False)
+
+        # Attempt k: enrollment k % enrollments on that batch's completed test k // enrollments.
+        completed = {}
+        for test in tests:
+            if test.status == 'completed':
+                completed.setdefault(test.batch_id, []).append(test.pk)
+        attempts = min(attempts, self.enrollment_count * (tests_per_batch - 1))
+
+        def rows():
+            for k in range(attempts):
+                e = k % self.enrollment_count
+                student = e // self.per_user
+                yield TestAttempt(
+                    test_id=completed[self.enrolled(student, e % self.per_user)][k // self.enrollment_count],
+                    student_id=self.students[student], status='submitted',
+                    score=Decimal(self.rng.randint(-20, 360)), time_taken_seconds=self.rng.randint(1800, 10800)
+                )
+        self.bulk(TestAttempt, rows(), keep_pks=False)
+
+    def watch_history(self, count):
+        students = len(self.students)
+        count = min(count, students * self.per_user * self.lectures_per_batch)
+
+        def rows():
+            # Row k: student k % students watches lecture k // students of their enrolled batches.
+            for k in range(count):
+                student, j = k % students, k // students
+                yield WatchHistory(
+                    user_id=self.students[student],
+                    lecture_id=self.lectures[self.enrolled(student, j % self.per_user)][j // self.per_user],
+                    watched_duration=self.rng.randint(60, 3600), last_position=self.rng.randint(60, 3600),
+                    is_completed=j % 3 == 0
+                )
+        self.bulk(WatchHistory, rows(), keep_pks=False)
+
+    def doubts(self, count):
+        doubts = self.bulk(Doubt, (
+            Doubt(
+                student_id=self.rng.choice(self.students), subject=self.topics[i % len(self.topics)].subject,
+                topic=self.topics[i % len(self.topics)], title=' '.join(self.rng.choices(WORDS, k=6)),
+                description=' '.join(self.rng.choices(WORDS, k=40)), status='answered' if i % 2 == 0 else 'pending',
+                is_resolved=i % 4 == 0, assigned_to_id=self.teachers[i % len(self.teachers)]
+            )
+            for i in range(count)
+        ))
+        self.bulk(DoubtResponse, (
+            DoubtResponse(
+                doubt_id=doubt, responder_id=self.teachers[i % len(self.teachers)],
+                content=' '.join(self.rng.choices(WORDS, k=30))
+            )
+            for i, doubt in enumerate(doubts) if i % 2 == 0
+        ), keep_pks=False)
+
+    def finish(self):
+        # bulk_create skips signals: recompute what they would have maintained.
+        call_command('sync_enrollment_counts', stdout=self.stdout)
+        search.refresh_search_vectors(Batch.objects.filter(slug__startswith=f'{self.prefix}-batch-'))
+        search.refresh_search_vectors(Doubt.objects.filter(student__username__startswith=f'{self.prefix}_'))
+        sampling.invalidate()
+        if connection.vendor == 'postgresql':
+            with connection.cursor() as cursor:
+                cursor.execute('ANALYZE')
@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+from padhoplus.batches.models import Batch, Enrollment
+
+
+class Command(BaseCommand):
+    help = 'Recomputes Batch.active_enrollments_count from the enrollments table'
+
+    def handle(self, *args, **options):
+        # Bulk QuerySet.update() calls on enrollments bypass Enrollment.save(),
+        # so this resynchronises every counter in a single UPDATE.
+        active = Enrollment.objects.filter(
+            batch=OuterRef('pk'), status='active'
+        ).order_by().values('batch').annotate(total=Count('pk')).values('total')
+        updated = Batch.objects.update(active_enrollments_count=Coalesce(Subquery(active), 0))
+        self.stdout.write(self.style.SUCCESS(f'Synchronised enrollment counts for {updated} batches'))
@@ -0,0 +1,30 @@
+# Generated by Django 5.2.8 on 2026-10-18 15:04
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def backfill_active_enrollments_count(apps, schema_editor):
+    Batch = apps.get_model('batches', 'Batch')
+    Enrollment = apps.get_model('batches', 'Enrollment')
+    active = Enrollment.objects.filter(
+        batch=OuterRef('pk'), status='active'
+    ).order_by().values('batch').annotate(total=Count('pk')).values('total')
+    Batch.objects.update(active_enrollments_count=Coalesce(Subquery(active), 0))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('batches', '0004_batchsubjectfaculty'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='batch',
+            name='active_enrollments_count',
+            field=models.IntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(backfill_active_enrollments_count, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,47 @@
+# Generated by Django 5.2.8 on 2026-10-18 15:11
+
+import django.contrib.postgres.search
+from django.contrib.postgres.operations import TrigramExtension
+from django.contrib.postgres.search import SearchVector
+from django.db import migrations
+
+
+def create_search_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    Batch = apps.get_model('batches', 'Batch')
+    Batch.objects.update(search_vector=(
+        SearchVector('name', weight='A', config='english') +
+        SearchVector('target_class', weight='B', config='english') +
+        SearchVector('description', weight='C', config='english')
+    ))
+    schema_editor.execute(
+        'CREATE INDEX IF NOT EXISTS batches_search_vector_gin ON batches USING gin (search_vector)'
+    )
+    schema_editor.execute(
+        'CREATE INDEX IF NOT EXISTS batches_name_trgm ON batches USING gin (name gin_trgm_ops)'
+    )
+
+
+def drop_search_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute('DROP INDEX IF EXISTS batches_search_vector_gin')
+    schema_editor.execute('DROP INDEX IF EXISTS batches_name_trgm')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('batches', '0005_batch_active_enrollments_count'),
+    ]
+
+    operations = [
+        TrigramExtension(),
+        migrations.AddField(
+            model_name='batch',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.RunPython(create_search_indexes, drop_search_indexes),
+    ]
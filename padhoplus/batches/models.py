@@ -1,6 +1,9 @@
-from django.db import models
+from django.contrib.postgres.search import SearchVectorField
+from django.db import models, transaction
+from django.db.models import F
 from django.utils.text import slugify
 from padhoplus.users.models import User
+from . import catalog_cache
 
 
 class Language(models.Model):
@@ -133,6 +136,10 @@ class Batch(models.Model):
     max_students = models.IntegerField(blank=True, null=True)
     is_featured = models.BooleanField(default=False)
     is_active = models.BooleanField(default=True)
+    # Denormalized count of active enrollments, kept in step by Enrollment.save()
+    # and the post_delete handler so catalog pages never have to COUNT per row.
+    active_enrollments_count = models.IntegerField(default=0, editable=False)
+    search_vector = SearchVectorField(null=True, editable=False)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
@@ -148,7 +155,12 @@ class Batch(models.Model):
     
     @property
     def enrolled_count(self):
-        return self.enrollments.filter(status='active').count()
+        # Prefer the exact count annotated by BatchViewSet.get_queryset and
+        # fall back to the denormalized counter column.
+        annotated = getattr(self, 'active_enrollments', None)
+        if annotated is not None:
+            return annotated
+        return self.active_enrollments_count
     
     @property
     def effective_price(self):
@@ -257,11 +269,52 @@ class Enrollment(models.Model):
         db_table = 'enrollments'
         unique_together = ['student', 'batch']
         ordering = ['-enrolled_at']
+        indexes = [
+            # Entitlement lookups and rosters only ever read active enrollments.
+            models.Index(
+                fields=['student', 'batch'], name='enrollment_student_active_idx',
+                condition=models.Q(status='active')
+            ),
+            models.Index(
+                fields=['batch', 'student'], name='enrollment_batch_active_idx',
+                condition=models.Q(status='active')
+            ),
+        ]
+    
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        if 'status' in field_names and 'batch_id' in field_names:
+            instance._counted_batch_id = instance.counted_batch_id
+        return instance
+    
+    @property
+    def counted_batch_id(self):
+        """Batch whose active_enrollments_count includes this enrollment, if any."""
+        return self.batch_id if self.status == 'active' else None
+    
+    def save(self, *args, **kwargs):
+        counted_before = getattr(self, '_counted_batch_id', None)
+        counted_after = self.counted_batch_id
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+            if counted_before != counted_after:
+                adjust_enrollment_counter(counted_before, -1)
+                adjust_enrollment_counter(counted_after, 1)
+        self._counted_batch_id = counted_after
     
     def __str__(self):
         return f"{self.student.username} - {self.batch.name}"
 
 
+def adjust_enrollment_counter(batch_id, delta):
+    if batch_id:
+        Batch.objects.filter(pk=batch_id).update(
+            active_enrollments_count=F('active_enrollments_count') + delta
+        )
+        catalog_cache.enrollments_changed()
+
+
 class Announcement(models.Model):
     PRIORITY_CHOICES = [
         ('low', 'Low'),
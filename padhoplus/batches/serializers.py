@@ -1,7 +1,8 @@
 from rest_framework import serializers
+from django.db.models import Prefetch
 from .models import (
     Subject, Topic, Batch, BatchFAQ, Schedule, 
-    Enrollment, Announcement, BatchReview
+    Enrollment, Announcement, BatchReview, BatchSubjectFaculty
 )
 from padhoplus.users.serializers import UserSerializer, FacultySerializer
 
@@ -77,6 +78,39 @@ class BatchListSerializer(serializers.ModelSerializer):
         ]
 
 
+def batch_detail_prefetches():
+    """Prefetch plan that lets BatchDetailSerializer render without per-row queries."""
+    return [
+        Prefetch(
+            'schedules',
+            queryset=Schedule.objects.select_related('subject').prefetch_related(
+                Prefetch(
+                    'subject__topics',
+                    queryset=Topic.objects.filter(is_active=True).select_related('subject'),
+                    to_attr='active_topics'
+                )
+            )
+        ),
+        Prefetch(
+            'faqs',
+            queryset=BatchFAQ.objects.filter(is_active=True).order_by('order'),
+            to_attr='active_faqs'
+        ),
+        Prefetch(
+            'reviews',
+            queryset=BatchReview.objects.filter(is_active=True).select_related('student'),
+            to_attr='active_reviews'
+        ),
+        Prefetch(
+            'batch_subject_faculties',
+            queryset=BatchSubjectFaculty.objects.select_related(
+                'faculty__user', 'subject'
+            ).prefetch_related('faculty__subjects'),
+            to_attr='faculty_relations'
+        ),
+    ]
+
+
 class BatchDetailSerializer(serializers.ModelSerializer):
     schedules = ScheduleSerializer(many=True, read_only=True)
     faqs = serializers.SerializerMethodField()
@@ -98,9 +132,14 @@ class BatchDetailSerializer(serializers.ModelSerializer):
             'enrolled_count', 'schedules', 'faqs', 'reviews', 'faculty', 'syllabus'
         ]
     
+    # Each getter reads the attribute filled in by batch_detail_prefetches()
+    # and only falls back to querying when the batch was loaded without it.
+    
     def get_faqs(self, obj):
         try:
-            faqs = obj.faqs.filter(is_active=True).order_by('order')
+            faqs = getattr(obj, 'active_faqs', None)
+            if faqs is None:
+                faqs = obj.faqs.filter(is_active=True).order_by('order')
             return [{
                 'id': faq.id,
                 'question': faq.question,
@@ -111,12 +150,18 @@ class BatchDetailSerializer(serializers.ModelSerializer):
             return []
     
     def get_reviews(self, obj):
-        reviews = obj.reviews.filter(is_active=True)
+        reviews = getattr(obj, 'active_reviews', None)
+        if reviews is None:
+            reviews = obj.reviews.filter(is_active=True).select_related('student')
         return BatchReviewSerializer(reviews, many=True).data
     
     def get_faculty(self, obj):
         try:
-            faculty_relations = obj.batch_subject_faculties.select_related('faculty__user', 'subject').all()
+            faculty_relations = getattr(obj, 'faculty_relations', None)
+            if faculty_relations is None:
+                faculty_relations = obj.batch_subject_faculties.select_related(
+                    'faculty__user', 'subject'
+                ).prefetch_related('faculty__subjects')
             faculty_data = []
             for relation in faculty_relations:
                 faculty_info = FacultySerializer(relation.faculty).data
@@ -132,10 +177,19 @@ class BatchDetailSerializer(serializers.ModelSerializer):
     
     def get_syllabus(self, obj):
         try:
-            subjects = Subject.objects.filter(schedules__batch=obj, is_active=True).distinct()
+            if 'schedules' in getattr(obj, '_prefetched_objects_cache', {}):
+                subjects = {}
+                for schedule in obj.schedules.all():
+                    if schedule.subject.is_active:
+                        subjects.setdefault(schedule.subject_id, schedule.subject)
+                subjects = sorted(subjects.values(), key=lambda subject: (subject.order, subject.name))
+            else:
+                subjects = Subject.objects.filter(schedules__batch=obj, is_active=True).distinct()
             data = []
             for subject in subjects:
-                topics = Topic.objects.filter(subject=subject, is_active=True)
+                topics = getattr(subject, 'active_topics', None)
+                if topics is None:
+                    topics = Topic.objects.filter(subject=subject, is_active=True).select_related('subject')
                 data.append({
                     'id': subject.id,
                     'name': subject.name,
@@ -0,0 +1,56 @@
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from padhoplus import search
+from padhoplus.users.models import Faculty
+from . import catalog_cache, entitlements
+from .models import (
+    Subject, Topic, Batch, BatchFAQ, BatchSubjectFaculty, Schedule,
+    Enrollment, BatchReview, adjust_enrollment_counter
+)
+
+
+@receiver(post_delete, sender=Enrollment)
+def enrollment_deleted(sender, instance, **kwargs):
+    # Runs inside the deletion collector's transaction, so cascaded and
+    # queryset deletes keep Batch.active_enrollments_count in step as well.
+    adjust_enrollment_counter(getattr(instance, '_counted_batch_id', None), -1)
+
+
+@receiver(post_save, sender=Enrollment)
+@receiver(post_delete, sender=Enrollment)
+def entitlements_changed(sender, instance, **kwargs):
+    # Again after commit, in case a concurrent request re-cached the old set.
+    entitlements.invalidate([instance.student_id])
+    transaction.on_commit(lambda: entitlements.invalidate([instance.student_id]))
+
+
+@receiver(post_save, sender=Batch)
+def batch_saved(sender, instance, update_fields=None, **kwargs):
+    search.refresh_instance(instance, update_fields)
+
+
+@receiver(post_save, sender=Batch)
+@receiver(post_delete, sender=Batch)
+@receiver(post_save, sender=Subject)
+@receiver(post_delete, sender=Subject)
+@receiver(post_save, sender=Topic)
+@receiver(post_delete, sender=Topic)
+@receiver(post_save, sender=Faculty)
+@receiver(post_delete, sender=Faculty)
+def catalog_changed(sender, instance, **kwargs):
+    catalog_cache.invalidate_catalog()
+
+
+@receiver(post_save, sender=BatchFAQ)
+@receiver(post_delete, sender=BatchFAQ)
+@receiver(post_save, sender=Schedule)
+@receiver(post_delete, sender=Schedule)
+@receiver(post_save, sender=BatchReview)
+@receiver(post_delete, sender=BatchReview)
+@receiver(post_save, sender=BatchSubjectFaculty)
+@receiver(post_delete, sender=BatchSubjectFaculty)
+def batch_detail_changed(sender, instance, **kwargs):
+    slug = Batch.objects.filter(pk=instance.batch_id).values_list('slug', flat=True).first()
+    catalog_cache.invalidate_batch(slug)
@@ -2,16 +2,21 @@ from rest_framework import viewsets, status, permissions
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from django.utils import timezone
-from django.db.models import Q, Avg
+from django.db.models import Q, Avg, Count, Max, OuterRef, Subquery
+from padhoplus import search as search_backend
+from padhoplus.conditional import queryset_state
+from padhoplus.permissions import IsAdmin
 from .models import (
     Subject, Topic, Batch, BatchFAQ, Schedule,
-    Enrollment, Announcement, BatchReview
+    Enrollment, Announcement, BatchReview, BatchSubjectFaculty
 )
 from .serializers import (
     SubjectSerializer, TopicSerializer, BatchListSerializer,
     BatchDetailSerializer, BatchFAQSerializer, ScheduleSerializer,
-    EnrollmentSerializer, AnnouncementSerializer, BatchReviewSerializer
+    EnrollmentSerializer, AnnouncementSerializer, BatchReviewSerializer,
+    batch_detail_prefetches
 )
+from . import catalog_cache, entitlements
 
 
 class IsAdminOrReadOnly(permissions.BasePermission):
@@ -61,6 +66,7 @@ class BatchViewSet(viewsets.ModelViewSet):
     queryset = Batch.objects
     permission_classes = [IsAdminOrReadOnly]
     lookup_field = 'slug'
+    CATALOG_ACTIONS = ('list', 'featured')
     
     def get_serializer_class(self):
         if self.action == 'retrieve':
@@ -93,19 +99,77 @@ class BatchViewSet(viewsets.ModelViewSet):
         if featured:
             queryset = queryset.filter(is_featured=True)
         if search:
-            queryset = queryset.filter(
-                Q(name__icontains=search) |
-                Q(description__icontains=search) |
-                Q(target_class__icontains=search)
+            queryset = search_backend.apply_search(queryset, search)
+        
+        # Catalog pages read the denormalized counter column; every other
+        # action gets the exact count annotated onto the same query.
+        if self.action not in self.CATALOG_ACTIONS:
+            queryset = queryset.annotate(
+                active_enrollments=Count('enrollments', filter=Q(enrollments__status='active'))
             )
+        if self.action == 'retrieve':
+            queryset = queryset.prefetch_related(*batch_detail_prefetches())
         
         return queryset.all()
     
+    def detail_states(self, slug):
+        """Validator states for a batch and the rows embedded in its detail payload."""
+        related = (
+            ('faqs', BatchFAQ), ('schedules', Schedule),
+            ('reviews', BatchReview), ('faculty', BatchSubjectFaculty),
+        )
+        annotations = {}
+        for name, model in related:
+            rows = model.objects.filter(batch=OuterRef('pk')).order_by().values('batch')
+            annotations[f'{name}_count'] = Subquery(rows.annotate(total=Count('pk')).values('total'))
+            annotations[f'{name}_latest'] = Subquery(rows.annotate(latest=Max('updated_at')).values('latest'))
+        
+        row = Batch.objects.filter(slug=slug).annotate(**annotations).values(
+            'updated_at', *annotations
+        ).first()
+        if row is None:
+            return [(0, None)]
+        return [(1, row['updated_at'])] + [
+            (row[f'{name}_count'] or 0, row[f'{name}_latest']) for name, _ in related
+        ]
+    
+    # The catalog and detail payloads are identical for every visitor, so the
+    # rendered JSON is served from catalog_cache until a signal bumps its version.
+    
+    def list(self, request, *args, **kwargs):
+        return catalog_cache.cached_response(
+            request,
+            lambda: catalog_cache.list_key(request, 'list'),
+            lambda: super(BatchViewSet, self).list(request, *args, **kwargs),
+            lambda: [queryset_state(self.filter_queryset(self.get_queryset()))]
+        )
+    
+    def retrieve(self, request, *args, **kwargs):
+        slug = kwargs[self.lookup_field]
+        return catalog_cache.cached_response(
+            request,
+            lambda: catalog_cache.detail_key(request, slug),
+            lambda: super(BatchViewSet, self).retrieve(request, *args, **kwargs),
+            lambda: self.detail_states(slug)
+        )
+    
     @action(detail=False, methods=['get'])
     def featured(self, request):
-        batches = self.get_queryset().filter(is_featured=True)[:6]
-        serializer = BatchListSerializer(batches, many=True)
-        return Response(serializer.data)
+        def build():
+            batches = self.get_queryset().filter(is_featured=True)[:6]
+            serializer = BatchListSerializer(batches, many=True)
+            return Response(serializer.data)
+        
+        return catalog_cache.cached_response(
+            request,
+            lambda: catalog_cache.list_key(request, 'featured'),
+            build,
+            lambda: [queryset_state(self.get_queryset().filter(is_featured=True))]
+        )
+    
+    @action(detail=False, methods=['get'], permission_classes=[IsAdmin])
+    def cache_stats(self, request):
+        return Response(catalog_cache.stats.snapshot())
     
     @action(detail=True, methods=['post'], permission_classes=[permissions.IsAuthenticated])
     def enroll(self, request, slug=None):
@@ -140,7 +204,9 @@ class BatchViewSet(viewsets.ModelViewSet):
         from padhoplus.content.models import Lecture
         from padhoplus.content.serializers import LectureSerializer
         
-        lectures = Lecture.objects.filter(batch=batch, is_demo=True, is_active=True)[:10]
+        lectures = Lecture.objects.filter(
+            batch=batch, is_demo=True, is_active=True
+        ).select_related('batch', 'subject', 'topic__subject', 'teacher').prefetch_related('resources')[:10]
         serializer = LectureSerializer(lectures, many=True)
         return Response(serializer.data)
     
@@ -149,7 +215,7 @@ class BatchViewSet(viewsets.ModelViewSet):
         batch = self.get_object()
         user = request.user
         
-        if not Enrollment.objects.filter(student=user, batch=batch, status='active').exists():
+        if not entitlements.is_enrolled(request, batch.pk):
             return Response(
                 {'error': 'You must be enrolled in this batch to review it'},
                 status=status.HTTP_403_FORBIDDEN
@@ -174,7 +240,7 @@ class ScheduleViewSet(viewsets.ModelViewSet):
     permission_classes = [IsAdminOrReadOnly]
     
     def get_queryset(self):
-        queryset = Schedule.objects.all()
+        queryset = Schedule.objects.select_related('subject')
         batch = self.request.query_params.get('batch')
         if batch:
             queryset = queryset.filter(batch__slug=batch)
@@ -194,14 +260,15 @@ class EnrollmentViewSet(viewsets.ModelViewSet):
     
     def get_queryset(self):
         user = self.request.user
+        queryset = Enrollment.objects.select_related('student', 'batch')
         if user.is_platform_admin():
-            return Enrollment.objects.all()
+            return queryset
         elif user.is_teacher():
-            return Enrollment.objects.filter(batch__faculty=user)
+            return queryset.filter(batch__faculty=user)
         elif user.is_parent():
             children_ids = user.children.values_list('id', flat=True) if hasattr(user, 'children') else []
-            return Enrollment.objects.filter(student_id__in=children_ids)
-        return Enrollment.objects.filter(student=user)
+            return queryset.filter(student_id__in=children_ids)
+        return queryset.filter(student=user)
     
     def perform_create(self, serializer):
         user = self.request.user
@@ -214,7 +281,7 @@ class EnrollmentViewSet(viewsets.ModelViewSet):
         enrollments = Enrollment.objects.filter(
             student=request.user,
             status='active'
-        ).select_related('batch')
+        ).select_related('student', 'batch')
         serializer = self.get_serializer(enrollments, many=True)
         return Response(serializer.data)
 
@@ -229,10 +296,7 @@ class AnnouncementViewSet(viewsets.ModelViewSet):
         
         if user.is_authenticated:
             if user.is_student():
-                enrolled_batches = Enrollment.objects.filter(
-                    student=user, status='active'
-                ).values_list('batch_id', flat=True)
-                queryset = queryset.filter(batch_id__in=enrolled_batches)
+                queryset = queryset.filter(batch_id__in=entitlements.active_batch_ids(self.request))
             elif user.is_teacher():
                 queryset = queryset.filter(batch__faculty=user)
         
@@ -240,7 +304,7 @@ class AnnouncementViewSet(viewsets.ModelViewSet):
         if batch:
             queryset = queryset.filter(batch__slug=batch)
         
-        return queryset
+        return queryset.select_related('batch', 'author')
     
     def perform_create(self, serializer):
         batch = serializer.validated_data.get('batch')
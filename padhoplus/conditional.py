@@ -0,0 +1,70 @@
+"""
+Conditional GET support for read-mostly endpoints.
+
+Validators are derived from COUNT(*) and MAX(<timestamp>) over the queryset a
+view is about to serialize, so answering a revalidation with 304 costs one
+aggregate query and no serializer work.
+"""
+
+import hashlib
+
+from django.db.models import Count, Max
+from django.utils.cache import get_conditional_response, patch_vary_headers
+from django.utils.http import http_date
+
+
+def queryset_state(queryset, timestamp_fields=('updated_at',)):
+    """Return ``(row_count, latest_timestamp)`` for ``queryset`` in one query.
+
+    Timestamp fields may span relations (e.g. ``user__updated_at``); the row
+    count is taken over the joined rows, so adding or removing related rows
+    changes it as well.
+    """
+    aggregates = {
+        f'latest_{index}': Max(field) for index, field in enumerate(timestamp_fields)
+    }
+    values = queryset.order_by().aggregate(row_count=Count('pk'), **aggregates)
+    timestamps = [values[key] for key in aggregates if values[key] is not None]
+    return values['row_count'], max(timestamps) if timestamps else None
+
+
+def build_validators(request, states, per_user=True, extra=''):
+    """Turn ``(row_count, latest_timestamp)`` states into an ETag and Last-Modified."""
+    parts = [request.get_full_path(), extra]
+    if per_user:
+        parts.append(str(request.user.pk) if request.user.is_authenticated else 'anonymous')
+    latest = None
+    for row_count, timestamp in states:
+        parts.append(f'{row_count}:{timestamp.isoformat() if timestamp else ""}')
+        if timestamp is not None and (latest is None or timestamp > latest):
+            latest = timestamp
+    etag = '"%s"' % hashlib.md5('|'.join(parts).encode()).hexdigest()
+    return etag, latest.timestamp() if latest else None
+
+
+def not_modified(request, etag, last_modified):
+    """Return a 304 response when the client's validators still match."""
+    return get_conditional_response(request, etag=etag, last_modified=last_modified)
+
+
+def apply_validators(response, etag, last_modified, per_user=True):
+    if response.status_code == 200:
+        response['ETag'] = etag
+        if last_modified:
+            response['Last-Modified'] = http_date(last_modified)
+        if per_user:
+            patch_vary_headers(response, ('Cookie',))
+    return response
+
+
+def conditional_get(request, states, build, per_user=True):
+    """Answer with 304 if the validators match, otherwise call ``build()``.
+
+    ``per_user`` mixes the requesting user into the ETag for endpoints whose
+    queryset depends on who is asking.
+    """
+    etag, last_modified = build_validators(request, states, per_user=per_user)
+    response = not_modified(request, etag, last_modified)
+    if response is not None:
+        return response
+    return apply_validators(build(), etag, last_modified, per_user=per_user)
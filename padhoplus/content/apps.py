@@ -4,3 +4,6 @@ class ContentConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'padhoplus.content'
     verbose_name = 'Content'
+    
+    def ready(self):
+        from . import signals  # noqa: F401
@@ -0,0 +1,19 @@
+# Generated by Django 5.2.8 on 2026-10-18 15:59
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('content', '0003_search_vector'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='watchhistory',
+            index=models.Index(fields=['user', '-last_watched_at', '-id'], name='watch_history_keyset_idx'),
+        ),
+    ]
@@ -0,0 +1,36 @@
+# Generated by Django 5.2.8 on 2026-10-18 16:03
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('batches', '0007_hot_path_indexes'),
+        ('content', '0004_keyset_pagination_indexes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='lecture',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['batch', 'subject', 'order'], name='lecture_batch_active_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='lecture',
+            index=models.Index(condition=models.Q(('is_active', True), ('is_demo', True)), fields=['batch', 'subject', 'order'], name='lecture_demo_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='lecture',
+            index=models.Index(condition=models.Q(('is_active', True), ('is_free', True)), fields=['batch', 'subject', 'order'], name='lecture_free_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='note',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['is_free', 'file_type', '-created_at'], name='note_active_type_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='watchhistory',
+            index=models.Index(condition=models.Q(('is_completed', False)), fields=['user', '-last_watched_at'], name='watch_history_in_progress_idx'),
+        ),
+    ]
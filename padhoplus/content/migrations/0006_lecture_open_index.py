@@ -0,0 +1,24 @@
+# Generated by Django 5.2.8 on 2026-10-18 16:42
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('batches', '0007_hot_path_indexes'),
+        ('content', '0005_hot_path_indexes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='lecture',
+            name='lecture_free_idx',
+        ),
+        migrations.AddIndex(
+            model_name='lecture',
+            index=models.Index(condition=models.Q(('is_active', True), models.Q(('is_demo', True), ('is_free', True), _connector='OR')), fields=['batch', 'subject', 'order'], name='lecture_open_idx'),
+        ),
+    ]
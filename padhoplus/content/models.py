@@ -1,3 +1,4 @@
+from django.contrib.postgres.search import SearchVectorField
 from django.db import models
 from padhoplus.users.models import User
 from padhoplus.batches.models import Batch, Subject, Topic
@@ -31,6 +32,21 @@ class Lecture(models.Model):
     class Meta:
         db_table = 'lectures'
         ordering = ['batch', 'subject', 'order']
+        indexes = [
+            models.Index(
+                fields=['batch', 'subject', 'order'], name='lecture_batch_active_idx',
+                condition=models.Q(is_active=True)
+            ),
+            models.Index(
+                fields=['batch', 'subject', 'order'], name='lecture_demo_idx',
+                condition=models.Q(is_active=True, is_demo=True)
+            ),
+            # Everything a visitor may list (see views.listed_lectures).
+            models.Index(
+                fields=['batch', 'subject', 'order'], name='lecture_open_idx',
+                condition=models.Q(is_active=True) & (models.Q(is_demo=True) | models.Q(is_free=True))
+            ),
+        ]
     
     def __str__(self):
         return f"{self.batch.name} - {self.title}"
@@ -61,12 +77,20 @@ class Note(models.Model):
     is_active = models.BooleanField(default=True)
     downloads_count = models.IntegerField(default=0)
     
+    search_vector = SearchVectorField(null=True, editable=False)
+    
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
     class Meta:
         db_table = 'notes'
         ordering = ['-created_at']
+        indexes = [
+            models.Index(
+                fields=['is_free', 'file_type', '-created_at'], name='note_active_type_idx',
+                condition=models.Q(is_active=True)
+            ),
+        ]
     
     def __str__(self):
         return f"{self.title} ({self.get_file_type_display()})"
@@ -113,6 +137,14 @@ class WatchHistory(models.Model):
         db_table = 'watch_history'
         unique_together = ['user', 'lecture']
         ordering = ['-last_watched_at']
+        indexes = [
+            models.Index(fields=['user', '-last_watched_at', '-id'], name='watch_history_keyset_idx'),
+            # Continue watching lists a user's unfinished lectures.
+            models.Index(
+                fields=['user', '-last_watched_at'], name='watch_history_in_progress_idx',
+                condition=models.Q(is_completed=False)
+            ),
+        ]
     
     def __str__(self):
         return f"{self.user.username} - {self.lecture.title}"
@@ -79,6 +79,22 @@ class WatchHistorySerializer(serializers.ModelSerializer):
         read_only_fields = ['id', 'user', 'first_watched_at', 'last_watched_at']
 
 
+class HeartbeatSerializer(serializers.Serializer):
+    watched_duration = serializers.IntegerField(min_value=0, default=0)
+    last_position = serializers.IntegerField(min_value=0, default=0)
+    is_completed = serializers.BooleanField(default=False)
+
+
+class LectureHeartbeatSerializer(HeartbeatSerializer):
+    lecture_id = serializers.IntegerField()
+
+
+class HeartbeatBatchSerializer(serializers.Serializer):
+    heartbeats = serializers.ListField(
+        child=LectureHeartbeatSerializer(), allow_empty=False, max_length=500
+    )
+
+
 class BookmarkSerializer(serializers.ModelSerializer):
     lecture = LectureListSerializer(read_only=True)
     lecture_id = serializers.IntegerField(write_only=True, required=False, allow_null=True)
@@ -0,0 +1,10 @@
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+
+from padhoplus import search
+from .models import Note
+
+
+@receiver(post_save, sender=Note)
+def note_saved(sender, instance, update_fields=None, **kwargs):
+    search.refresh_instance(instance, update_fields)
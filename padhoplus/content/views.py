@@ -1,12 +1,18 @@
 from rest_framework import viewsets, status, permissions
 from rest_framework.decorators import action
 from rest_framework.response import Response
-from django.utils import timezone
 from django.db.models import Q
+from padhoplus import counters, search as search_backend
+from padhoplus.analytics import progress
+from padhoplus.batches import entitlements
+from . import watch_progress
+from padhoplus.conditional import conditional_get, queryset_state
+from padhoplus.pagination import KeysetPagination
 from .models import Lecture, Note, Resource, WatchHistory, Bookmark
 from .serializers import (
     LectureSerializer, LectureListSerializer, NoteSerializer,
-    ResourceSerializer, WatchHistorySerializer, BookmarkSerializer
+    ResourceSerializer, WatchHistorySerializer, BookmarkSerializer,
+    HeartbeatSerializer, HeartbeatBatchSerializer
 )
 
 
@@ -36,12 +42,20 @@ class IsEnrolledOrTeacherOrAdmin(permissions.BasePermission):
         if obj.is_demo or obj.is_free:
             return True
         
-        from padhoplus.batches.models import Enrollment
-        return Enrollment.objects.filter(
-            student=request.user,
-            batch=obj.batch,
-            status='active'
-        ).exists()
+        return entitlements.is_enrolled(request, obj.batch_id)
+
+
+def listed_lectures(enrolled_batch_ids=None):
+    """Active lectures a student enrolled in ``enrolled_batch_ids`` may list;
+    with None, the demo and free ones open to visitors."""
+    visible = Q(is_demo=True) | Q(is_free=True)
+    if enrolled_batch_ids is not None:
+        visible = Q(batch_id__in=enrolled_batch_ids) | visible
+    return Lecture.objects.filter(visible, is_active=True)
+
+
+def demo_lectures():
+    return Lecture.objects.filter(is_active=True, is_demo=True).select_related('subject', 'topic', 'teacher')[:10]
 
 
 class LectureViewSet(viewsets.ModelViewSet):
@@ -59,17 +73,11 @@ class LectureViewSet(viewsets.ModelViewSet):
         
         if user.is_authenticated:
             if user.is_student():
-                from padhoplus.batches.models import Enrollment
-                enrolled_batches = Enrollment.objects.filter(
-                    student=user, status='active'
-                ).values_list('batch_id', flat=True)
-                queryset = queryset.filter(
-                    Q(batch_id__in=enrolled_batches) | Q(is_demo=True) | Q(is_free=True)
-                )
+                queryset = listed_lectures(entitlements.active_batch_ids(self.request))
             elif user.is_teacher():
                 queryset = queryset.filter(Q(teacher=user) | Q(batch__faculty=user))
         else:
-            queryset = queryset.filter(Q(is_demo=True) | Q(is_free=True))
+            queryset = listed_lectures()
         
         batch = self.request.query_params.get('batch')
         subject = self.request.query_params.get('subject')
@@ -97,12 +105,9 @@ class LectureViewSet(viewsets.ModelViewSet):
         instance = self.get_object()
         
         if not (instance.is_demo or instance.is_free):
-            from padhoplus.batches.models import Enrollment
             if request.user.is_authenticated:
                 if not request.user.is_teacher() and not request.user.is_platform_admin():
-                    if not Enrollment.objects.filter(
-                        student=request.user, batch=instance.batch, status='active'
-                    ).exists():
+                    if not entitlements.is_enrolled(request, instance.batch_id):
                         return Response(
                             {'error': 'You must be enrolled in this batch to view this lecture'},
                             status=status.HTTP_403_FORBIDDEN
@@ -113,8 +118,7 @@ class LectureViewSet(viewsets.ModelViewSet):
                     status=status.HTTP_401_UNAUTHORIZED
                 )
         
-        instance.views_count += 1
-        instance.save(update_fields=['views_count'])
+        counters.increment(instance, 'views_count')
         serializer = self.get_serializer(instance)
         return Response(serializer.data)
     
@@ -124,26 +128,15 @@ class LectureViewSet(viewsets.ModelViewSet):
     @action(detail=True, methods=['post'], permission_classes=[permissions.IsAuthenticated])
     def update_progress(self, request, pk=None):
         lecture = self.get_object()
-        user = request.user
+        beat = HeartbeatSerializer(data=request.data)
+        beat.is_valid(raise_exception=True)
         
-        history, created = WatchHistory.objects.get_or_create(
-            user=user,
-            lecture=lecture
+        # Same upsert the batched heartbeat endpoint uses, applied immediately
+        # because the caller expects the stored row back.
+        watch_progress.buffer.write_through(
+            (request.user.pk, lecture.pk), watch_progress.heartbeat(**beat.validated_data)
         )
-        
-        watched_duration = request.data.get('watched_duration', 0)
-        last_position = request.data.get('last_position', 0)
-        is_completed = request.data.get('is_completed', False)
-        
-        history.watched_duration = max(history.watched_duration, watched_duration)
-        history.last_position = last_position
-        
-        if is_completed and not history.is_completed:
-            history.is_completed = True
-            history.completed_at = timezone.now()
-        
-        history.save()
-        
+        history = WatchHistory.objects.get(user=request.user, lecture=lecture)
         serializer = WatchHistorySerializer(history)
         return Response(serializer.data)
     
@@ -171,8 +164,7 @@ class LectureViewSet(viewsets.ModelViewSet):
     
     @action(detail=False, methods=['get'])
     def demo(self, request):
-        lectures = Lecture.objects.filter(is_active=True, is_demo=True)[:10]
-        serializer = LectureListSerializer(lectures, many=True)
+        serializer = LectureListSerializer(demo_lectures(), many=True)
         return Response(serializer.data)
 
 
@@ -187,10 +179,7 @@ class NoteViewSet(viewsets.ModelViewSet):
         
         if user.is_authenticated:
             if user.is_student():
-                from padhoplus.batches.models import Enrollment
-                enrolled_batches = Enrollment.objects.filter(
-                    student=user, status='active'
-                ).values_list('batch_id', flat=True)
+                enrolled_batches = entitlements.active_batch_ids(self.request)
                 queryset = queryset.filter(
                     Q(batch_id__in=enrolled_batches) | Q(is_free=True) | Q(batch__isnull=True)
                 )
@@ -202,6 +191,7 @@ class NoteViewSet(viewsets.ModelViewSet):
         topic = self.request.query_params.get('topic')
         file_type = self.request.query_params.get('type')
         is_free = self.request.query_params.get('is_free')
+        search = self.request.query_params.get('search')
         
         if batch:
             queryset = queryset.filter(batch__slug=batch)
@@ -213,39 +203,49 @@ class NoteViewSet(viewsets.ModelViewSet):
             queryset = queryset.filter(file_type=file_type)
         if is_free:
             queryset = queryset.filter(is_free=is_free.lower() == 'true')
+        if search:
+            queryset = search_backend.apply_search(queryset, search)
         
-        return queryset.select_related('subject', 'topic', 'batch')
+        return queryset.select_related('subject', 'topic__subject', 'batch')
+    
+    def list(self, request, *args, **kwargs):
+        # The visible set depends on the requester's enrollments, so the
+        # validators are scoped per user.
+        queryset = self.filter_queryset(self.get_queryset())
+        return conditional_get(
+            request, [queryset_state(queryset)],
+            lambda: super(NoteViewSet, self).list(request, *args, **kwargs)
+        )
     
     @action(detail=True, methods=['post'], permission_classes=[permissions.IsAuthenticated])
     def download(self, request, pk=None):
         note = self.get_object()
         
         if not note.is_free:
-            from padhoplus.batches.models import Enrollment
             user = request.user
             if not user.is_teacher() and not user.is_platform_admin():
-                if not note.batch or not Enrollment.objects.filter(
-                    student=user, batch=note.batch, status='active'
-                ).exists():
+                if not entitlements.is_enrolled(request, note.batch_id):
                     return Response(
                         {'error': 'You must be enrolled to download this note'},
                         status=status.HTTP_403_FORBIDDEN
                     )
         
-        note.downloads_count += 1
-        note.save(update_fields=['downloads_count'])
+        counters.increment(note, 'downloads_count')
         return Response({'download_url': note.file.url})
     
     @action(detail=False, methods=['get'])
     def free_resources(self, request):
         file_type = request.query_params.get('type')
-        queryset = Note.objects.filter(is_active=True, is_free=True)
+        queryset = Note.objects.filter(is_active=True, is_free=True).select_related('subject', 'topic__subject')
         
         if file_type:
             queryset = queryset.filter(file_type=file_type)
         
-        serializer = self.get_serializer(queryset, many=True)
-        return Response(serializer.data)
+        return conditional_get(
+            request, [queryset_state(queryset)],
+            lambda: Response(self.get_serializer(queryset, many=True).data),
+            per_user=False
+        )
 
 
 class ResourceViewSet(viewsets.ModelViewSet):
@@ -261,26 +261,70 @@ class ResourceViewSet(viewsets.ModelViewSet):
         return queryset
 
 
+# Relations LectureListSerializer reads, seen from a row pointing at a lecture.
+WATCHED_LECTURE = ('lecture__subject', 'lecture__topic', 'lecture__teacher')
+
+
+class WatchHistoryPagination(KeysetPagination):
+    ordering = ('-last_watched_at', '-id')
+
+
 class WatchHistoryViewSet(viewsets.ModelViewSet):
     serializer_class = WatchHistorySerializer
     permission_classes = [permissions.IsAuthenticated]
+    pagination_class = WatchHistoryPagination
     
     def get_queryset(self):
         user = self.request.user
         if user.is_parent():
             children_ids = user.children.values_list('id', flat=True) if hasattr(user, 'children') else []
-            return WatchHistory.objects.filter(user_id__in=children_ids)
-        return WatchHistory.objects.filter(user=user)
+            queryset = WatchHistory.objects.filter(user_id__in=children_ids)
+        else:
+            queryset = WatchHistory.objects.filter(user=user)
+        return queryset.select_related(*WATCHED_LECTURE)
     
     def perform_create(self, serializer):
-        serializer.save(user=self.request.user)
+        history = serializer.save(user=self.request.user)
+        if history.is_completed:
+            progress.lecture_completed(history)
+    
+    def perform_update(self, serializer):
+        was_completed = serializer.instance.is_completed
+        history = serializer.save()
+        if history.is_completed and not was_completed:
+            progress.lecture_completed(history)
+    
+    @action(detail=False, methods=['post'])
+    def heartbeats(self, request):
+        serializer = HeartbeatBatchSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        beats = [
+            (item.pop('lecture_id'), watch_progress.heartbeat(**item))
+            for item in serializer.validated_data['heartbeats']
+        ]
+        requested = {lecture_id for lecture_id, _ in beats}
+        
+        user = request.user
+        lectures = Lecture.objects.filter(pk__in=requested, is_active=True)
+        if not (user.is_teacher() or user.is_platform_admin()):
+            lectures = lectures.filter(
+                Q(is_demo=True) | Q(is_free=True) |
+                Q(batch_id__in=entitlements.active_batch_ids(request))
+            )
+        allowed = set(lectures.values_list('pk', flat=True).distinct())
+        
+        watch_progress.record(user.pk, [(pk, beat) for pk, beat in beats if pk in allowed])
+        return Response({
+            'accepted': len(allowed),
+            'rejected': sorted(requested - allowed),
+        }, status=status.HTTP_202_ACCEPTED)
     
     @action(detail=False, methods=['get'])
     def continue_watching(self, request):
         history = WatchHistory.objects.filter(
             user=request.user,
             is_completed=False
-        ).select_related('lecture', 'lecture__subject')[:10]
+        ).select_related(*WATCHED_LECTURE)[:10]
         serializer = self.get_serializer(history, many=True)
         return Response(serializer.data)
     
@@ -289,7 +333,7 @@ class WatchHistoryViewSet(viewsets.ModelViewSet):
         history = WatchHistory.objects.filter(
             user=request.user,
             is_completed=True
-        ).select_related('lecture')
+        ).select_related(*WATCHED_LECTURE)
         serializer = self.get_serializer(history, many=True)
         return Response(serializer.data)
 
@@ -299,7 +343,9 @@ class BookmarkViewSet(viewsets.ModelViewSet):
     permission_classes = [permissions.IsAuthenticated]
     
     def get_queryset(self):
-        return Bookmark.objects.filter(user=self.request.user)
+        return Bookmark.objects.filter(user=self.request.user).select_related(
+            *WATCHED_LECTURE, 'note__subject', 'note__topic__subject'
+        )
     
     def perform_create(self, serializer):
         serializer.save(user=self.request.user)
@@ -0,0 +1,115 @@
+"""
+Ingestion path for player heartbeats.
+
+Heartbeats are coalesced per (user, lecture) in a write-behind buffer: the
+furthest watched_duration, the most recent last_position and a sticky
+is_completed survive. Each flush locks the existing WatchHistory rows once to
+work out what changed, writes all of them with one
+``INSERT ... ON CONFLICT DO UPDATE`` that keeps ``GREATEST(watched_duration)``,
+and feeds the resulting minute and completion deltas to DailyActivity and
+UserProgress in the same transaction.
+"""
+
+import time
+from collections import Counter, defaultdict
+
+from django.db import transaction
+from django.utils import timezone
+
+from padhoplus.analytics import progress
+from padhoplus.counters import WriteBehindBuffer
+from padhoplus.upsert import upsert
+from .models import Lecture, WatchHistory
+
+
+class HeartbeatBuffer(WriteBehindBuffer):
+    interval_setting = 'WATCH_PROGRESS_FLUSH_INTERVAL'
+
+    def _merge(self, pending, key, beat):
+        current = pending.get(key)
+        if current is None:
+            pending[key] = dict(beat)
+            return
+        current['watched_duration'] = max(current['watched_duration'], beat['watched_duration'])
+        current['is_completed'] = current['is_completed'] or beat['is_completed']
+        if beat['received_at'] >= current['received_at']:
+            current['last_position'] = beat['last_position']
+            current['received_at'] = beat['received_at']
+
+    def _write(self, pending):
+        now = timezone.now()
+        today = timezone.localdate(now)
+        user_ids = {user_id for user_id, _ in pending}
+        lecture_ids = {lecture_id for _, lecture_id in pending}
+
+        with transaction.atomic():
+            lectures = {
+                pk: (batch_id, subject_id, topic_id)
+                for pk, batch_id, subject_id, topic_id in Lecture.objects.filter(
+                    pk__in=lecture_ids
+                ).values_list('pk', 'batch_id', 'subject_id', 'topic_id')
+            }
+            existing = {
+                (user_id, lecture_id): (watched, completed)
+                for user_id, lecture_id, watched, completed in WatchHistory.objects.select_for_update().filter(
+                    user_id__in=user_ids, lecture_id__in=lecture_ids
+                ).order_by('user_id', 'lecture_id').values_list(
+                    'user_id', 'lecture_id', 'watched_duration', 'is_completed'
+                )
+            }
+
+            rows = []
+            activity = defaultdict(Counter)
+            subject_progress = defaultdict(Counter)
+            # Sorted so concurrent flushes lock and insert rows in the same order.
+            for (user_id, lecture_id), beat in sorted(pending.items()):
+                if lecture_id not in lectures:
+                    continue
+                watched, was_completed = existing.get((user_id, lecture_id), (0, False))
+                rows.append({
+                    'user_id': user_id,
+                    'lecture_id': lecture_id,
+                    'watched_duration': beat['watched_duration'],
+                    'last_position': beat['last_position'],
+                    'is_completed': beat['is_completed'],
+                    'completed_at': now if beat['is_completed'] else None,
+                    'first_watched_at': now,
+                    'last_watched_at': now,
+                })
+
+                # Whole minutes crossed since the stored duration, so minute
+                # totals stay exact however finely heartbeats split the time.
+                minutes = max(beat['watched_duration'], watched) // 60 - watched // 60
+                completed = int(beat['is_completed'] and not was_completed)
+                for deltas in (activity[(user_id, today)], subject_progress[(user_id, *lectures[lecture_id])]):
+                    deltas['time_spent_minutes'] += minutes
+                    deltas['lectures_watched'] += completed
+
+            upsert(WatchHistory, rows, ['user_id', 'lecture_id'], {
+                'watched_duration': '{greatest}({table}.watched_duration, EXCLUDED.watched_duration)',
+                'last_position': 'EXCLUDED.last_position',
+                'is_completed': '{table}.is_completed OR EXCLUDED.is_completed',
+                'completed_at': 'COALESCE({table}.completed_at, EXCLUDED.completed_at)',
+                'last_watched_at': 'EXCLUDED.last_watched_at',
+            })
+            progress.record_activity(activity)
+            progress.increment_progress(subject_progress)
+        return len(rows)
+
+
+buffer = HeartbeatBuffer()
+
+
+def heartbeat(watched_duration=0, last_position=0, is_completed=False):
+    return {
+        'watched_duration': max(0, int(watched_duration)),
+        'last_position': max(0, int(last_position)),
+        'is_completed': bool(is_completed),
+        'received_at': time.monotonic(),
+    }
+
+
+def record(user_id, beats):
+    """Queue ``(lecture_id, heartbeat)`` pairs for ``user_id``."""
+    for lecture_id, beat in beats:
+        buffer.add((user_id, lecture_id), beat)
@@ -0,0 +1,124 @@
+"""
+Write-behind buffers for hot, high-frequency writes.
+
+``WriteBehindBuffer`` aggregates pending writes per key in process memory and
+hands them to ``_write`` from a daemon thread every ``<interval_setting>``
+seconds. If a write fails, the pending values are merged back for the next
+attempt, so they are delayed rather than lost. Anything still pending is
+flushed again at interpreter exit, which covers graceful worker shutdown. An
+interval of 0 writes each value straight through.
+
+``buffer`` applies that to view/download counters: each flush runs one
+``UPDATE ... SET field = field + delta`` per distinct (model, field, delta)
+inside a transaction.
+"""
+
+import atexit
+import logging
+import threading
+from collections import defaultdict
+
+from django.conf import settings
+from django.db import connections, transaction
+from django.db.models import F
+
+logger = logging.getLogger(__name__)
+
+
+class WriteBehindBuffer:
+    interval_setting = None
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._pending = {}
+        self._stopped = threading.Event()
+        self._flusher = None
+        atexit.register(self.shutdown)
+
+    def _merge(self, pending, key, value):
+        """Fold ``value`` into ``pending[key]``; called with the lock held."""
+        raise NotImplementedError
+
+    def _write(self, pending):
+        """Persist ``pending`` and return the number of rows written."""
+        raise NotImplementedError
+
+    def write_through(self, key, value):
+        """Write a single value synchronously, bypassing the buffer."""
+        pending = {}
+        self._merge(pending, key, value)
+        return self._write(pending)
+
+    def add(self, key, value):
+        interval = getattr(settings, self.interval_setting)
+        if interval <= 0:
+            self.write_through(key, value)
+            return
+        with self._lock:
+            self._merge(self._pending, key, value)
+            if self._flusher is None or not self._flusher.is_alive():
+                self._flusher = threading.Thread(
+                    target=self._run, args=(interval,),
+                    name=f'{type(self).__name__}-flush', daemon=True
+                )
+                self._flusher.start()
+
+    def flush(self):
+        """Write everything buffered so far; returns the number of rows written."""
+        with self._lock:
+            pending, self._pending = self._pending, {}
+        if not pending:
+            return 0
+        try:
+            return self._write(pending)
+        except Exception:
+            with self._lock:
+                for key, value in pending.items():
+                    self._merge(self._pending, key, value)
+            raise
+
+    def _run(self, interval):
+        while not self._stopped.wait(interval):
+            try:
+                self.flush()
+            except Exception:
+                logger.exception('%s flush failed; values kept for the next attempt', type(self).__name__)
+            finally:
+                # The flusher thread owns its connections; don't leave them idle.
+                connections.close_all()
+
+    def shutdown(self):
+        self._stopped.set()
+        try:
+            self.flush()
+        except Exception:
+            logger.exception('Final %s flush failed', type(self).__name__)
+
+
+class CounterBuffer(WriteBehindBuffer):
+    interval_setting = 'COUNTER_FLUSH_INTERVAL'
+
+    def _merge(self, pending, key, value):
+        pending[key] = pending.get(key, 0) + value
+
+    def _write(self, pending):
+        groups = defaultdict(list)
+        for (model, pk, field), delta in pending.items():
+            if delta:
+                groups[(model, field, delta)].append(pk)
+        updated = 0
+        with transaction.atomic():
+            for (model, field, delta), pks in groups.items():
+                updated += model._default_manager.filter(pk__in=pks).update(
+                    **{field: F(field) + delta}
+                )
+        return updated
+
+
+buffer = CounterBuffer()
+
+
+def increment(instance, field, amount=1):
+    """Buffer ``amount`` for ``instance.<field>`` and reflect it on the instance."""
+    buffer.add((type(instance), instance.pk, field), amount)
+    setattr(instance, field, getattr(instance, field) + amount)
@@ -4,3 +4,6 @@ class DoubtsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'padhoplus.doubts'
     verbose_name = 'Doubts'
+    
+    def ready(self):
+        from . import signals  # noqa: F401
@@ -0,0 +1,89 @@
+import random
+import statistics
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.db.models import Q
+
+from padhoplus import search
+from padhoplus.batches.models import Subject
+from padhoplus.doubts.models import Doubt
+from padhoplus.users.models import User
+
+WORDS = (
+    'projectile motion velocity acceleration friction torque momentum collision '
+    'electrostatics capacitor inductance magnetic flux optics refraction lens '
+    'thermodynamics entropy enthalpy equilibrium kinetics titration oxidation '
+    'hybridisation isomerism polymer benzene alkane aldehyde integration '
+    'differentiation limits matrices determinant probability permutation '
+    'parabola ellipse hyperbola vector trigonometry sequence series complex'
+).split()
+
+DEFAULT_QUERIES = ['projectile motion', 'entropy', 'capacitor charge', 'hyperbol', 'titraton']
+
+
+class Command(BaseCommand):
+    help = 'Compares doubt search latency of the full-text path against the icontains baseline'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=500000, help='Synthetic doubts to generate')
+        parser.add_argument('--repeat', type=int, default=20, help='Timed runs per query and path')
+        parser.add_argument('--query', action='append', dest='queries', help='Search text (repeatable)')
+        parser.add_argument('--keep', action='store_true', help='Commit the synthetic rows instead of rolling back')
+
+    def handle(self, *args, **options):
+        if not search.is_supported():
+            self.stdout.write(self.style.WARNING(
+                'Full-text search needs PostgreSQL; both paths fall back to icontains here.'
+            ))
+
+        with transaction.atomic():
+            self.generate(options['rows'])
+            for text in options['queries'] or DEFAULT_QUERIES:
+                baseline = Doubt.objects.filter(Q(title__icontains=text) | Q(description__icontains=text))
+                indexed = search.apply_search(Doubt.objects.all(), text)
+                self.report(text, 'icontains', self.measure(baseline, options['repeat']))
+                self.report(text, 'full-text', self.measure(indexed, options['repeat']))
+            if not options['keep']:
+                transaction.set_rollback(True)
+
+    def generate(self, rows):
+        student, _ = User.objects.get_or_create(username='search_benchmark')
+        subject, _ = Subject.objects.get_or_create(slug='search-benchmark', defaults={'name': 'Search Benchmark'})
+        rng = random.Random(42)
+        started = time.perf_counter()
+        batch_size = 5000
+        for offset in range(0, rows, batch_size):
+            Doubt.objects.bulk_create([
+                Doubt(
+                    student=student,
+                    subject=subject,
+                    title=' '.join(rng.choices(WORDS, k=6)),
+                    description=' '.join(rng.choices(WORDS, k=40)),
+                )
+                for _ in range(min(batch_size, rows - offset))
+            ])
+        # bulk_create skips post_save, so vectors are filled in with one UPDATE.
+        search.refresh_search_vectors(Doubt.objects.filter(subject=subject))
+        if connection.vendor == 'postgresql':
+            with connection.cursor() as cursor:
+                cursor.execute('ANALYZE doubts')
+        self.stdout.write(f'Generated {rows} doubts in {time.perf_counter() - started:.1f}s')
+
+    def measure(self, queryset, repeat):
+        # Mirrors a list request: one COUNT for the paginator plus the first page.
+        timings = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            queryset.count()
+            list(queryset[:20])
+            timings.append((time.perf_counter() - started) * 1000)
+        return timings
+
+    def report(self, text, label, timings):
+        timings.sort()
+        p95 = timings[min(len(timings) - 1, int(len(timings) * 0.95))]
+        self.stdout.write(
+            f'{text!r:24} {label:10} median {statistics.median(timings):8.2f} ms   p95 {p95:8.2f} ms'
+        )
@@ -0,0 +1,46 @@
+# Generated by Django 5.2.8 on 2026-10-18 15:11
+
+import django.contrib.postgres.search
+from django.contrib.postgres.operations import TrigramExtension
+from django.contrib.postgres.search import SearchVector
+from django.db import migrations
+
+
+def create_search_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    Doubt = apps.get_model('doubts', 'Doubt')
+    Doubt.objects.update(search_vector=(
+        SearchVector('title', weight='A', config='english') +
+        SearchVector('description', weight='B', config='english')
+    ))
+    schema_editor.execute(
+        'CREATE INDEX IF NOT EXISTS doubts_search_vector_gin ON doubts USING gin (search_vector)'
+    )
+    schema_editor.execute(
+        'CREATE INDEX IF NOT EXISTS doubts_title_trgm ON doubts USING gin (title gin_trgm_ops)'
+    )
+
+
+def drop_search_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute('DROP INDEX IF EXISTS doubts_search_vector_gin')
+    schema_editor.execute('DROP INDEX IF EXISTS doubts_title_trgm')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('doubts', '0002_initial'),
+    ]
+
+    operations = [
+        TrigramExtension(),
+        migrations.AddField(
+            model_name='doubt',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.RunPython(create_search_indexes, drop_search_indexes),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 5.2.8 on 2026-10-18 15:59
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('batches', '0006_search_vector'),
+        ('content', '0004_keyset_pagination_indexes'),
+        ('doubts', '0003_search_vector'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='doubt',
+            index=models.Index(fields=['-created_at', '-id'], name='doubt_keyset_idx'),
+        ),
+    ]
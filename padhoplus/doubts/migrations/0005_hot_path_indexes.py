@@ -0,0 +1,25 @@
+# Generated by Django 5.2.8 on 2026-10-18 16:03
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('batches', '0007_hot_path_indexes'),
+        ('content', '0005_hot_path_indexes'),
+        ('doubts', '0004_keyset_pagination_indexes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='doubt',
+            index=models.Index(condition=models.Q(('is_public', True)), fields=['-created_at', '-id'], name='doubt_public_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='doubt',
+            index=models.Index(condition=models.Q(('is_resolved', False)), fields=['status', 'created_at'], name='doubt_open_status_idx'),
+        ),
+    ]
@@ -1,3 +1,4 @@
+from django.contrib.postgres.search import SearchVectorField
 from django.db import models
 from padhoplus.users.models import User
 from padhoplus.batches.models import Subject, Topic
@@ -45,6 +46,8 @@ class Doubt(models.Model):
     views_count = models.IntegerField(default=0)
     upvotes = models.IntegerField(default=0)
     
+    search_vector = SearchVectorField(null=True, editable=False)
+    
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     resolved_at = models.DateTimeField(blank=True, null=True)
@@ -52,6 +55,18 @@ class Doubt(models.Model):
     class Meta:
         db_table = 'doubts'
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['-created_at', '-id'], name='doubt_keyset_idx'),
+            models.Index(
+                fields=['-created_at', '-id'], name='doubt_public_idx',
+                condition=models.Q(is_public=True)
+            ),
+            # Teacher queues: open doubts by status, oldest first.
+            models.Index(
+                fields=['status', 'created_at'], name='doubt_open_status_idx',
+                condition=models.Q(is_resolved=False)
+            ),
+        ]
     
     def __str__(self):
         return f"{self.student.username} - {self.title[:50]}"
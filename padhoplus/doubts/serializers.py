@@ -44,7 +44,8 @@ class DoubtSerializer(serializers.ModelSerializer):
         ]
     
     def get_response_count(self, obj):
-        return obj.responses.count()
+        count = getattr(obj, 'responses_count', None)
+        return obj.responses.count() if count is None else count
 
 
 class DoubtListSerializer(serializers.ModelSerializer):
@@ -63,4 +64,5 @@ class DoubtListSerializer(serializers.ModelSerializer):
         ]
     
     def get_response_count(self, obj):
-        return obj.responses.count()
+        count = getattr(obj, 'responses_count', None)
+        return obj.responses.count() if count is None else count
@@ -0,0 +1,10 @@
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+
+from padhoplus import search
+from .models import Doubt
+
+
+@receiver(post_save, sender=Doubt)
+def doubt_saved(sender, instance, update_fields=None, **kwargs):
+    search.refresh_instance(instance, update_fields)
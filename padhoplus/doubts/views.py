@@ -2,7 +2,10 @@ from rest_framework import viewsets, status, permissions
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from django.utils import timezone
-from django.db.models import Q
+from django.db.models import Count, OuterRef, Prefetch, Q, Subquery
+from django.db.models.functions import Coalesce
+from padhoplus import counters, search as search_backend
+from padhoplus.pagination import KeysetPagination
 from .models import Doubt, DoubtResponse, DoubtUpvote
 from .serializers import (
     DoubtSerializer, DoubtListSerializer, DoubtResponseSerializer
@@ -22,9 +25,27 @@ class IsOwnerOrTeacherOrAdmin(permissions.BasePermission):
         return False
 
 
+def for_list(queryset):
+    """What DoubtListSerializer reads, fetched with the doubts."""
+    # A subquery rather than Count('responses'): it needs no GROUP BY, so
+    # paginators still count the doubts with a plain COUNT(*).
+    responses = DoubtResponse.objects.filter(
+        doubt=OuterRef('pk')
+    ).order_by().values('doubt').annotate(total=Count('pk')).values('total')
+    return queryset.select_related('student', 'subject', 'topic').annotate(
+        responses_count=Coalesce(Subquery(responses), 0)
+    )
+
+
+def pending_queue():
+    """Doubts waiting for a teacher; resolving a doubt also closes it."""
+    return Doubt.objects.filter(is_resolved=False, status='pending')
+
+
 class DoubtViewSet(viewsets.ModelViewSet):
     queryset = Doubt.objects.all()
     permission_classes = [permissions.IsAuthenticatedOrReadOnly]
+    pagination_class = KeysetPagination
     
     def get_serializer_class(self):
         if self.action == 'list':
@@ -67,27 +88,28 @@ class DoubtViewSet(viewsets.ModelViewSet):
         if status_param:
             queryset = queryset.filter(status=status_param)
         if search:
-            queryset = queryset.filter(
-                Q(title__icontains=search) | Q(description__icontains=search)
-            )
+            queryset = search_backend.apply_search(queryset, search)
         if my_doubts and user.is_authenticated:
             queryset = queryset.filter(student=user)
         
-        return queryset.select_related('student', 'subject', 'topic', 'assigned_to')
+        if self.action == 'list':
+            return for_list(queryset)
+        return queryset.select_related('student', 'subject', 'topic__subject', 'assigned_to').prefetch_related(
+            Prefetch('responses', queryset=DoubtResponse.objects.select_related('responder'))
+        )
     
     def perform_create(self, serializer):
         serializer.save(student=self.request.user)
     
     def retrieve(self, request, *args, **kwargs):
         instance = self.get_object()
-        instance.views_count += 1
-        instance.save(update_fields=['views_count'])
+        counters.increment(instance, 'views_count')
         serializer = self.get_serializer(instance)
         return Response(serializer.data)
     
     @action(detail=False, methods=['get'], permission_classes=[permissions.IsAuthenticated])
     def my_doubts(self, request):
-        doubts = Doubt.objects.filter(student=request.user)
+        doubts = for_list(Doubt.objects.filter(student=request.user))
         serializer = DoubtListSerializer(doubts, many=True)
         return Response(serializer.data)
     
@@ -98,7 +120,7 @@ class DoubtViewSet(viewsets.ModelViewSet):
                 {'error': 'Only teachers can view assigned doubts'},
                 status=status.HTTP_403_FORBIDDEN
             )
-        doubts = Doubt.objects.filter(assigned_to=request.user, is_resolved=False)
+        doubts = for_list(Doubt.objects.filter(assigned_to=request.user, is_resolved=False))
         serializer = DoubtListSerializer(doubts, many=True)
         return Response(serializer.data)
     
@@ -109,7 +131,7 @@ class DoubtViewSet(viewsets.ModelViewSet):
                 {'error': 'Only teachers and admins can view pending doubts'},
                 status=status.HTTP_403_FORBIDDEN
             )
-        doubts = Doubt.objects.filter(status='pending')
+        doubts = for_list(pending_queue())
         serializer = DoubtListSerializer(doubts, many=True)
         return Response(serializer.data)
     
@@ -189,7 +211,7 @@ class DoubtResponseViewSet(viewsets.ModelViewSet):
         return [permissions.IsAuthenticated()]
     
     def get_queryset(self):
-        queryset = DoubtResponse.objects.all()
+        queryset = DoubtResponse.objects.select_related('responder')
         doubt = self.request.query_params.get('doubt')
         if doubt:
             queryset = queryset.filter(doubt_id=doubt)
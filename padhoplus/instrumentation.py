@@ -0,0 +1,241 @@
+"""
+Per-request query and latency instrumentation.
+
+``RequestMetricsMiddleware`` wraps every database connection with an
+``execute_wrapper`` for the duration of a request and records how many
+queries ran, the time spent in them, how often the same SQL was repeated
+(the signature of an N+1) and the time DRF serializers spent producing
+``.data``. Each response carries them in a ``Server-Timing`` header and they
+are logged on the ``padhoplus.instrumentation`` logger, at WARNING when one
+statement repeated ``REQUEST_METRICS_DUPLICATE_THRESHOLD`` times or more.
+
+Durations and query counts are also aggregated per route (the URL name) and
+action (the viewset action, or the HTTP method for plain views) into
+fixed-bucket histograms. ``metrics`` serves them to admins in the
+Prometheus text format, with p50/p95/p99 estimated from the buckets. The
+histograms live in the worker process, so each worker reports its own.
+"""
+
+import logging
+import math
+import threading
+import time
+from collections import Counter
+from contextlib import ExitStack
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import connections
+from django.http import HttpResponse
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.serializers import BaseSerializer
+
+from padhoplus.permissions import IsAdmin
+
+logger = logging.getLogger(__name__)
+
+QUANTILES = (0.5, 0.95, 0.99)
+SECONDS_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+QUERY_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 200, 500)
+
+_current = ContextVar('request_metrics', default=None)
+
+
+class RequestMetrics:
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.queries = 0
+        self.sql_time = 0.0
+        self.statements = Counter()
+        self.serializer_time = 0.0
+        self.serializing = False
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.sql_time += time.perf_counter() - start
+            self.queries += 1
+            self.statements[sql] += 1
+
+    @property
+    def duplicates(self):
+        """Queries that repeated a statement already run in this request."""
+        return self.queries - len(self.statements)
+
+    def server_timing(self, duration):
+        return ', '.join([
+            f'db;dur={self.sql_time * 1000:.1f};desc="{self.queries} queries, {self.duplicates} duplicate"',
+            f'serializer;dur={self.serializer_time * 1000:.1f}',
+            f'total;dur={duration * 1000:.1f}',
+        ])
+
+
+class Histogram:
+    def __init__(self, bounds):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.total = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def observe(self, value):
+        self.counts[next((i for i, bound in enumerate(self.bounds) if value <= bound), len(self.bounds))] += 1
+        self.total += 1
+        self.sum += value
+        self.max = max(self.max, value)
+
+    def quantile(self, q):
+        """Estimate by linear interpolation inside the bucket holding the q-th observation."""
+        if not self.total:
+            return math.nan
+        rank, seen = q * self.total, 0
+        for i, count in enumerate(self.counts):
+            if count and seen + count >= rank:
+                lower = self.bounds[i - 1] if i else 0
+                upper = self.bounds[i] if i < len(self.bounds) else self.max
+                return min(lower + (upper - lower) * (rank - seen) / count, self.max)
+            seen += count
+        return self.max
+
+
+class Registry:
+    """Histograms per (metric, route, action), shared by the threads of a worker."""
+
+    METRICS = {
+        'request_duration_seconds': ('Time to produce the response.', SECONDS_BUCKETS),
+        'request_sql_seconds': ('Time spent executing SQL.', SECONDS_BUCKETS),
+        'request_serializer_seconds': ('Time spent in DRF serializers.', SECONDS_BUCKETS),
+        'request_queries': ('SQL queries executed.', QUERY_BUCKETS),
+        'request_duplicate_queries': ('Queries repeating a statement of the same request.', QUERY_BUCKETS),
+    }
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.histograms = {}
+
+    def observe(self, route, action, values):
+        with self.lock:
+            for name, value in values.items():
+                key = (name, route, action)
+                if key not in self.histograms:
+                    self.histograms[key] = Histogram(self.METRICS[name][1])
+                self.histograms[key].observe(value)
+
+    def clear(self):
+        with self.lock:
+            self.histograms.clear()
+
+    def render(self):
+        lines = []
+        with self.lock:
+            for name, (help_text, _) in self.METRICS.items():
+                series = sorted((key[1:], histogram) for key, histogram in self.histograms.items() if key[0] == name)
+                lines += [f'# HELP padhoplus_{name} {help_text}', f'# TYPE padhoplus_{name} summary']
+                for (route, action), histogram in series:
+                    labels = f'route="{_escape(route)}",action="{_escape(action)}"'
+                    lines += [
+                        f'padhoplus_{name}{{{labels},quantile="{q}"}} {histogram.quantile(q):.6g}' for q in QUANTILES
+                    ]
+                    lines += [
+                        f'padhoplus_{name}_sum{{{labels}}} {histogram.sum:.6g}',
+                        f'padhoplus_{name}_count{{{labels}}} {histogram.total}',
+                    ]
+        return '\n'.join(lines) + '\n'
+
+
+registry = Registry()
+
+
+def _escape(value):
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _timed(data):
+    def timed_data(serializer):
+        metrics = _current.get()
+        if metrics is None or metrics.serializing:
+            return data(serializer)
+        metrics.serializing = True
+        start = time.perf_counter()
+        try:
+            return data(serializer)
+        finally:
+            metrics.serializing = False
+            metrics.serializer_time += time.perf_counter() - start
+    timed_data.untimed = data
+    return timed_data
+
+
+def install():
+    """Time ``BaseSerializer.data``, which every serializer's ``.data`` goes through."""
+    if not hasattr(BaseSerializer.data.fget, 'untimed'):
+        BaseSerializer.data = property(_timed(BaseSerializer.data.fget))
+
+
+def route_of(request):
+    match = getattr(request, 'resolver_match', None)
+    if match is None:
+        return 'unmatched', request.method.lower()
+    actions = getattr(match.func, 'actions', None) or {}
+    return match.view_name or match.route, actions.get(request.method.lower(), request.method.lower())
+
+
+class RequestMetricsMiddleware:
+    def __init__(self, get_response):
+        self.get_response = get_response
+        install()
+
+    def __call__(self, request):
+        if not settings.REQUEST_METRICS_ENABLED:
+            return self.get_response(request)
+
+        metrics = RequestMetrics()
+        token = _current.set(metrics)
+        try:
+            with ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(connection.execute_wrapper(metrics))
+                response = self.get_response(request)
+        finally:
+            _current.reset(token)
+
+        duration = time.perf_counter() - metrics.started
+        response['Server-Timing'] = metrics.server_timing(duration)
+        self.record(request, response, metrics, duration)
+        return response
+
+    def record(self, request, response, metrics, duration):
+        route, action = route_of(request)
+        registry.observe(route, action, {
+            'request_duration_seconds': duration,
+            'request_sql_seconds': metrics.sql_time,
+            'request_serializer_seconds': metrics.serializer_time,
+            'request_queries': metrics.queries,
+            'request_duplicate_queries': metrics.duplicates,
+        })
+
+        repeated, times = metrics.statements.most_common(1)[0] if metrics.statements else ('', 0)
+        noisy = times >= settings.REQUEST_METRICS_DUPLICATE_THRESHOLD
+        fields = {
+            'method': request.method, 'path': request.path, 'route': route, 'action': action,
+            'status': response.status_code, 'duration_ms': round(duration * 1000, 1),
+            'queries': metrics.queries, 'duplicate_queries': metrics.duplicates,
+            'sql_ms': round(metrics.sql_time * 1000, 1),
+            'serializer_ms': round(metrics.serializer_time * 1000, 1),
+        }
+        if noisy:
+            fields.update(repeated_sql=repeated, repeated_times=times)
+        logger.log(
+            logging.WARNING if noisy else logging.INFO,
+            ' '.join(f'{key}={value}' for key, value in fields.items() if key != 'repeated_sql'),
+            extra={'request_metrics': fields},
+        )
+
+
+@api_view(['GET'])
+@permission_classes([IsAdmin])
+def metrics(request):
+    """Per-route request metrics of this worker in Prometheus text format."""
+    return HttpResponse(registry.render(), content_type='text/plain; version=0.0.4; charset=utf-8')
@@ -0,0 +1,318 @@
+"""
+In-process load benchmark against the WSGI application.
+
+``Population`` samples students from a generated dataset (see the
+``generate_load_data`` command), logs each one in with a server-side session
+and collects what the scenarios need: the batches, lectures and live tests
+each student is enrolled in. ``WSGIClient`` builds WSGI environs and calls the
+project's WSGI application directly, so every request runs the full
+middleware, URL routing, authentication and view stack without a socket.
+
+Each ``SCENARIOS`` entry replays one realistic request sequence:
+
+* ``catalog``: batch list, featured batches, a batch page and demo lectures;
+* ``heartbeats``: a burst of watch-progress heartbeats for enrolled lectures;
+* ``mock_test``: start a live mock test, autosave answers in several batches
+  and submit, each student sitting each test once;
+* ``doubts``: the doubt feed, its next page and one doubt.
+
+``Benchmark.run`` picks scenarios by weight from worker threads until it has
+run the requested iterations or duration, timing every request. The report
+has throughput and p50/p95/p99 latency per endpoint, named by URL name.
+"""
+
+import io
+import json
+import logging
+import math
+import threading
+import time
+from collections import defaultdict
+from importlib import import_module
+from random import Random
+from urllib.parse import urlencode, urlsplit
+from wsgiref.util import setup_testing_defaults
+
+from django.conf import settings
+from django.contrib.auth import BACKEND_SESSION_KEY, HASH_SESSION_KEY, SESSION_KEY
+from django.core.wsgi import get_wsgi_application
+from django.db import connections
+from django.middleware.csrf import CSRF_ALLOWED_CHARS
+from django.urls import resolve, reverse
+from django.utils.crypto import get_random_string
+
+from padhoplus.assessments.models import Test, TestAttempt
+from padhoplus.batches.models import Batch, Enrollment
+from padhoplus.content.models import Lecture
+from padhoplus.users.models import User
+
+logger = logging.getLogger(__name__)
+
+QUANTILES = (0.5, 0.95, 0.99)
+
+
+class Recorder:
+    """Request durations and failures per endpoint, shared by the worker threads."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.durations = defaultdict(list)
+        self.errors = defaultdict(int)
+
+    def record(self, endpoint, duration, failed):
+        with self.lock:
+            self.durations[endpoint].append(duration)
+            if failed:
+                self.errors[endpoint] += 1
+
+    def report(self, elapsed):
+        rows = []
+        for endpoint, durations in sorted(self.durations.items()):
+            durations = sorted(durations)
+            rows.append({
+                'endpoint': endpoint,
+                'requests': len(durations),
+                'errors': self.errors[endpoint],
+                'throughput': len(durations) / elapsed,
+                **{f'p{round(q * 100)}': percentile(durations, q) for q in QUANTILES},
+                'max': durations[-1],
+            })
+        return rows
+
+
+def percentile(ordered, q):
+    """Nearest-rank percentile of an ascending list."""
+    return ordered[max(0, math.ceil(q * len(ordered)) - 1)]
+
+
+class WSGIClient:
+    """Calls the WSGI application in-process as one logged-in student."""
+
+    def __init__(self, app, recorder, session_key=None):
+        self.app = app
+        self.recorder = recorder
+        self.csrf_token = get_random_string(32, CSRF_ALLOWED_CHARS)
+        cookies = {settings.CSRF_COOKIE_NAME: self.csrf_token}
+        if session_key:
+            cookies[settings.SESSION_COOKIE_NAME] = session_key
+        self.cookie = '; '.join(f'{name}={value}' for name, value in cookies.items())
+
+    def get(self, path, **query):
+        return self.request('GET', path, query=query)
+
+    def post(self, path, body=None):
+        return self.request('POST', path, body=body or {})
+
+    def follow(self, url):
+        """GET an absolute ``next``/``previous`` link from a paginated response."""
+        parts = urlsplit(url)
+        return self.request('GET', parts.path, query_string=parts.query)
+
+    def request(self, method, path, query=None, body=None, query_string=''):
+        payload = json.dumps(body).encode() if body is not None else b''
+        environ = {
+            'REQUEST_METHOD': method,
+            'PATH_INFO': path,
+            'QUERY_STRING': query_string or urlencode(query or {}),
+            'CONTENT_TYPE': 'application/json',
+            'CONTENT_LENGTH': str(len(payload)),
+            'HTTP_ACCEPT': 'application/json',
+            'HTTP_COOKIE': self.cookie,
+            'HTTP_X_CSRFTOKEN': self.csrf_token,
+            'wsgi.input': io.BytesIO(payload),
+            'wsgi.multithread': True,
+        }
+        setup_testing_defaults(environ)
+        status = []
+
+        started = time.perf_counter()
+        result = self.app(environ, lambda line, headers, exc_info=None: status.append(int(line.split()[0])))
+        try:
+            content = b''.join(result)
+        finally:
+            # Fires request_finished, which returns the thread's DB connection.
+            if hasattr(result, 'close'):
+                result.close()
+        duration = time.perf_counter() - started
+
+        self.recorder.record(f'{method} {resolve(path).view_name}', duration, status[0] >= 400)
+        if status[0] >= 400:
+            raise RequestFailed(f'{method} {path} returned {status[0]}: {content[:200]!r}')
+        return json.loads(content) if content else None
+
+
+class RequestFailed(Exception):
+    pass
+
+
+class Population:
+    """Logged-in students of a generated dataset and what they are enrolled in."""
+
+    def __init__(self, prefix='load', students=200):
+        users = list(User.objects.filter(
+            username__startswith=f'{prefix}_student_', enrollments__status='active'
+        ).distinct().order_by('pk')[:students])
+        if not users:
+            raise ValueError(f'No enrolled students prefixed {prefix}_student_; run generate_load_data first.')
+        self.sessions = {user.pk: login(user) for user in users}
+        self.students = list(self.sessions)
+
+        self.batches = defaultdict(list)
+        for student, batch in Enrollment.objects.filter(
+            student__in=self.students, status='active'
+        ).values_list('student_id', 'batch_id'):
+            self.batches[student].append(batch)
+        enrolled = {batch for batches in self.batches.values() for batch in batches}
+
+        self.lectures = defaultdict(list)
+        for pk, batch in Lecture.objects.filter(batch__in=enrolled, is_active=True).values_list('pk', 'batch_id'):
+            self.lectures[batch].append(pk)
+        self.batch_slugs = list(Batch.objects.filter(is_active=True).values_list('slug', flat=True)[:500])
+
+        live = dict(Test.objects.filter(
+            batch__in=enrolled, status='live', is_active=True
+        ).values_list('pk', 'batch_id'))
+        self.questions = defaultdict(list)
+        for test, question in Test.questions.through.objects.filter(test__in=live).values_list(
+            'test_id', 'question_id'
+        ):
+            self.questions[test].append(question)
+        taken = set(TestAttempt.objects.filter(student__in=self.students, test__in=live).values_list(
+            'student_id', 'test_id'
+        ))
+        self.takers = [
+            (student, test) for student in self.students for test, batch in live.items()
+            if batch in self.batches[student] and (student, test) not in taken and self.questions[test]
+        ]
+        self.takers_lock = threading.Lock()
+
+    def next_taker(self):
+        """A student and a live test they have not started yet, or None once every pair has been used."""
+        with self.takers_lock:
+            return self.takers.pop() if self.takers else None
+
+
+def login(user):
+    """Create a server-side session for ``user``, as django.contrib.auth.login() would."""
+    session = import_module(settings.SESSION_ENGINE).SessionStore()
+    session[SESSION_KEY] = str(user.pk)
+    session[BACKEND_SESSION_KEY] = settings.AUTHENTICATION_BACKENDS[0]
+    session[HASH_SESSION_KEY] = user.get_session_auth_hash()
+    session.save()
+    return session.session_key
+
+
+def catalog(bench, rng):
+    client = bench.client(rng.choice(bench.population.students))
+    client.get(reverse('batch-list'))
+    client.get(reverse('batch-featured'))
+    client.get(reverse('batch-detail', args=[rng.choice(bench.population.batch_slugs)]))
+    client.get(reverse('lecture-demo'))
+
+
+def heartbeats(bench, rng):
+    student = rng.choice(bench.population.students)
+    client = bench.client(student)
+    lectures = [pk for batch in bench.population.batches[student] for pk in bench.population.lectures[batch]]
+    for position in range(30, 30 * (bench.heartbeats + 1), 30):
+        client.post(reverse('watch-history-heartbeats'), {'heartbeats': [
+            {'lecture_id': lecture, 'watched_duration': position, 'last_position': position}
+            for lecture in rng.sample(lectures, min(2, len(lectures)))
+        ]})
+
+
+def mock_test(bench, rng):
+    taker = bench.population.next_taker()
+    if taker is None:
+        return False
+    student, test = taker
+    client = bench.client(student)
+    attempt = client.post(reverse('test-start', args=[test]))['id']
+    questions = bench.population.questions[test]
+    per_save = math.ceil(len(questions) / bench.autosaves)
+    for sequence, offset in enumerate(range(0, len(questions), per_save), start=1):
+        client.post(reverse('test-attempt-save-responses', args=[attempt]), {'sequence': sequence, 'responses': [
+            {'question_id': question, 'selected_answer': rng.choice('ABCD'), 'time_spent_seconds': rng.randint(20, 240)}
+            for question in questions[offset:offset + per_save]
+        ]})
+    client.post(reverse('test-attempt-submit', args=[attempt]), {'time_taken_seconds': rng.randint(1800, 10800)})
+
+
+def doubts(bench, rng):
+    client = bench.client(rng.choice(bench.population.students))
+    page = client.get(reverse('doubt-list'), count='false')
+    if page['next']:
+        page = client.follow(page['next'])
+    if page['results']:
+        client.get(reverse('doubt-detail', args=[rng.choice(page['results'])['id']]))
+
+
+SCENARIOS = {'catalog': catalog, 'heartbeats': heartbeats, 'mock_test': mock_test, 'doubts': doubts}
+
+
+class Benchmark:
+    def __init__(self, population, mix, concurrency=4, heartbeats=5, autosaves=5, seed=42):
+        unknown = set(mix) - set(SCENARIOS)
+        if unknown:
+            raise ValueError(f'Unknown scenarios: {", ".join(sorted(unknown))}')
+        self.population = population
+        self.mix = mix
+        self.concurrency = concurrency
+        self.heartbeats = heartbeats
+        self.autosaves = autosaves
+        self.seed = seed
+        self.app = get_wsgi_application()
+        self.recorder = Recorder()
+        self.scenarios = defaultdict(lambda: {'runs': 0, 'failures': 0, 'skipped': 0})
+        self.lock = threading.Lock()
+
+    def client(self, student):
+        return WSGIClient(self.app, self.recorder, self.population.sessions[student])
+
+    def run(self, iterations=None, duration=None):
+        """Run scenarios until ``iterations`` have finished or ``duration`` seconds have passed."""
+        self.remaining = iterations
+        self.deadline = time.perf_counter() + duration if duration else None
+        started = time.perf_counter()
+        workers = [
+            threading.Thread(target=self.work, args=(Random(self.seed + n),), name=f'loadtest-{n}')
+            for n in range(self.concurrency)
+        ]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+        self.elapsed = time.perf_counter() - started
+        return self.recorder.report(self.elapsed)
+
+    def claim(self):
+        if self.deadline is not None and time.perf_counter() >= self.deadline:
+            return False
+        if self.remaining is None:
+            return True
+        with self.lock:
+            if self.remaining <= 0:
+                return False
+            self.remaining -= 1
+            return True
+
+    def work(self, rng):
+        names, weights = list(self.mix), list(self.mix.values())
+        try:
+            while self.claim():
+                name = rng.choices(names, weights)[0]
+                try:
+                    ran = SCENARIOS[name](self, rng) is not False
+                    failed = False
+                except RequestFailed:
+                    ran, failed = True, True
+                except Exception:
+                    # Counted like a failed request rather than ending the thread.
+                    logger.exception('Scenario %s raised', name)
+                    ran, failed = True, True
+                with self.lock:
+                    stats = self.scenarios[name]
+                    stats['runs' if ran else 'skipped'] += 1
+                    stats['failures'] += failed
+        finally:
+            connections.close_all()
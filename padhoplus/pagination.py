@@ -0,0 +1,127 @@
+"""
+Keyset pagination for long, append-mostly lists.
+
+``KeysetPagination`` pages through a queryset in a fixed ``ordering`` that
+ends in a unique column, e.g. ``('-created_at', '-id')``. The cursor holds
+the ordering values of the last (or, for ``previous`` links, the first) row
+of a page, and the next page is read with a row comparison on them, so every
+page costs the same index range scan however deep it is. Endpoints opt in by
+setting a subclass with their ordering as ``pagination_class`` and should
+have an index matching it.
+
+Responses keep the page-number shape (``count``, ``next``, ``previous``,
+``results``). ``?count=false`` skips the ``COUNT(*)`` for infinite-scroll
+clients. Requests with ``?page=`` and querysets that were explicitly
+ordered, such as ranked search results, fall back to page-number
+pagination.
+"""
+
+import base64
+import binascii
+import json
+
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination, PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+class KeysetPagination(BasePagination):
+    ordering = ('-created_at', '-id')
+    page_size = api_settings.PAGE_SIZE
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+    cursor_query_param = 'cursor'
+    count_query_param = 'count'
+    fallback_class = PageNumberPagination
+    invalid_cursor_message = 'Invalid cursor'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.fallback = None
+        if self.fallback_class.page_query_param in request.query_params or queryset.query.order_by:
+            self.fallback = self.fallback_class()
+            return self.fallback.paginate_queryset(queryset, request, view)
+
+        self.page_size = self.get_page_size(request)
+        self.fields = [queryset.model._meta.get_field(name.lstrip('-')) for name in self.ordering]
+        position, reverse = self.decode_cursor(request)
+        self.count = queryset.count() if self.wants_count(request) else None
+
+        ordering = [self.invert(name) for name in self.ordering] if reverse else list(self.ordering)
+        if position is not None:
+            queryset = queryset.filter(self.after(position, ordering))
+        rows = list(queryset.order_by(*ordering)[:self.page_size + 1])
+        more = len(rows) > self.page_size
+        rows = rows[:self.page_size]
+        if reverse:
+            rows.reverse()
+            self.has_next, self.has_previous = position is not None, more
+        else:
+            self.has_next, self.has_previous = more, position is not None
+        self.rows = rows
+        return rows
+
+    def get_paginated_response(self, data):
+        if self.fallback is not None:
+            return self.fallback.get_paginated_response(data)
+        body = {} if self.count is None else {'count': self.count}
+        body.update(next=self.get_next_link(), previous=self.get_previous_link(), results=data)
+        return Response(body)
+
+    def get_page_size(self, request):
+        try:
+            size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        return min(max(size, 1), self.max_page_size)
+
+    def wants_count(self, request):
+        return request.query_params.get(self.count_query_param, '').lower() not in ('0', 'false', 'no')
+
+    @staticmethod
+    def invert(name):
+        return name[1:] if name.startswith('-') else f'-{name}'
+
+    def after(self, position, ordering):
+        """Rows strictly after ``position`` in ``ordering``."""
+        condition, equal = Q(), {}
+        for name, field, value in zip(ordering, self.fields, position):
+            lookup = 'lt' if name.startswith('-') else 'gt'
+            condition |= Q(**equal, **{f'{field.attname}__{lookup}': value})
+            equal[field.attname] = value
+        return condition
+
+    def position(self, row):
+        return [field.value_to_string(row) for field in self.fields]
+
+    def encode_cursor(self, position, reverse):
+        payload = json.dumps({'p': position, 'r': int(reverse)}, separators=(',', ':'))
+        cursor = base64.urlsafe_b64encode(payload.encode()).decode()
+        return replace_query_param(self.request.build_absolute_uri(), self.cursor_query_param, cursor)
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None, False
+        try:
+            payload = json.loads(base64.urlsafe_b64decode(encoded.encode()))
+            position = [field.to_python(value) for field, value in zip(self.fields, payload['p'], strict=True)]
+            return position, bool(payload.get('r'))
+        except (binascii.Error, ValueError, TypeError, KeyError, AttributeError, ValidationError):
+            raise NotFound(self.invalid_cursor_message)
+
+    def get_next_link(self):
+        if not self.has_next or not self.rows:
+            return None
+        return self.encode_cursor(self.position(self.rows[-1]), reverse=False)
+
+    def get_previous_link(self):
+        if not self.has_previous:
+            return None
+        if not self.rows:
+            return remove_query_param(self.request.build_absolute_uri(), self.cursor_query_param)
+        return self.encode_cursor(self.position(self.rows[0]), reverse=True)
@@ -234,7 +234,7 @@ def payment_webhook(request):
 def check_payment_status(request, transaction_id):
     """Check payment status by transaction ID"""
     try:
-        payment = Payment.objects.get(
+        payment = Payment.objects.select_related('student', 'gateway').get(
             transaction_id=transaction_id,
             student=request.user
         )
@@ -274,7 +274,7 @@ def check_payment_status(request, transaction_id):
 @permission_classes([IsAuthenticated])
 def get_user_payments(request):
     """Get payment history for current user"""
-    payments = Payment.objects.filter(student=request.user)
+    payments = Payment.objects.filter(student=request.user).select_related('student', 'gateway')
     serializer = PaymentSerializer(payments, many=True)
     
     return Response({
@@ -0,0 +1,98 @@
+"""
+Hot queries and the indexes they are expected to use.
+
+Every ``@hot_query(index)`` function below builds the queryset one of the
+busiest request paths runs, in the same shape the view or job issues it,
+taking the ids it filters on as keyword arguments. ``uses_index`` runs
+``EXPLAIN`` (``EXPLAIN QUERY PLAN`` on SQLite) for a queryset and tells
+whether the plan reads through the named index. tests/test_query_plans.py
+checks every registered query against a seeded dataset, so changing a hot
+query or dropping an index it depends on fails there rather than in
+production.
+"""
+
+from padhoplus.assessments import ranking, sampling
+from padhoplus.assessments.models import TestAttempt
+from padhoplus.batches.models import Enrollment
+from padhoplus.content import views as content_views
+from padhoplus.content.models import Note, WatchHistory
+from padhoplus.doubts import views as doubt_views
+from padhoplus.doubts.models import Doubt
+from padhoplus.users.models import User
+
+HOT_QUERIES = {}
+
+
+def hot_query(index):
+    def register(build):
+        HOT_QUERIES[build.__name__] = (index, build)
+        return build
+    return register
+
+
+def uses_index(queryset, index):
+    return index in queryset.explain()
+
+
+@hot_query('enrollment_student_active_idx')
+def active_batches(student_id, **ids):
+    """Same shape as entitlements.load()."""
+    return Enrollment.objects.filter(student_id=student_id, status='active').values_list('batch_id', flat=True)
+
+
+@hot_query('enrollment_batch_active_idx')
+def batch_roster(batch_id, **ids):
+    return Enrollment.objects.filter(batch_id=batch_id, status='active').values_list('student_id', flat=True)
+
+
+@hot_query('lecture_batch_active_idx')
+def enrolled_lectures(batch_id, **ids):
+    return content_views.listed_lectures([batch_id])
+
+
+@hot_query('lecture_open_idx')
+def visitor_lectures(**ids):
+    return content_views.listed_lectures()
+
+
+@hot_query('lecture_demo_idx')
+def demo_lectures(**ids):
+    return content_views.demo_lectures()
+
+
+@hot_query('question_pool_idx')
+def question_pool(subject_id, topic_id, **ids):
+    return sampling.candidates(subject_id=subject_id, topic_id=topic_id, difficulty='hard').order_by().values_list(
+        'pk', flat=True
+    )
+
+
+@hot_query('attempt_test_score_idx')
+def test_standings(test_id, **ids):
+    return TestAttempt.objects.filter(test_id=test_id, status='submitted').order_by(*ranking.ORDERING)
+
+
+@hot_query('doubt_public_idx')
+def public_doubts(**ids):
+    return Doubt.objects.filter(is_public=True).order_by('-created_at', '-id')[:20]
+
+
+@hot_query('doubt_open_status_idx')
+def open_doubts(**ids):
+    return doubt_views.for_list(doubt_views.pending_queue())
+
+
+@hot_query('watch_history_in_progress_idx')
+def continue_watching(student_id, **ids):
+    return WatchHistory.objects.filter(user_id=student_id, is_completed=False)[:10]
+
+
+@hot_query('note_active_type_idx')
+def free_notes(**ids):
+    return Note.objects.filter(is_active=True, is_free=True, file_type='pyq')
+
+
+@hot_query('user_email_idx')
+def login_lookup(email, **ids):
+    """Same shape as LoginSerializer.validate()."""
+    return User.objects.filter(email=email)
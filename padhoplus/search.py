@@ -0,0 +1,84 @@
+"""
+Full-text search for batches, doubts and notes.
+
+On PostgreSQL each searchable model keeps a weighted ``tsvector`` in its
+``search_vector`` column, refreshed from post_save and backed by a GIN index.
+A pg_trgm index on the title column matches partial words and typos the
+stemmer misses, and both predicates are OR-ed in one query so the planner can
+combine the two bitmap index scans. Other backends fall back to the
+``icontains`` filters the views used before.
+"""
+
+from django.contrib.postgres.search import (
+    SearchQuery, SearchRank, SearchVector, TrigramWordSimilarity
+)
+from django.db import connections
+from django.db.models import F, Q
+
+SEARCH_CONFIG = 'english'
+
+# Weighted source columns per model; the first one also carries the trigram index.
+SEARCH_FIELDS = {
+    'batches.Batch': (('name', 'A'), ('target_class', 'B'), ('description', 'C')),
+    'doubts.Doubt': (('title', 'A'), ('description', 'B')),
+    'content.Note': (('title', 'A'), ('description', 'B')),
+}
+
+
+def is_supported(using='default'):
+    return connections[using].vendor == 'postgresql'
+
+
+def _fields(model):
+    return SEARCH_FIELDS[model._meta.label]
+
+
+def search_vector(model):
+    vectors = [
+        SearchVector(field, weight=weight, config=SEARCH_CONFIG)
+        for field, weight in _fields(model)
+    ]
+    combined = vectors[0]
+    for vector in vectors[1:]:
+        combined = combined + vector
+    return combined
+
+
+def refresh_search_vectors(queryset):
+    """Recompute ``search_vector`` for every row in ``queryset`` with one UPDATE."""
+    if not is_supported(queryset.db):
+        return 0
+    return queryset.update(search_vector=search_vector(queryset.model))
+
+
+def refresh_instance(instance, update_fields=None):
+    """post_save hook: skip saves that did not touch any searchable column."""
+    if update_fields is not None:
+        searchable = {field for field, _ in _fields(type(instance))}
+        if searchable.isdisjoint(update_fields):
+            return
+    refresh_search_vectors(type(instance)._default_manager.filter(pk=instance.pk))
+
+
+def apply_search(queryset, text):
+    """Filter ``queryset`` to rows matching ``text``, best matches first."""
+    text = (text or '').strip()
+    if not text:
+        return queryset
+
+    fields = _fields(queryset.model)
+    if not is_supported(queryset.db):
+        condition = Q()
+        for field, _ in fields:
+            condition |= Q(**{f'{field}__icontains': text})
+        return queryset.filter(condition)
+
+    title = fields[0][0]
+    query = SearchQuery(text, search_type='websearch', config=SEARCH_CONFIG)
+    ordering = queryset.query.order_by or queryset.model._meta.ordering
+    return queryset.annotate(
+        search_rank=SearchRank(F('search_vector'), query),
+        search_similarity=TrigramWordSimilarity(text, title),
+    ).filter(
+        Q(search_vector=query) | Q(**{f'{title}__trigram_word_similar': text})
+    ).order_by('-search_rank', '-search_similarity', *ordering)
@@ -21,6 +21,7 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'django.contrib.postgres',
     'rest_framework',
     'corsheaders',
     'padhoplus.users',
@@ -33,6 +34,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'padhoplus.instrumentation.RequestMetricsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
@@ -70,24 +72,133 @@ DB_PASSWORD = os.environ.get('DB_PASSWORD', 'Mohan123#')
 DB_NAME = os.environ.get('DB_NAME', 'padhoplus_test')
 DB_PORT = os.environ.get('DB_PORT', '5432')
 
-print(f"Connecting to database: {DB_HOST}:{DB_PORT}/{DB_NAME} as {DB_USER}")
-
-# Use external PostgreSQL database
-DATABASES = {
-    'default': {
-        'ENGINE': 'django.db.backends.postgresql',
-        'NAME': DB_NAME,
-        'USER': DB_USER,
-        'PASSWORD': DB_PASSWORD,
-        'HOST': DB_HOST,
-        'PORT': DB_PORT,
-        'CONN_MAX_AGE': 600,
-        'OPTIONS': {
-            'connect_timeout': 30,
-            'sslmode': 'prefer',
+# DB_ENGINE=sqlite runs against a local SQLite file instead, for the test
+# suite on machines without the PostgreSQL server.
+DB_ENGINE = os.environ.get('DB_ENGINE', 'postgresql')
+
+if DB_ENGINE == 'sqlite':
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': os.environ.get('DB_SQLITE_PATH', BASE_DIR / 'db.sqlite3'),
         }
     }
-}
+else:
+    print(f"Connecting to database: {DB_HOST}:{DB_PORT}/{DB_NAME} as {DB_USER}")
+
+    # Use external PostgreSQL database
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.postgresql',
+            'NAME': DB_NAME,
+            'USER': DB_USER,
+            'PASSWORD': DB_PASSWORD,
+            'HOST': DB_HOST,
+            'PORT': DB_PORT,
+            'CONN_MAX_AGE': 600,
+            'OPTIONS': {
+                'connect_timeout': 30,
+                'sslmode': 'prefer',
+            }
+        }
+    }
+
+# Cache Configuration
+# Local memory by default; REDIS_URL shares the cache between workers and
+# CACHE_DIR switches to the file-based backend.
+REDIS_URL = os.environ.get('REDIS_URL')
+CACHE_DIR = os.environ.get('CACHE_DIR')
+
+if REDIS_URL:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': REDIS_URL,
+        }
+    }
+elif CACHE_DIR:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+            'LOCATION': CACHE_DIR,
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'LOCATION': 'padhoplus',
+        }
+    }
+
+# Active batch ids per student, shared between requests (see padhoplus/batches/entitlements.py);
+# 0 keeps them per request only.
+ENTITLEMENT_CACHE_TIMEOUT = int(os.environ.get('ENTITLEMENT_CACHE_TIMEOUT', '60'))
+
+# Cached per-test answer keys used when grading submissions (see padhoplus/assessments/grading.py)
+ANSWER_KEY_CACHE_TIMEOUT = int(os.environ.get('ANSWER_KEY_CACHE_TIMEOUT', '3600'))
+# Absolute tolerance for numerical answers whose key is a single value.
+NUMERICAL_ANSWER_TOLERANCE = os.environ.get('NUMERICAL_ANSWER_TOLERANCE', '0.01')
+
+# Cached candidate-id pools for random question sampling (see padhoplus/assessments/sampling.py);
+# larger pools are sampled with TABLESAMPLE on PostgreSQL instead of being cached.
+SAMPLING_POOL_CACHE_TIMEOUT = int(os.environ.get('SAMPLING_POOL_CACHE_TIMEOUT', '600'))
+SAMPLING_POOL_CACHE_LIMIT = int(os.environ.get('SAMPLING_POOL_CACHE_LIMIT', '20000'))
+
+# Per-student topic accuracies used by adaptive practice (see padhoplus/assessments/adaptive.py)
+ADAPTIVE_PROFILE_TIMEOUT = int(os.environ.get('ADAPTIVE_PROFILE_TIMEOUT', '300'))
+
+# Pre-rendered, gzip-compressed test papers served to students (see padhoplus/assessments/papers.py)
+PAPER_CACHE_ALIAS = os.environ.get('PAPER_CACHE_ALIAS', 'default')
+PAPER_CACHE_TIMEOUT = int(os.environ.get('PAPER_CACHE_TIMEOUT', str(7 * 24 * 3600)))
+
+# Write-behind store for in-progress test answers (see padhoplus/assessments/drafts.py); needs a
+# shared cache that does not evict, and `manage.py recover_responses` run when workers start.
+RESPONSE_BUFFER_ENABLED = os.environ.get('RESPONSE_BUFFER_ENABLED', 'False').lower() == 'true'
+RESPONSE_BUFFER_CACHE_ALIAS = os.environ.get('RESPONSE_BUFFER_CACHE_ALIAS', 'default')
+RESPONSE_BUFFER_TIMEOUT = int(os.environ.get('RESPONSE_BUFFER_TIMEOUT', str(24 * 3600)))
+RESPONSE_BUFFER_FLUSH_INTERVAL = float(os.environ.get('RESPONSE_BUFFER_FLUSH_INTERVAL', '60'))
+RESPONSE_JOURNAL_DIR = os.environ.get('RESPONSE_JOURNAL_DIR', str(BASE_DIR / 'var' / 'response-journal'))
+RESPONSE_JOURNAL_FSYNC = os.environ.get('RESPONSE_JOURNAL_FSYNC', 'True').lower() == 'true'
+
+# Rendered batch catalog / detail payloads (see padhoplus/batches/catalog_cache.py)
+CATALOG_CACHE_ALIAS = os.environ.get('CATALOG_CACHE_ALIAS', 'default')
+CATALOG_CACHE_TIMEOUT = int(os.environ.get('CATALOG_CACHE_TIMEOUT', '300'))
+
+# Seconds between flushes of buffered view/download counters (see padhoplus/counters.py);
+# 0 writes each increment straight through.
+COUNTER_FLUSH_INTERVAL = float(os.environ.get('COUNTER_FLUSH_INTERVAL', '5'))
+
+# Per-user student dashboard snapshots (see padhoplus/analytics/snapshots.py)
+DASHBOARD_CACHE_TIMEOUT = int(os.environ.get('DASHBOARD_CACHE_TIMEOUT', '60'))
+
+# Seconds between re-ranks of tests with new submissions (see padhoplus/assessments/ranking.py);
+# 0 re-ranks on every submission. Workers share the limit through the default cache, so it
+# holds across processes only when that cache is shared (Redis or the file cache).
+RANKING_INTERVAL = float(os.environ.get('RANKING_INTERVAL', '10'))
+
+# Attempts left open past their deadline are graded by `manage.py finalize_expired_attempts`
+# (see padhoplus/assessments/finalization.py) once this grace period has passed.
+ATTEMPT_GRACE_SECONDS = int(os.environ.get('ATTEMPT_GRACE_SECONDS', '120'))
+ATTEMPT_FINALIZE_INTERVAL = float(os.environ.get('ATTEMPT_FINALIZE_INTERVAL', '60'))
+
+# Live per-test leaderboards (see padhoplus/assessments/leaderboards.py); the
+# in-process 'memory' backend is per worker and only picks up other workers'
+# submissions when it reloads a set from the database, LEADERBOARD_MEMORY_TTL
+# seconds after loading it (0 never reloads), so use 'redis' with several workers.
+# Redis sets are reloaded from the database every LEADERBOARD_REDIS_TTL seconds (0 never).
+LEADERBOARD_BACKEND = os.environ.get('LEADERBOARD_BACKEND', 'redis' if REDIS_URL else 'memory')
+LEADERBOARD_REDIS_URL = os.environ.get('LEADERBOARD_REDIS_URL', REDIS_URL)
+LEADERBOARD_MEMORY_TTL = float(os.environ.get('LEADERBOARD_MEMORY_TTL', '30'))
+LEADERBOARD_REDIS_TTL = float(os.environ.get('LEADERBOARD_REDIS_TTL', '600'))
+
+# Seconds between flushes of coalesced player heartbeats (see padhoplus/content/watch_progress.py).
+WATCH_PROGRESS_FLUSH_INTERVAL = float(os.environ.get('WATCH_PROGRESS_FLUSH_INTERVAL', '2'))
+
+# Per-request query counts and timings, sent as Server-Timing, logged and served at /api/metrics/
+# (see padhoplus/instrumentation.py); requests repeating one statement this often are logged as warnings.
+REQUEST_METRICS_ENABLED = os.environ.get('REQUEST_METRICS_ENABLED', 'True').lower() == 'true'
+REQUEST_METRICS_DUPLICATE_THRESHOLD = int(os.environ.get('REQUEST_METRICS_DUPLICATE_THRESHOLD', '10'))
 
 AUTH_PASSWORD_VALIDATORS = [
     {'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator'},
@@ -0,0 +1,57 @@
+"""
+Multi-row ``INSERT ... ON CONFLICT DO UPDATE`` for write-heavy paths.
+
+``bulk_create(update_conflicts=True)`` can only overwrite columns with the
+incoming values; these helpers take an SQL expression per updated column so
+conflicts can accumulate (``{table}.n + EXCLUDED.n``) or keep the larger value
+(``{greatest}({table}.n, EXCLUDED.n)``). PostgreSQL and SQLite share the syntax;
+only the name of the two-argument maximum differs.
+"""
+
+from django.db import connections
+
+BATCH_SIZE = 500
+
+
+def greatest(connection):
+    return 'GREATEST' if connection.vendor == 'postgresql' else 'MAX'
+
+
+def upsert(model, rows, conflict_fields, updates, conflict_where='', using='default'):
+    """Insert ``rows`` (dicts keyed by column attname) into ``model``'s table.
+
+    ``updates`` maps column names to the SQL assigned on conflict; ``{table}``
+    and ``{greatest}`` are substituted. ``conflict_where`` selects a partial
+    unique index as the arbiter. Returns the number of rows sent.
+    """
+    if not rows:
+        return 0
+    connection = connections[using]
+    quote = connection.ops.quote_name
+    table = quote(model._meta.db_table)
+    columns = list(rows[0])
+    fields = [model._meta.get_field(column) for column in columns]
+
+    assignments = ', '.join(
+        f'{quote(column)} = ' + expression.format(table=table, greatest=greatest(connection))
+        for column, expression in updates.items()
+    )
+    target = ', '.join(quote(field) for field in conflict_fields)
+    where = f' WHERE {conflict_where}' if conflict_where else ''
+    placeholder = '(' + ', '.join(['%s'] * len(columns)) + ')'
+
+    with connection.cursor() as cursor:
+        for start in range(0, len(rows), BATCH_SIZE):
+            batch = rows[start:start + BATCH_SIZE]
+            params = [
+                field.get_db_prep_save(row[column], connection)
+                for row in batch
+                for column, field in zip(columns, fields)
+            ]
+            cursor.execute(
+                f'INSERT INTO {table} ({", ".join(quote(c) for c in columns)}) '
+                f'VALUES {", ".join([placeholder] * len(batch))} '
+                f'ON CONFLICT ({target}){where} DO UPDATE SET {assignments}',
+                params
+            )
+    return len(rows)
@@ -29,6 +29,7 @@ def api_root(request):
         }
     })
 
+from padhoplus.instrumentation import metrics
 from padhoplus.users.views import UserViewSet, AuthViewSet
 from padhoplus.batches.views import (
     BatchViewSet, SubjectViewSet, TopicViewSet, 
@@ -44,7 +45,7 @@ from padhoplus.assessments.views import (
 )
 from padhoplus.doubts.views import DoubtViewSet, DoubtResponseViewSet
 from padhoplus.analytics.views import (
-    ProgressViewSet, TestAnalyticsViewSet, DashboardViewSet
+    ProgressViewSet, TestAnalyticsViewSet, DashboardViewSet, LeaderboardViewSet
 )
 
 router = DefaultRouter()
@@ -76,12 +77,14 @@ router.register(r'doubt-responses', DoubtResponseViewSet, basename='doubt-respon
 router.register(r'progress', ProgressViewSet, basename='progress')
 router.register(r'test-analytics', TestAnalyticsViewSet, basename='test-analytics')
 router.register(r'dashboard', DashboardViewSet, basename='dashboard')
+router.register(r'leaderboards', LeaderboardViewSet, basename='leaderboard')
 
 urlpatterns = [
     path('', api_root, name='api-root'),
     path('admin/', admin.site.urls),
     path('api/', include(router.urls)),
     path('api/payments/', include('padhoplus.payments.urls')),
+    path('api/metrics/', metrics, name='metrics'),
     path('api-auth/', include('rest_framework.urls')),
 ]
 
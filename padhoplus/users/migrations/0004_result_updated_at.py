@@ -0,0 +1,18 @@
+# Generated by Django 5.2.8 on 2026-10-18 15:09
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0003_remove_faculty_subjects_faculty_subjects'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='result',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+    ]
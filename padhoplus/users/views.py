@@ -2,6 +2,7 @@ from rest_framework import viewsets, status, permissions
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from django.contrib.auth import login, logout
+from padhoplus.conditional import conditional_get, queryset_state
 from .models import User, Faculty, Testimonial, Result
 from .serializers import (
     UserSerializer, UserCreateSerializer, LoginSerializer,
@@ -74,9 +75,13 @@ class UserViewSet(viewsets.ModelViewSet):
     
     @action(detail=False, methods=['get'], permission_classes=[permissions.AllowAny])
     def faculty(self, request):
-        faculty_members = Faculty.objects.filter(is_featured=True).select_related('user')
-        serializer = FacultySerializer(faculty_members, many=True)
-        return Response(serializer.data)
+        faculty_members = Faculty.objects.filter(is_featured=True).select_related('user').prefetch_related('subjects')
+        state = queryset_state(faculty_members, ('updated_at', 'user__updated_at', 'subjects__updated_at'))
+        return conditional_get(
+            request, [state],
+            lambda: Response(FacultySerializer(faculty_members, many=True).data),
+            per_user=False
+        )
     
     @action(detail=False, methods=['get'], permission_classes=[permissions.AllowAny])
     def testimonials(self, request):
@@ -84,8 +89,11 @@ class UserViewSet(viewsets.ModelViewSet):
         featured = request.query_params.get('featured')
         if featured:
             testimonials = testimonials.filter(is_featured=True)
-        serializer = TestimonialSerializer(testimonials, many=True)
-        return Response(serializer.data)
+        return conditional_get(
+            request, [queryset_state(testimonials)],
+            lambda: Response(TestimonialSerializer(testimonials, many=True).data),
+            per_user=False
+        )
     
     @action(detail=False, methods=['get'], permission_classes=[permissions.AllowAny])
     def results(self, request):
@@ -101,8 +109,11 @@ class UserViewSet(viewsets.ModelViewSet):
         if featured:
             results = results.filter(is_featured=True)
         
-        serializer = ResultSerializer(results, many=True)
-        return Response(serializer.data)
+        return conditional_get(
+            request, [queryset_state(results)],
+            lambda: Response(ResultSerializer(results, many=True).data),
+            per_user=False
+        )
 
 
 class AuthViewSet(viewsets.ViewSet):
@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+Adaptive Practice Test Suite
+Tests weakness-, difficulty- and recency-weighted question selection
+"""
+
+import os
+import sys
+import random
+import django
+from array import array
+from collections import Counter
+from datetime import date
+from unittest import mock
+from django.core.cache import cache
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+# Setup Django
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'padhoplus.settings')
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+django.setup()
+
+from padhoplus.users.models import User
+from padhoplus.batches.models import Subject, Topic, Batch
+from padhoplus.assessments import adaptive, sampling
+from padhoplus.assessments.models import PracticeSession, Question
+from padhoplus.analytics.models import UserProgress
+
+
+class AdaptiveSelectionTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.student = User.objects.create_user(username='student1', password='testpass123')
+        self.client.force_authenticate(self.student)
+        self.physics = Subject.objects.create(name='Physics', slug='physics')
+        self.optics = Topic.objects.create(subject=self.physics, name='Optics', slug='optics')
+        self.waves = Topic.objects.create(subject=self.physics, name='Waves', slug='waves')
+        Question.objects.bulk_create([
+            Question(subject=self.physics, topic=topic, difficulty=difficulty, question_text='?', correct_answer='A')
+            for topic in (self.optics, self.waves)
+            for difficulty in ('easy', 'medium', 'hard')
+            for _ in range(40)
+        ])
+        batch = Batch.objects.create(
+            name='JEE Batch', slug='jee-batch', description='Complete preparation batch',
+            target_exam='jee_main', target_class='class_12', start_date=date(2026, 4, 1)
+        )
+        # Strong in optics, weak in waves.
+        for topic, correct in ((self.optics, 45), (self.waves, 8)):
+            UserProgress.objects.create(
+                user=self.student, batch=batch, subject=self.physics, topic=topic,
+                questions_attempted=50, questions_correct=correct
+            )
+
+    def selected(self, count, **filters):
+        ids = adaptive.select_ids(self.student.pk, self.physics.pk, count, **filters)
+        self.assertEqual(len(ids), len(set(ids)))
+        return Counter(Question.objects.filter(pk__in=ids).values_list('topic__slug', 'difficulty'))
+
+    def test_prefers_weak_topics_at_a_fitting_difficulty(self):
+        picks = Counter()
+        for _ in range(10):
+            picks += self.selected(20)
+        waves = sum(n for (topic, _), n in picks.items() if topic == 'waves')
+        self.assertGreater(waves, 130)
+        self.assertGreater(picks[('waves', 'easy')], picks[('waves', 'hard')])
+        self.assertGreater(picks[('optics', 'hard')], picks[('optics', 'easy')])
+
+    def test_avoids_recently_attempted_questions(self):
+        pool = list(Question.objects.filter(topic=self.waves, difficulty='easy').values_list('pk', flat=True))
+        session = PracticeSession.objects.create(student=self.student, subject=self.physics, topic=self.waves)
+        session.questions.set(pool[:35])
+
+        repeats = 0
+        for _ in range(20):
+            ids = adaptive.select_ids(self.student.pk, self.physics.pk, 3, topic_id=self.waves.pk, difficulty='easy')
+            self.assertEqual(len(ids), 3)
+            repeats += len(set(ids) & set(pool[:35]))
+        # 35 just-seen questions against 5 fresh ones: repeats stay rare.
+        self.assertLess(repeats, 20)
+        # Asking for the whole pool still returns every question once.
+        everything = adaptive.select_ids(self.student.pk, self.physics.pk, 100, topic_id=self.waves.pk, difficulty='easy')
+        self.assertEqual(sorted(everything), sorted(pool))
+
+    def test_profile_order_does_not_depend_on_null_sorting(self):
+        subject_level = (adaptive.NO_TOPIC, 8, 8)
+        topic_rows = [(self.waves.pk, 8, 0), (self.optics.pk, 4, 2)]
+        # NULL topics sort first on SQLite and last on PostgreSQL.
+        for rows in ([subject_level] + topic_rows, topic_rows + [subject_level]):
+            profile = adaptive.build_profile(rows)
+            self.assertEqual(list(profile[0]), sorted([adaptive.NO_TOPIC, self.waves.pk, self.optics.pk]))
+            self.assertAlmostEqual(adaptive.accuracy(profile, self.waves.pk), 0.1)
+            self.assertAlmostEqual(adaptive.accuracy(profile, self.optics.pk + self.waves.pk), 0.9)
+
+    def test_start_in_adaptive_mode(self):
+        response = self.client.post('/api/practice-sessions/start/', {
+            'subject_id': self.physics.pk, 'mode': 'adaptive', 'count': 12
+        }, format='json')
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.data['session']['mode'], 'adaptive')
+        self.assertEqual(len(response.data['questions']), 12)
+        session = PracticeSession.objects.get(pk=response.data['session']['id'])
+        self.assertEqual(
+            set(session.questions.values_list('pk', flat=True)),
+            {question['id'] for question in response.data['questions']}
+        )
+
+    def test_selection_over_large_pool_is_fast(self):
+        # A synthetic 100k-question pool over 100 topics, already cached.
+        buckets = {
+            (topic, level): array('q', range((topic * 3 + level) * 334, (topic * 3 + level + 1) * 334))
+            for topic in range(1, 101) for level in range(3)
+        }
+        cache.set(adaptive.POOL_KEY.format(
+            version=sampling.pool_version(), subject_id=self.physics.pk, topic_id=None, difficulty=None
+        ), buckets)
+        adaptive.select_ids(self.student.pk, self.physics.pk, 30)
+
+        # Cached pool and profile: only the student's recent questions are read,
+        # and each pick probes a few random ids rather than scanning a bucket.
+        with self.assertNumQueries(2), \
+                mock.patch.object(adaptive.random, 'randrange', wraps=random.randrange) as randrange:
+            ids = adaptive.select_ids(self.student.pk, self.physics.pk, 30)
+        self.assertEqual(len(set(ids)), 30)
+        self.assertLess(randrange.call_count, 60)
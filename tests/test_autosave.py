@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+Response Autosave Test Suite
+Tests batched, sequence-numbered saving of in-progress test responses
+"""
+
+import os
+import sys
+import django
+from datetime import date
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+# Setup Django
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'padhoplus.settings')
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+django.setup()
+
+from padhoplus.users.models import User
+from padhoplus.batches.models import Subject, Batch
+from padhoplus.assessments import autosave
+from padhoplus.assessments.models import Question, Test, TestAttempt, TestResponse
+
+
+@override_settings(RANKING_INTERVAL=0)
+class SaveResponsesTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.student = User.objects.create_user(username='student1', password='testpass123')
+        self.client.force_authenticate(self.student)
+        batch = Batch.objects.create(
+            name='JEE Batch', slug='jee-batch', description='Complete preparation batch',
+            target_exam='jee_main', target_class='class_12', start_date=date(2026, 4, 1)
+        )
+        physics = Subject.objects.create(name='Physics', slug='physics')
+        self.questions = Question.objects.bulk_create([
+            Question(subject=physics, question_text=f'Q{i}', correct_answer='A') for i in range(91)
+        ])
+        self.outsider = self.questions.pop()
+        self.test = Test.objects.create(batch=batch, subject=physics, title='Mock test')
+        self.test.questions.add(*self.questions)
+        self.attempt = TestAttempt.objects.create(test=self.test, student=self.student)
+        self.url = f'/api/test-attempts/{self.attempt.pk}/save_responses/'
+
+    def save(self, responses, sequence=None):
+        data = {'responses': responses}
+        if sequence is not None:
+            data['sequence'] = sequence
+        return self.client.post(self.url, data, format='json')
+
+    def answers(self):
+        return {
+            question_id: (answer, spent)
+            for question_id, answer, spent in TestResponse.objects.filter(attempt=self.attempt).values_list(
+                'question_id', 'selected_answer', 'time_spent_seconds'
+            )
+        }
+
+    def test_saves_a_whole_paper_in_constant_queries(self):
+        self.save([{'question_id': self.questions[0].pk, 'selected_answer': 'A'}], sequence=1)
+        with CaptureQueriesContext(connection) as queries:
+            response = self.save([
+                {'question_id': question.pk, 'selected_answer': 'B', 'time_spent_seconds': 30}
+                for question in self.questions
+            ] + [{'question_id': self.outsider.pk, 'selected_answer': 'A'}], sequence=2)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['saved'], 90)
+        self.assertEqual(response.data['rejected'], [self.outsider.pk])
+        # Attempt lookup, sequence claim and the upsert, plus savepoint bookkeeping.
+        self.assertLessEqual(len(queries), 5)
+        answers = self.answers()
+        self.assertEqual(len(answers), 90)
+        self.assertEqual(set(answers.values()), {('B', 30)})
+
+    def test_stale_and_repeated_saves_are_ignored(self):
+        question = self.questions[0].pk
+        self.save([{'question_id': question, 'selected_answer': 'C', 'time_spent_seconds': 40}], sequence=5)
+
+        for sequence in (5, 3):
+            response = self.save([{'question_id': question, 'selected_answer': 'D', 'time_spent_seconds': 10}], sequence)
+            self.assertTrue(response.data['duplicate'])
+            self.assertEqual(response.data['last_sequence'], 5)
+        self.assertEqual(self.answers()[question], ('C', 40))
+
+        # Newer saves apply, but time spent never goes backwards.
+        response = self.save([{'question_id': question, 'selected_answer': '', 'time_spent_seconds': 25,
+                               'is_marked_for_review': True}], sequence=6)
+        self.assertFalse(response.data['duplicate'])
+        self.assertEqual(self.answers()[question], (None, 40))
+        self.assertTrue(TestResponse.objects.get(attempt=self.attempt, question_id=question).is_marked_for_review)
+
+    def test_saved_answers_are_graded_and_then_frozen(self):
+        self.save([
+            {'question_id': self.questions[0].pk, 'selected_answer': 'A'},
+            {'question_id': self.questions[1].pk, 'selected_answer': 'B'},
+        ])
+        response = self.client.post(f'/api/test-attempts/{self.attempt.pk}/submit/', {}, format='json')
+        self.assertEqual(response.data['correct_count'], 1)
+        self.assertEqual(response.data['incorrect_count'], 1)
+
+        response = self.save([{'question_id': self.questions[1].pk, 'selected_answer': 'A'}], sequence=9)
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(self.answers()[self.questions[1].pk][0], 'B')
+
+    def test_unsequenced_save_racing_a_submit_is_refused(self):
+        # The view saw the attempt in progress; it was submitted before the save ran.
+        TestAttempt.objects.filter(pk=self.attempt.pk).update(status='submitted')
+        delta = {'question_id': self.questions[0].pk, 'selected_answer': 'A',
+                 'time_spent_seconds': 0, 'is_marked_for_review': False}
+        with self.assertRaises(autosave.AttemptClosed):
+            autosave.save(self.attempt, [delta])
+        self.assertEqual(self.answers(), {})
+
+    def test_only_the_owner_can_save(self):
+        other = User.objects.create_user(username='student2', password='testpass123', role='admin')
+        self.client.force_authenticate(other)
+        response = self.save([{'question_id': self.questions[0].pk, 'selected_answer': 'A'}])
+        self.assertEqual(response.status_code, 403)
+        self.assertEqual(self.answers(), {})
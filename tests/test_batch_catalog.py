@@ -0,0 +1,207 @@
+#!/usr/bin/env python3
+"""
+Batch Catalog Test Suite
+Tests enrollment counters and query cost of the batch catalog endpoints
+"""
+
+import os
+import sys
+import django
+from datetime import date, time
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+# Setup Django
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'padhoplus.settings')
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+django.setup()
+
+from padhoplus.users.models import User, Faculty
+from padhoplus.batches.models import (
+    Subject, Topic, Batch, BatchFAQ, BatchReview, BatchSubjectFaculty,
+    Enrollment, Schedule
+)
+from padhoplus.batches import catalog_cache
+
+
+def make_batch(index, **kwargs):
+    return Batch.objects.create(
+        name=f'Batch {index}',
+        slug=f'batch-{index}',
+        description='Complete preparation batch',
+        target_exam='jee_main',
+        target_class='class_12',
+        start_date=date(2026, 4, 1),
+        **kwargs
+    )
+
+
+class EnrollmentCounterTest(TestCase):
+    def setUp(self):
+        self.batch = make_batch(1)
+        self.student = User.objects.create_user(
+            username='student1', email='student1@padhoplus.com', password='testpass123'
+        )
+
+    def count(self):
+        self.batch.refresh_from_db()
+        return self.batch.active_enrollments_count
+
+    def test_counter_follows_status_changes(self):
+        enrollment = Enrollment.objects.create(student=self.student, batch=self.batch, status='pending')
+        self.assertEqual(self.count(), 0)
+
+        enrollment.status = 'active'
+        enrollment.save()
+        self.assertEqual(self.count(), 1)
+
+        enrollment.save()
+        self.assertEqual(self.count(), 1)
+
+        enrollment = Enrollment.objects.get(pk=enrollment.pk)
+        enrollment.status = 'cancelled'
+        enrollment.save()
+        self.assertEqual(self.count(), 0)
+
+    def test_counter_follows_deletes(self):
+        Enrollment.objects.create(student=self.student, batch=self.batch, status='active')
+        self.assertEqual(self.count(), 1)
+
+        self.student.delete()
+        self.assertEqual(self.count(), 0)
+
+
+class BatchCatalogQueryTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+
+    def seed(self, start, stop):
+        for i in range(start, stop):
+            batch = make_batch(i, is_featured=True)
+            student = User.objects.create_user(username=f'student{i}', password='testpass123')
+            Enrollment.objects.create(student=student, batch=batch, status='active')
+
+    def list_queries(self, url):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return len(ctx), response
+
+    def test_list_query_count_is_constant(self):
+        self.seed(0, 2)
+        small, _ = self.list_queries('/api/batches/')
+        self.seed(2, 12)
+        large, response = self.list_queries('/api/batches/')
+
+        self.assertEqual(small, large)
+        self.assertEqual(response.json()['results'][0]['enrolled_count'], 1)
+
+    def test_featured_query_count_is_constant(self):
+        self.seed(0, 2)
+        small, _ = self.list_queries('/api/batches/featured/')
+        self.seed(2, 6)
+        large, response = self.list_queries('/api/batches/featured/')
+
+        self.assertEqual(small, large)
+        self.assertTrue(all(item['enrolled_count'] == 1 for item in response.json()))
+
+    def test_detail_uses_exact_count(self):
+        self.seed(0, 1)
+        Batch.objects.update(active_enrollments_count=0)
+        response = self.client.get('/api/batches/batch-0/')
+        self.assertEqual(response.json()['enrolled_count'], 1)
+
+
+class BatchDetailQueryTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.batch = make_batch(1)
+
+    def add_subject(self, index):
+        subject = Subject.objects.create(name=f'Subject {index}', slug=f'subject-{index}', order=index)
+        for chapter in range(3):
+            Topic.objects.create(
+                subject=subject, name=f'Topic {index}.{chapter}',
+                slug=f'topic-{index}-{chapter}', chapter_number=chapter
+            )
+        Schedule.objects.create(
+            batch=self.batch, subject=subject, day='mon',
+            start_time=time(9, 0), end_time=time(10, 0)
+        )
+        teacher = User.objects.create_user(username=f'teacher{index}', password='testpass123', role='teacher')
+        faculty = Faculty.objects.create(user=teacher, designation='Faculty')
+        faculty.subjects.add(subject)
+        BatchSubjectFaculty.objects.create(batch=self.batch, subject=subject, faculty=faculty)
+        BatchFAQ.objects.create(batch=self.batch, question=f'Question {index}?', answer='Answer', order=index)
+        reviewer = User.objects.create_user(username=f'reviewer{index}', password='testpass123')
+        BatchReview.objects.create(batch=self.batch, student=reviewer, rating=5, review='Great')
+
+    def detail_queries(self):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(f'/api/batches/{self.batch.slug}/')
+        self.assertEqual(response.status_code, 200)
+        return len(ctx), response.json()
+
+    def test_detail_query_count_is_constant(self):
+        self.add_subject(1)
+        small, _ = self.detail_queries()
+        for index in range(2, 6):
+            self.add_subject(index)
+        large, data = self.detail_queries()
+
+        self.assertEqual(small, large)
+        self.assertEqual(len(data['syllabus']), 5)
+        self.assertEqual(len(data['syllabus'][0]['topics']), 3)
+        self.assertEqual(len(data['faculty']), 5)
+        self.assertEqual(len(data['faculty'][0]['subjects']), 1)
+        self.assertEqual(len(data['reviews']), 5)
+        self.assertEqual(len(data['faqs']), 5)
+        self.assertEqual(len(data['schedules']), 5)
+
+
+class CatalogCacheTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.batch = make_batch(1, is_featured=True)
+
+    def get(self, url):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return len(ctx), response.json()
+
+    def test_hits_skip_the_database(self):
+        for url in ['/api/batches/', '/api/batches/featured/', f'/api/batches/{self.batch.slug}/']:
+            misses = catalog_cache.stats.snapshot()['misses']
+            first, body = self.get(url)
+            second, cached = self.get(url)
+            self.assertGreater(first, 0)
+            self.assertEqual(second, 0)
+            self.assertEqual(body, cached)
+            self.assertEqual(catalog_cache.stats.snapshot()['misses'], misses + 1)
+
+    def test_query_params_are_normalized(self):
+        self.get('/api/batches/?exam=jee_main&status=')
+        queries, _ = self.get('/api/batches/?exam=jee_main')
+        self.assertEqual(queries, 0)
+
+    def test_related_changes_invalidate_detail(self):
+        url = f'/api/batches/{self.batch.slug}/'
+        self.get(url)
+        BatchFAQ.objects.create(batch=self.batch, question='Is it live?', answer='Yes')
+        queries, data = self.get(url)
+        self.assertGreater(queries, 0)
+        self.assertEqual(len(data['faqs']), 1)
+
+    def test_batch_changes_invalidate_catalog(self):
+        self.get('/api/batches/')
+        self.batch.name = 'Renamed Batch'
+        self.batch.save()
+        _, data = self.get('/api/batches/')
+        self.assertEqual(data['results'][0]['name'], 'Renamed Batch')
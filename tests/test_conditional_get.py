@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+"""
+Conditional GET Test Suite
+Tests ETag / Last-Modified validators on catalog and content endpoints
+"""
+
+import os
+import sys
+import django
+from datetime import date
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+
+# Setup Django
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'padhoplus.settings')
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+django.setup()
+
+from padhoplus.users.models import User, Testimonial
+from padhoplus.batches.models import Subject, Batch, BatchFAQ, Enrollment
+from padhoplus.content.models import Note
+
+
+class ConditionalGetTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.batch = Batch.objects.create(
+            name='JEE Batch', slug='jee-batch', description='Complete preparation batch',
+            target_exam='jee_main', target_class='class_12', start_date=date(2026, 4, 1)
+        )
+
+    def assert_revalidates(self, url):
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        etag = response['ETag']
+
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.content, b'')
+        return etag
+
+    def test_batch_list_and_detail(self):
+        list_etag = self.assert_revalidates('/api/batches/')
+        detail_url = f'/api/batches/{self.batch.slug}/'
+        detail_etag = self.assert_revalidates(detail_url)
+
+        BatchFAQ.objects.create(batch=self.batch, question='Is it live?', answer='Yes')
+        response = self.client.get(detail_url, HTTP_IF_NONE_MATCH=detail_etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], detail_etag)
+
+        self.batch.name = 'Renamed Batch'
+        self.batch.save()
+        response = self.client.get('/api/batches/', HTTP_IF_NONE_MATCH=list_etag)
+        self.assertEqual(response.status_code, 200)
+
+    def test_revalidation_without_cache_entry(self):
+        etag = self.client.get('/api/batches/')['ETag']
+        cache.clear()
+        response = self.client.get('/api/batches/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+
+    @override_settings(CATALOG_CACHE_TIMEOUT=0)
+    def test_enrollments_change_catalog_etags_once_rebuilt(self):
+        urls = ('/api/batches/', '/api/batches/featured/', f'/api/batches/{self.batch.slug}/')
+        Batch.objects.filter(pk=self.batch.pk).update(is_featured=True)
+        etags = [self.assert_revalidates(url) for url in urls]
+
+        # The counter moves with .update(), so neither updated_at nor the
+        # catalog version changes; the enrollment version does, so the
+        # rebuilt body (at once, with a zero timeout) gets a new validator.
+        student = User.objects.create_user(username='student1', password='testpass123')
+        Enrollment.objects.create(student=student, batch=self.batch, status='active')
+        for url, etag in zip(urls, etags):
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+            self.assertEqual(response.status_code, 200, url)
+            self.assertNotEqual(response['ETag'], etag)
+            self.assertIn('"enrolled_count":1', response.content.decode())
+
+    @override_settings(CATALOG_CACHE_TIMEOUT=0)
+    def test_enrollment_transfer_changes_list_etag(self):
+        other = Batch.objects.create(
+            name='NEET Batch', slug='neet-batch', description='Complete preparation batch',
+            target_exam='neet', target_class='class_12', start_date=date(2026, 4, 1)
+        )
+        student = User.objects.create_user(username='student1', password='testpass123')
+        enrollment = Enrollment.objects.create(student=student, batch=self.batch, status='active')
+        etag = self.assert_revalidates('/api/batches/')
+
+        # One batch loses a student and the other gains one: the catalog-wide
+        # totals are unchanged, but the payload is not.
+        enrollment.batch = other
+        enrollment.save()
+        response = self.client.get('/api/batches/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_catalog_sends_no_last_modified(self):
+        urls = ('/api/batches/', '/api/batches/featured/', f'/api/batches/{self.batch.slug}/')
+        for url in urls:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200, url)
+            self.assertNotIn('Last-Modified', response, url)
+
+        response = self.client.get(
+            '/api/batches/', HTTP_IF_MODIFIED_SINCE='Fri, 01 Jan 2100 00:00:00 GMT'
+        )
+        self.assertEqual(response.status_code, 200)
+
+    def test_testimonials_change_etag_on_update(self):
+        testimonial = Testimonial.objects.create(name='Aarav', quote='Great teachers')
+        etag = self.assert_revalidates('/api/users/testimonials/')
+
+        testimonial.quote = 'Great teachers and notes'
+        testimonial.save()
+        response = self.client.get('/api/users/testimonials/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_results_and_faculty(self):
+        self.assert_revalidates('/api/users/results/')
+        self.assert_revalidates('/api/users/faculty/')
+
+    def test_notes_are_scoped_per_user(self):
+        subject = Subject.objects.create(name='Physics', slug='physics')
+        Note.objects.create(
+            subject=subject, title='Kinematics', is_free=True,
+            file='notes/kinematics.pdf'
+        )
+        etag = self.assert_revalidates('/api/notes/')
+        self.assert_revalidates('/api/notes/free_resources/')
+
+        student = User.objects.create_user(username='student1', password='testpass123')
+        self.client.force_authenticate(student)
+        response = self.client.get('/api/notes/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('Cookie', response['Vary'])
@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+Counter Buffer Test Suite
+Tests buffered view/download counters for lectures, notes and doubts
+"""
+
+import os
+import sys
+import django
+from unittest import mock
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+# Setup Django
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'padhoplus.settings')
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+django.setup()
+
+from padhoplus import counters
+from padhoplus.users.models import User
+from padhoplus.batches.models import Subject
+from padhoplus.content.models import Note
+from padhoplus.doubts.models import Doubt
+
+
+# A long interval keeps the background flusher idle so tests flush explicitly.
+@override_settings(COUNTER_FLUSH_INTERVAL=3600)
+class CounterBufferTest(TestCase):
+    def setUp(self):
+        counters.buffer.flush()
+        self.client = APIClient()
+        self.student = User.objects.create_user(username='student1', password='testpass123')
+        subject = Subject.objects.create(name='Physics', slug='physics')
+        self.doubts = [
+            Doubt.objects.create(student=self.student, subject=subject, title=f'Doubt {i}', description='Why?')
+            for i in range(3)
+        ]
+        self.note = Note.objects.create(subject=subject, title='Optics', is_free=True, file='notes/optics.pdf')
+
+    def views(self):
+        return sorted(Doubt.objects.values_list('views_count', flat=True))
+
+    def test_retrieve_buffers_until_flush(self):
+        first, second, _ = self.doubts
+        for _ in range(3):
+            response = self.client.get(f'/api/doubts/{first.pk}/')
+        self.assertEqual(response.json()['views_count'], 1)
+        self.client.get(f'/api/doubts/{second.pk}/')
+        self.assertEqual(self.views(), [0, 0, 0])
+
+        with CaptureQueriesContext(connection) as ctx:
+            self.assertEqual(counters.buffer.flush(), 2)
+        updates = [q for q in ctx.captured_queries if q['sql'].startswith('UPDATE')]
+        self.assertEqual(len(updates), 2)
+        self.assertEqual(self.views(), [0, 1, 3])
+
+    def test_equal_deltas_share_one_update(self):
+        for doubt in self.doubts:
+            counters.increment(doubt, 'views_count')
+        with CaptureQueriesContext(connection) as ctx:
+            counters.buffer.flush()
+        updates = [q for q in ctx.captured_queries if q['sql'].startswith('UPDATE')]
+        self.assertEqual(len(updates), 1)
+        self.assertEqual(self.views(), [1, 1, 1])
+
+    def test_failed_flush_keeps_deltas(self):
+        self.client.force_authenticate(self.student)
+        self.client.post(f'/api/notes/{self.note.pk}/download/')
+        with mock.patch('django.db.models.query.QuerySet.update', side_effect=RuntimeError):
+            with self.assertRaises(RuntimeError):
+                counters.buffer.flush()
+        self.client.post(f'/api/notes/{self.note.pk}/download/')
+        counters.buffer.flush()
+        self.note.refresh_from_db()
+        self.assertEqual(self.note.downloads_count, 2)
+
+    @override_settings(COUNTER_FLUSH_INTERVAL=0)
+    def test_zero_interval_writes_through(self):
+        counters.increment(self.doubts[0], 'views_count', 2)
+        self.doubts[0].refresh_from_db()
+        self.assertEqual(self.doubts[0].views_count, 2)
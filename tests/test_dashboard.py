@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+Dashboard Test Suite
+Tests single-pass progress summaries and per-user dashboard snapshots
+"""
+
+import os
+import sys
+import django
+from datetime import date
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+# Setup Django
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'padhoplus.settings')
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+django.setup()
+
+from padhoplus.users.models import User
+from padhoplus.batches.models import Subject, Batch, Enrollment
+from padhoplus.analytics.models import Streak, UserProgress
+from padhoplus.analytics.progress import increment_progress
+
+
+class DashboardTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.student = User.objects.create_user(
+            username='student1', password='testpass123', first_name='Asha', last_name='Rao'
+        )
+        self.client.force_authenticate(self.student)
+        self.batch = Batch.objects.create(
+            name='JEE Batch', slug='jee-batch', description='Complete preparation batch',
+            target_exam='jee_main', target_class='class_12', start_date=date(2026, 4, 1)
+        )
+        Enrollment.objects.create(student=self.student, batch=self.batch, status='active')
+        self.physics = Subject.objects.create(name='Physics', slug='physics')
+        self.chemistry = Subject.objects.create(name='Chemistry', slug='chemistry')
+        UserProgress.objects.create(
+            user=self.student, batch=self.batch, subject=self.physics, time_spent_minutes=30,
+            lectures_watched=2, questions_attempted=10, questions_correct=7,
+            tests_taken=3, average_test_score=80
+        )
+        UserProgress.objects.create(
+            user=self.student, batch=self.batch, subject=self.chemistry, time_spent_minutes=15,
+            lectures_watched=1, questions_attempted=10, questions_correct=3,
+            tests_taken=1, average_test_score=40
+        )
+
+    def get_dashboard(self):
+        response = self.client.get('/api/dashboard/student_dashboard/')
+        self.assertEqual(response.status_code, 200)
+        return response.data
+
+    def test_summary_is_one_grouped_query(self):
+        with self.assertNumQueries(1):
+            response = self.client.get('/api/progress/summary/')
+        self.assertEqual(response.data['total_time_minutes'], 45)
+        self.assertEqual(response.data['total_lectures_watched'], 3)
+        self.assertEqual(response.data['total_questions_attempted'], 20)
+        self.assertEqual(response.data['overall_accuracy'], 50.0)
+        self.assertEqual(response.data['subject_progress'], [
+            {'subject__name': 'Chemistry', 'subject__slug': 'chemistry', 'total_time': 15, 'total_lectures': 1},
+            {'subject__name': 'Physics', 'subject__slug': 'physics', 'total_time': 30, 'total_lectures': 2},
+        ])
+
+    def test_dashboard_is_read_only_and_cached(self):
+        with CaptureQueriesContext(connection) as queries:
+            data = self.get_dashboard()
+        self.assertLessEqual(len(queries), 4)
+        self.assertFalse(any(
+            query['sql'].lstrip().upper().startswith(('INSERT', 'UPDATE', 'DELETE'))
+            for query in queries
+        ))
+        self.assertFalse(Streak.objects.filter(user=self.student).exists())
+
+        self.assertEqual(data['name'], 'Asha Rao')
+        self.assertEqual(data['enrolled_batches'], 1)
+        self.assertEqual(data['total_watch_time'], 45)
+        self.assertEqual(data['total_tests'], 4)
+        # Weighted by tests taken: (80 * 3 + 40 * 1) / 4.
+        self.assertEqual(data['avg_score'], 70.0)
+        self.assertEqual(data['streak'], {'current': 0})
+
+        with self.assertNumQueries(0):
+            self.get_dashboard()
+
+    def test_events_invalidate_snapshot(self):
+        self.get_dashboard()
+
+        increment_progress({(self.student.pk, self.batch.pk, self.physics.pk, None): {'time_spent_minutes': 5}})
+        self.assertEqual(self.get_dashboard()['total_watch_time'], 50)
+
+        other = Batch.objects.create(
+            name='NEET Batch', slug='neet-batch', description='Medical entrance batch',
+            target_exam='neet', target_class='class_12', start_date=date(2026, 4, 1)
+        )
+        Enrollment.objects.create(student=self.student, batch=other, status='active')
+        self.assertEqual(self.get_dashboard()['enrolled_batches'], 2)
+
+        Streak.objects.create(user=self.student, current_streak=4)
+        self.assertEqual(self.get_dashboard()['streak'], {'current': 4})
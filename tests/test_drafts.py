@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+"""
+Response Draft Buffer Test Suite
+Tests write-behind autosave of in-progress test attempts and journal recovery
+"""
+
+import os
+import sys
+import glob
+import shutil
+import tempfile
+import threading
+import django
+from datetime import date
+from unittest import mock
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+
+# Setup Django
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'padhoplus.settings')
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+django.setup()
+
+from padhoplus.users.models import User
+from padhoplus.batches.models import Subject, Batch
+from padhoplus.assessments import drafts, grading
+from padhoplus.assessments.models import Question, Test, TestAttempt, TestResponse
+
+
+# A long interval keeps the background flusher idle so tests flush explicitly.
+@override_settings(
+    RESPONSE_BUFFER_ENABLED=True, RESPONSE_BUFFER_FLUSH_INTERVAL=3600,
+    RESPONSE_JOURNAL_FSYNC=False, RANKING_INTERVAL=0
+)
+class DraftBufferTest(TestCase):
+    def setUp(self):
+        journal_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, journal_dir)
+        journal_settings = self.settings(RESPONSE_JOURNAL_DIR=journal_dir)
+        journal_settings.enable()
+        self.addCleanup(journal_settings.disable)
+        self.journals = lambda: glob.glob(os.path.join(journal_dir, '*.journal'))
+
+        cache.clear()
+        drafts.buffer.flush()
+        self.client = APIClient()
+        self.student = User.objects.create_user(username='student1', password='testpass123')
+        self.client.force_authenticate(self.student)
+        batch = Batch.objects.create(
+            name='JEE Batch', slug='jee-batch', description='Complete preparation batch',
+            target_exam='jee_main', target_class='class_12', start_date=date(2026, 4, 1)
+        )
+        physics = Subject.objects.create(name='Physics', slug='physics')
+        self.questions = Question.objects.bulk_create([
+            Question(subject=physics, question_text=f'Q{i}', correct_answer='A') for i in range(10)
+        ])
+        test = Test.objects.create(batch=batch, subject=physics, title='Mock test')
+        test.questions.add(*self.questions)
+        self.attempt = TestAttempt.objects.create(test=test, student=self.student)
+
+    def tearDown(self):
+        drafts.buffer.flush()
+
+    def save(self, answers, sequence=None, spent=10):
+        data = {'responses': [
+            {'question_id': self.questions[index].pk, 'selected_answer': answer, 'time_spent_seconds': spent}
+            for index, answer in answers.items()
+        ]}
+        if sequence is not None:
+            data['sequence'] = sequence
+        return self.client.post(f'/api/test-attempts/{self.attempt.pk}/save_responses/', data, format='json')
+
+    def stored(self):
+        return dict(TestResponse.objects.filter(attempt=self.attempt).values_list('question__question_text', 'selected_answer'))
+
+    def test_saves_stay_out_of_the_database_until_submit(self):
+        self.save({0: 'A'})
+        with self.assertNumQueries(1):
+            response = self.save({1: 'B', 2: 'A'})
+        self.assertEqual(response.data['saved'], 2)
+        self.assertEqual(response.data['last_sequence'], 2)
+        self.assertTrue(self.save({2: 'C'}, sequence=2).data['duplicate'])
+        self.assertEqual(self.stored(), {})
+
+        response = self.client.post(f'/api/test-attempts/{self.attempt.pk}/submit/', {}, format='json')
+        self.assertEqual(response.data['correct_count'], 2)
+        self.assertEqual(response.data['incorrect_count'], 1)
+        self.assertEqual(self.stored(), {'Q0': 'A', 'Q1': 'B', 'Q2': 'A'})
+        self.assertEqual(drafts.drafts(self.attempt.pk, self.attempt.test_id), ({}, 0))
+
+    def test_periodic_flush_writes_drafts_and_rotates_the_journal(self):
+        self.save({0: 'A', 1: 'B'}, sequence=1)
+        self.save({1: 'C'}, sequence=2, spent=5)
+        self.assertEqual(len(self.journals()), 1)
+
+        self.assertEqual(drafts.buffer.flush(), 2)
+        self.assertEqual(self.stored(), {'Q0': 'A', 'Q1': 'C'})
+        self.assertEqual(TestResponse.objects.get(attempt=self.attempt, question=self.questions[1]).time_spent_seconds, 10)
+        self.attempt.refresh_from_db()
+        self.assertEqual(self.attempt.last_sequence, 2)
+        self.assertEqual(self.journals(), [])
+
+    def test_recovers_unflushed_saves_from_a_dead_process_journal(self):
+        self.save({0: 'A', 1: 'B'}, sequence=1)
+        drafts.buffer.flush()
+        self.save({1: 'C', 2: 'D'}, sequence=2)
+        self.save({3: 'A'}, sequence=3)
+
+        # A live process keeps its journal locked.
+        self.assertEqual(drafts.recover(), (0, 0))
+        # The process dies: its cache entries and buffered ids are gone, its lock released.
+        for journal in drafts.journal.seal():
+            journal.close()
+        drafts.buffer._pending.clear()
+        cache.clear()
+
+        call_command('recover_responses', stdout=open(os.devnull, 'w'))
+        self.assertEqual(self.stored(), {'Q0': 'A', 'Q1': 'C', 'Q2': 'D', 'Q3': 'A'})
+        self.attempt.refresh_from_db()
+        self.assertEqual(self.attempt.last_sequence, 3)
+        self.assertEqual(self.journals(), [])
+        drafts.journal.discard(drafts.journal.seal())
+
+    def test_overlapping_saves_take_turns(self):
+        grading.answer_key(self.attempt.test_id)
+        paused, resume = threading.Event(), threading.Event()
+        merge = drafts.merge
+
+        def slow_merge(*args):
+            if threading.current_thread().name == 'older':
+                paused.set()
+                resume.wait(5)
+            return merge(*args)
+
+        def save(answer, sequence):
+            drafts.save(self.attempt, [{
+                'question_id': self.questions[0].pk, 'selected_answer': answer,
+                'time_spent_seconds': sequence, 'is_marked_for_review': False
+            }], sequence)
+
+        with mock.patch.object(drafts, 'merge', slow_merge):
+            older = threading.Thread(target=save, args=('A', 2), name='older')
+            newer = threading.Thread(target=save, args=('B', 3), name='newer')
+            older.start()
+            self.assertTrue(paused.wait(5))
+            # The older save has read the drafts but not written them yet.
+            newer.start()
+            newer.join(0.2)
+            self.assertTrue(newer.is_alive())
+            resume.set()
+            older.join(5)
+            newer.join(5)
+
+        found, sequence = drafts.drafts(self.attempt.pk, self.attempt.test_id)
+        self.assertEqual(sequence, 3)
+        self.assertEqual(found[self.questions[0].pk], (3, 'B', 3, False))
+
+    def test_single_response_requires_a_numeric_time_spent(self):
+        response = self.client.post(f'/api/test-attempts/{self.attempt.pk}/submit_response/', {
+            'question_id': self.questions[0].pk, 'selected_answer': 'A', 'time_spent_seconds': 'soon'
+        }, format='json')
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('time_spent_seconds', response.data)
+        self.assertEqual(self.stored(), {})
+
+    def test_falls_back_to_the_database_without_a_cache(self):
+        with self.settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'},
+                                   'drafts': {'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+                                              'LOCATION': 'redis://127.0.0.1:1/0'}},
+                           RESPONSE_BUFFER_CACHE_ALIAS='drafts'):
+            with self.assertLogs('padhoplus.assessments.drafts', 'ERROR'):
+                response = self.save({0: 'B'}, sequence=4)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.stored(), {'Q0': 'B'})
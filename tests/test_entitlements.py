@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+Entitlement Test Suite
+Tests per-request and shared caching of a student's active enrollments
+"""
+
+import os
+import sys
+import django
+from datetime import date
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+# Setup Django
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'padhoplus.settings')
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+django.setup()
+
+from padhoplus.users.models import User
+from padhoplus.batches.models import Subject, Batch, Enrollment
+from padhoplus.content.models import Lecture, Note
+
+
+class EntitlementTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.student = User.objects.create_user(username='student1', password='testpass123')
+        self.client.force_authenticate(self.student)
+        subject = Subject.objects.create(name='Physics', slug='physics')
+        self.batch = Batch.objects.create(
+            name='JEE Batch', slug='jee-batch', description='Complete preparation batch',
+            target_exam='jee_main', target_class='class_12', start_date=date(2026, 4, 1)
+        )
+        self.enrollment = Enrollment.objects.create(student=self.student, batch=self.batch, status='active')
+        self.lecture = Lecture.objects.create(
+            batch=self.batch, subject=subject, title='Projectile motion',
+            video_url='https://videos.padhoplus.com/lecture.mp4'
+        )
+        self.note = Note.objects.create(batch=self.batch, subject=subject, title='Optics', file='notes/optics.pdf')
+
+    def enrollment_queries(self, *requests):
+        with CaptureQueriesContext(connection) as queries:
+            responses = [request() for request in requests]
+        return responses, sum('"enrollments"' in query['sql'] for query in queries.captured_queries)
+
+    def test_resolved_once_and_shared_between_requests(self):
+        (response,), count = self.enrollment_queries(lambda: self.client.get(f'/api/lectures/{self.lecture.pk}/'))
+        self.assertEqual(response.status_code, 200)
+        # Queryset filter and enrollment check share one lookup.
+        self.assertEqual(count, 1)
+
+        responses, count = self.enrollment_queries(
+            lambda: self.client.get(f'/api/lectures/{self.lecture.pk}/'),
+            lambda: self.client.get('/api/notes/'),
+            lambda: self.client.post(f'/api/notes/{self.note.pk}/download/'),
+        )
+        self.assertEqual([response.status_code for response in responses], [200, 200, 200])
+        self.assertEqual(count, 0)
+
+    def test_enrollment_changes_take_effect_immediately(self):
+        self.assertEqual(self.client.get(f'/api/lectures/{self.lecture.pk}/').status_code, 200)
+
+        self.enrollment.status = 'cancelled'
+        self.enrollment.save()
+        self.assertEqual(self.client.get(f'/api/lectures/{self.lecture.pk}/').status_code, 404)
+        self.assertEqual(self.client.post(f'/api/notes/{self.note.pk}/download/').status_code, 404)
+
+        self.enrollment.delete()
+        Enrollment.objects.create(student=self.student, batch=self.batch, status='active')
+        self.assertEqual(self.client.get(f'/api/lectures/{self.lecture.pk}/').status_code, 200)
+
+    @override_settings(ENTITLEMENT_CACHE_TIMEOUT=0)
+    def test_without_shared_cache_each_request_looks_up_once(self):
+        _, count = self.enrollment_queries(
+            lambda: self.client.get(f'/api/lectures/{self.lecture.pk}/'),
+            lambda: self.client.get(f'/api/lectures/{self.lecture.pk}/'),
+        )
+        self.assertEqual(count, 2)
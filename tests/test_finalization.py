@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+Attempt Finalization Test Suite
+Tests grading and closing of attempts left open past their deadline
+"""
+
+import os
+import sys
+import django
+from datetime import date, timedelta
+from unittest import mock
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase
+from django.utils import timezone
+
+# Setup Django
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'padhoplus.settings')
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+django.setup()
+
+from padhoplus.users.models import User
+from padhoplus.batches.models import Subject, Batch
+from padhoplus.assessments import finalization, leaderboards, ranking
+from padhoplus.assessments.models import Question, Test, TestAttempt, TestResponse
+from padhoplus.analytics.models import UserProgress
+
+
+class FinalizationTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        patcher = mock.patch.object(leaderboards, '_backend', leaderboards.MemoryBackend())
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.now = timezone.now()
+        self.batch = Batch.objects.create(
+            name='JEE Batch', slug='jee-batch', description='Complete preparation batch',
+            target_exam='jee_main', target_class='class_12', start_date=date(2026, 4, 1)
+        )
+        self.physics = Subject.objects.create(name='Physics', slug='physics')
+        self.questions = Question.objects.bulk_create([
+            Question(subject=self.physics, question_text=f'Q{i}', correct_answer='A') for i in range(3)
+        ])
+        self.test = self.make_test('Mock test', duration_minutes=60)
+        self.students = iter(User.objects.bulk_create([
+            User(username=f'student{i}', email=f'student{i}@example.com') for i in range(12)
+        ]))
+
+    def make_test(self, title, **fields):
+        test = Test.objects.create(batch=self.batch, subject=self.physics, title=title, **fields)
+        test.questions.add(*self.questions)
+        return test
+
+    def attempt(self, test, minutes_ago, answers=(), status='started'):
+        attempt = TestAttempt.objects.create(test=test, student=next(self.students), status=status)
+        TestAttempt.objects.filter(pk=attempt.pk).update(started_at=self.now - timedelta(minutes=minutes_ago))
+        TestResponse.objects.bulk_create([
+            TestResponse(attempt=attempt, question=question, selected_answer=answer)
+            for question, answer in zip(self.questions, answers)
+        ])
+        return attempt
+
+    def test_closes_only_attempts_past_their_deadline(self):
+        answered = self.attempt(self.test, 120, ['A', 'B', ''])
+        blank = self.attempt(self.test, 90, ['', ''])
+        running = self.attempt(self.test, 30, ['A'])
+        # Inside the grace period after the 60 minute duration.
+        grace = self.attempt(self.test, 61, ['A'])
+        closed_early = self.make_test('Closed test', duration_minutes=180, end_datetime=self.now - timedelta(minutes=10))
+        cut_short = self.attempt(closed_early, 40, ['A', 'A', 'A'])
+
+        self.assertEqual(
+            list(finalization.expired(self.now).values_list('pk', flat=True)),
+            [answered.pk, blank.pk, cut_short.pk]
+        )
+        finalized, tests = finalization.finalize_expired(self.now)
+        self.assertEqual((finalized, tests), (3, {self.test.pk, closed_early.pk}))
+
+        answered.refresh_from_db()
+        self.assertEqual(answered.status, 'submitted')
+        self.assertEqual((answered.correct_count, answered.incorrect_count, answered.unattempted_count), (1, 1, 1))
+        self.assertEqual(answered.time_taken_seconds, 3600)
+        self.assertEqual(answered.rank, 1)
+        self.assertEqual(leaderboards.standing(self.test.pk, answered.pk)['rank'], 1)
+
+        cut_short.refresh_from_db()
+        self.assertEqual((cut_short.status, cut_short.correct_count), ('submitted', 3))
+        self.assertEqual(cut_short.time_taken_seconds, 30 * 60)
+
+        blank.refresh_from_db()
+        self.assertEqual(blank.status, 'abandoned')
+        self.assertIsNone(blank.rank)
+        for attempt in (running, grace):
+            attempt.refresh_from_db()
+            self.assertEqual(attempt.status, 'started')
+
+        self.assertEqual(
+            UserProgress.objects.filter(user=answered.student, subject=self.physics, topic=None).get().tests_taken, 1
+        )
+        self.assertFalse(UserProgress.objects.filter(user=blank.student).exists())
+
+    def test_works_in_chunks_and_reranks_each_test_once(self):
+        submitted = self.attempt(self.test, 300, ['A', 'A', 'A'], status='submitted')
+        TestAttempt.objects.filter(pk=submitted.pk).update(score=100, correct_count=3)
+        expired = [self.attempt(self.test, 100 + i, ['A'] * (i % 3)) for i in range(7)]
+        with mock.patch.object(ranking, 'rerank', wraps=ranking.rerank) as rerank:
+            call_command('finalize_expired_attempts', '--chunk-size', '3', stdout=open(os.devnull, 'w'))
+        rerank.assert_called_once_with(self.test.pk)
+        self.assertFalse(TestAttempt.objects.filter(pk__in=[attempt.pk for attempt in expired], status='started').exists())
+        submitted.refresh_from_db()
+        self.assertEqual(submitted.rank, 1)
+        self.assertEqual(TestAttempt.objects.filter(test=self.test, status='submitted').count(), 5)
+
+    def test_records_only_on_a_shared_leaderboard(self):
+        self.attempt(self.test, 120, ['A'])
+        self.attempt(self.test, 130, ['A'])
+        with mock.patch.object(leaderboards, 'record') as record:
+            with mock.patch.object(leaderboards, '_backend', leaderboards.MemoryBackend()):
+                finalization.finalize_expired(self.now)
+            record.assert_not_called()
+
+            self.attempt(self.test, 140, ['A'])
+            shared = mock.Mock(shared=True)
+            with mock.patch.object(leaderboards, '_backend', shared):
+                finalization.finalize_expired(self.now)
+            self.assertEqual(record.call_count, 1)
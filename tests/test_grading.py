@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+Grading Test Suite
+Tests answer-key grading and constant-query test submission
+"""
+
+import os
+import sys
+import django
+from datetime import date
+from decimal import Decimal
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+# Setup Django
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'padhoplus.settings')
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+django.setup()
+
+from padhoplus.users.models import User
+from padhoplus.batches.models import Subject, Batch
+from padhoplus.assessments import grading
+from padhoplus.assessments.models import Question, Test, TestAttempt, TestResponse
+
+
+@override_settings(RANKING_INTERVAL=0)
+class GradingTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.student = User.objects.create_user(username='student1', password='testpass123')
+        self.client.force_authenticate(self.student)
+        self.batch = Batch.objects.create(
+            name='JEE Batch', slug='jee-batch', description='Complete preparation batch',
+            target_exam='jee_main', target_class='class_12', start_date=date(2026, 4, 1)
+        )
+        self.physics = Subject.objects.create(name='Physics', slug='physics')
+
+    def make_test(self, questions):
+        test = Test.objects.create(batch=self.batch, subject=self.physics, title='Mock test')
+        created = [
+            Question.objects.create(
+                subject=self.physics, question_text='?', question_type=question_type,
+                correct_answer=correct_answer, marks=Decimal('4'), negative_marks=Decimal('1.33')
+            )
+            for question_type, correct_answer in questions
+        ]
+        test.questions.add(*created)
+        return test, created
+
+    def submit(self, test, answers):
+        attempt = TestAttempt.objects.create(test=test, student=self.student)
+        TestResponse.objects.bulk_create([
+            TestResponse(attempt=attempt, question=question, selected_answer=answer)
+            for question, answer in answers
+        ])
+        response = self.client.post(f'/api/test-attempts/{attempt.pk}/submit/', {}, format='json')
+        self.assertEqual(response.status_code, 200)
+        attempt.refresh_from_db()
+        return attempt
+
+    def test_grade_by_question_type(self):
+        entry = lambda question_type, answer: (
+            question_type, grading.parse_key(question_type, answer), Decimal('4'), Decimal('1')
+        )
+        self.assertEqual(grading.grade(entry('mcq', 'b'), ' B '), (True, Decimal('4')))
+        self.assertEqual(grading.grade(entry('mcq', 'B'), 'C'), (False, Decimal('-1')))
+        self.assertEqual(grading.grade(entry('msq', 'A,C'), ' c, a '), (True, Decimal('4')))
+        self.assertEqual(grading.grade(entry('msq', 'A,C'), 'C A'), (True, Decimal('4')))
+        self.assertEqual(grading.grade(entry('msq', 'A,C'), 'CA'), (False, Decimal('-1')))
+        self.assertEqual(grading.grade(entry('msq', 'A,B,D'), 'BAD'), (False, Decimal('-1')))
+        self.assertEqual(grading.grade(entry('msq', 'A,I,N,O,P,T'), 'Option A'), (False, Decimal('-1')))
+        self.assertEqual(grading.grade(entry('msq', 'A,C'), 'A'), (False, Decimal('-1')))
+        self.assertEqual(grading.grade(entry('numerical', '9.81'), '9.815'), (True, Decimal('4')))
+        self.assertEqual(grading.grade(entry('numerical', '9.81'), '9.9'), (False, Decimal('-1')))
+        self.assertEqual(grading.grade(entry('numerical', '2.5:3.5'), '3'), (True, Decimal('4')))
+        self.assertEqual(grading.grade(entry('numerical', '9.81'), 'ten'), (False, Decimal('-1')))
+        self.assertEqual(grading.grade(entry('mcq', 'A'), ''), (None, Decimal('0')))
+        self.assertEqual(grading.grade(entry('subjective', 'Essay'), 'Essay'), (None, Decimal('0')))
+
+    def test_submit_scores_with_decimal_marks(self):
+        test, questions = self.make_test([('mcq', 'A'), ('msq', 'B,D'), ('numerical', '1.5'), ('mcq', 'C')])
+        attempt = self.submit(test, [
+            (questions[0], 'a'), (questions[1], 'D,B'), (questions[2], '1.2'), (questions[3], ''),
+        ])
+        self.assertEqual(attempt.status, 'submitted')
+        self.assertEqual(attempt.score, Decimal('6.67'))
+        self.assertEqual((attempt.correct_count, attempt.incorrect_count, attempt.unattempted_count), (2, 1, 1))
+        self.assertEqual(
+            list(TestResponse.objects.filter(attempt=attempt).order_by('question_id').values_list(
+                'is_correct', 'marks_obtained'
+            )),
+            [(True, Decimal('4')), (True, Decimal('4')), (False, Decimal('-1.33')), (False, Decimal('0'))]
+        )
+
+    def test_grading_queries_do_not_grow_with_questions(self):
+        def grading_queries(count):
+            test, questions = self.make_test([('mcq', 'A')] * count)
+            attempt = TestAttempt.objects.create(test=test, student=self.student)
+            TestResponse.objects.bulk_create([
+                TestResponse(attempt=attempt, question=question, selected_answer='A') for question in questions
+            ])
+            grading.answer_key(test.pk)
+            with CaptureQueriesContext(connection) as queries:
+                grading.grade_attempt(attempt)
+            self.assertEqual(attempt.correct_count, count)
+            return len(queries)
+
+        self.assertEqual(grading_queries(5), grading_queries(90))
+        self.assertLessEqual(grading_queries(3), 2)
+
+    def test_answer_key_follows_question_edits(self):
+        test, questions = self.make_test([('mcq', 'A')])
+        self.assertEqual(grading.answer_key(test.pk)[questions[0].pk][1], 'A')
+        with self.assertNumQueries(0):
+            grading.answer_key(test.pk)
+
+        questions[0].correct_answer = 'B'
+        questions[0].save()
+        self.assertEqual(grading.answer_key(test.pk)[questions[0].pk][1], 'B')
+
+        extra = Question.objects.create(subject=self.physics, question_text='?', correct_answer='C')
+        test.questions.add(extra)
+        self.assertIn(extra.pk, grading.answer_key(test.pk))
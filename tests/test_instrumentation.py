@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+Request Instrumentation Test Suite
+Tests Server-Timing headers, duplicate-query logging and the metrics endpoint
+"""
+
+import os
+import re
+import sys
+import django
+from django.test import TestCase, override_settings
+from django.urls import path
+from rest_framework.decorators import api_view
+from rest_framework.response import Response
+from rest_framework.test import APIClient
+
+# Setup Django
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'padhoplus.settings')
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+django.setup()
+
+from padhoplus import instrumentation
+from padhoplus.users.models import User
+from padhoplus.batches.models import Subject
+from padhoplus.doubts.models import Doubt
+from padhoplus.doubts.serializers import DoubtListSerializer
+
+
+@api_view(['GET'])
+def unannotated_doubts(request):
+    """The doubt list without its response counts annotated: one more query per doubt."""
+    doubts = Doubt.objects.select_related('student', 'subject', 'topic')
+    return Response(DoubtListSerializer(doubts, many=True).data)
+
+
+urlpatterns = [
+    path('doubt-counts/', unannotated_doubts, name='doubt-counts'),
+]
+
+
+class RequestMetricsTest(TestCase):
+    def setUp(self):
+        instrumentation.registry.clear()
+        self.client = APIClient()
+        self.student = User.objects.create_user(username='student1', password='testpass123')
+        self.admin = User.objects.create_user(username='admin1', password='testpass123', role='admin')
+        subject = Subject.objects.create(name='Physics', slug='physics')
+        Doubt.objects.bulk_create([
+            Doubt(student=self.student, subject=subject, title=f'Doubt {i}', description='Why?') for i in range(6)
+        ])
+
+    def timing(self, response):
+        return {
+            name: (float(duration), desc) for name, duration, desc in
+            re.findall(r'(\w+);dur=([\d.]+)(?:;desc="([^"]*)")?', response['Server-Timing'])
+        }
+
+    @override_settings(ROOT_URLCONF=__name__)
+    def test_server_timing_counts_queries_and_duplicates(self):
+        self.client.force_authenticate(self.student)
+        with self.assertLogs('padhoplus.instrumentation', 'INFO') as logs:
+            response = self.client.get('/doubt-counts/')
+        self.assertEqual(response.status_code, 200)
+
+        timing = self.timing(response)
+        queries, duplicates = map(int, re.match(r'(\d+) queries, (\d+) duplicate', timing['db'][1]).groups())
+        # The doubts plus one response count per doubt, all but one of them repeats.
+        self.assertEqual((queries, duplicates), (7, 5))
+        self.assertGreater(timing['serializer'][0], 0)
+        self.assertGreaterEqual(timing['total'][0], timing['db'][0])
+
+        [record] = logs.records
+        self.assertEqual(record.levelname, 'INFO')
+        self.assertEqual(record.request_metrics['route'], 'doubt-counts')
+        self.assertEqual(record.request_metrics['action'], 'get')
+        self.assertEqual(record.request_metrics['queries'], 7)
+
+    @override_settings(ROOT_URLCONF=__name__, REQUEST_METRICS_DUPLICATE_THRESHOLD=5)
+    def test_repeated_statements_are_logged_as_warnings(self):
+        self.client.force_authenticate(self.student)
+        with self.assertLogs('padhoplus.instrumentation', 'WARNING') as logs:
+            self.client.get('/doubt-counts/')
+        [record] = logs.records
+        self.assertEqual(record.request_metrics['repeated_times'], 6)
+        self.assertIn('doubt_responses', record.request_metrics['repeated_sql'])
+
+    def test_metrics_endpoint_is_admin_only(self):
+        self.client.force_authenticate(self.student)
+        for _ in range(3):
+            self.client.get('/api/doubts/')
+        self.assertEqual(self.client.get('/api/metrics/').status_code, 403)
+
+        self.client.force_authenticate(self.admin)
+        response = self.client.get('/api/metrics/')
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response['Content-Type'].startswith('text/plain; version=0.0.4'))
+        body = response.content.decode()
+        self.assertIn('# TYPE padhoplus_request_duration_seconds summary', body)
+        self.assertIn('padhoplus_request_queries_count{route="doubt-list",action="list"} 3', body)
+        self.assertRegex(body, r'padhoplus_request_duration_seconds\{route="doubt-list",action="list",quantile="0.99"\} [\d.e-]+')
+
+    @override_settings(REQUEST_METRICS_ENABLED=False)
+    def test_disabled(self):
+        self.client.force_authenticate(self.student)
+        self.assertNotIn('Server-Timing', self.client.get('/api/doubts/'))
+
+    def test_histogram_quantiles(self):
+        histogram = instrumentation.Histogram((1, 2, 5, 10))
+        for value in [0.5] * 50 + [1.5] * 45 + [8] * 5:
+            histogram.observe(value)
+        self.assertEqual(histogram.quantile(0.5), 1)
+        self.assertAlmostEqual(histogram.quantile(0.95), 2)
+        self.assertAlmostEqual(histogram.quantile(0.97), 5 + 5 * 2 / 5)
+        # Capped at the largest value seen.
+        self.assertEqual(histogram.quantile(0.99), 8)
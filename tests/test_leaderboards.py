@@ -0,0 +1,236 @@
+#!/usr/bin/env python3
+"""
+Leaderboard Test Suite
+Tests the sorted-set leaderboard index and the live leaderboard endpoints
+"""
+
+import os
+import sys
+import random
+import unittest
+import django
+from datetime import date
+from decimal import Decimal
+from unittest import mock
+from django.core.cache import cache
+from django.test import SimpleTestCase, TestCase, override_settings
+from rest_framework.test import APIClient
+
+# Setup Django
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'padhoplus.settings')
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+django.setup()
+
+from padhoplus.users.models import User
+from padhoplus.batches.models import Subject, Batch, Enrollment
+from padhoplus.assessments import leaderboards, ranking
+from padhoplus.assessments.models import Question, Test, TestAttempt, TestResponse
+
+try:
+    import fakeredis
+except ImportError:
+    fakeredis = None
+
+
+class SortedSetTest(SimpleTestCase):
+    def test_matches_sorted_list(self):
+        rng = random.Random(7)
+        sorted_set = leaderboards.SortedSet()
+        expected = {}
+        for _ in range(2000):
+            member = rng.randrange(300)
+            if rng.random() < 0.2:
+                sorted_set.remove(member)
+                expected.pop(member, None)
+            else:
+                score = float(rng.randrange(50))
+                sorted_set.add(member, score)
+                expected[member] = score
+
+        order = sorted(expected, key=lambda member: (-expected[member], member))
+        self.assertEqual([member for member, _, _ in sorted_set.range(0, len(order))], order)
+        self.assertEqual([member for member, _, _ in sorted_set.range(10, 19)], order[10:20])
+        for position, member in enumerate(order):
+            self.assertEqual(sorted_set.position(member), position)
+            self.assertEqual(
+                sorted_set.count_above(expected[member]),
+                sum(score > expected[member] for score in expected.values())
+            )
+        self.assertIsNone(sorted_set.position(1000))
+
+
+@override_settings(LEADERBOARD_BACKEND='memory', RANKING_INTERVAL=3600)
+class LeaderboardTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        leaderboards.backend().clear()
+        self.client = APIClient()
+        self.batch = Batch.objects.create(
+            name='JEE Batch', slug='jee-batch', description='Complete preparation batch',
+            target_exam='jee_main', target_class='class_12', start_date=date(2026, 4, 1)
+        )
+        self.physics = Subject.objects.create(name='Physics', slug='physics')
+        self.test = Test.objects.create(batch=self.batch, subject=self.physics, title='Mock test', status='live')
+        self.question = Question.objects.create(subject=self.physics, question_text='?', correct_answer='A')
+        self.test.questions.add(self.question)
+
+    def tearDown(self):
+        ranking.buffer.flush()
+
+    def student(self, username, **fields):
+        student = User.objects.create_user(username=username, password='testpass123', **fields)
+        Enrollment.objects.create(student=student, batch=self.batch, status='active')
+        return student
+
+    def attempt(self, username, score, time_taken):
+        student = self.student(username, first_name=username.title())
+        return TestAttempt.objects.create(
+            test=self.test, student=student, status='submitted', score=score,
+            time_taken_seconds=time_taken, correct_count=1
+        )
+
+    def test_rebuilds_from_attempts_with_shared_ranks(self):
+        for username, score, time_taken in [
+            ('asha', Decimal('80'), 500), ('ravi', Decimal('80'), 900),
+            ('meera', Decimal('80'), 900), ('kabir', Decimal('40'), 100),
+        ]:
+            self.attempt(username, score, time_taken)
+
+        self.client.force_authenticate(User.objects.get(username='asha'))
+        self.client.get('/api/tests/upcoming/')  # Caches the student's enrollments.
+        with self.assertNumQueries(2):
+            response = self.client.get(f'/api/tests/{self.test.pk}/leaderboard/')
+        self.assertEqual(
+            [(row['rank'], row['student_name'], row['score']) for row in response.data],
+            [(1, 'Asha', '80.00'), (2, 'Ravi', '80.00'), (2, 'Meera', '80.00'), (4, 'Kabir', '40.00')]
+        )
+        # Loaded once per test; later reads only fetch the test itself.
+        with self.assertNumQueries(1):
+            self.client.get(f'/api/tests/{self.test.pk}/leaderboard/')
+
+    def test_submission_is_ranked_immediately(self):
+        for i in range(10):
+            self.attempt(f'student{i}', Decimal(i * 4), 600)
+        student = self.student('late')
+        attempt = TestAttempt.objects.create(test=self.test, student=student)
+        TestResponse.objects.create(attempt=attempt, question=self.question, selected_answer='A')
+        self.client.force_authenticate(student)
+        self.client.get(f'/api/tests/{self.test.pk}/leaderboard/')
+
+        self.client.post(f'/api/test-attempts/{attempt.pk}/submit/', {'time_taken_seconds': 300}, format='json')
+        response = self.client.get(f'/api/tests/{self.test.pk}/my_rank/', {'neighbours': 1})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['total'], 11)
+        # Four marks ties with student1 on score but was faster.
+        self.assertEqual(response.data['rank'], 9)
+        self.assertEqual(
+            [(row['rank'], row['student_name']) for row in response.data['neighbours']],
+            [(8, 'Student2'), (9, 'late'), (10, 'Student1')]
+        )
+        self.assertIsNone(TestAttempt.objects.get(pk=attempt.pk).rank)
+
+    def test_my_rank_requires_a_submission(self):
+        student = self.student('student1')
+        self.client.force_authenticate(student)
+        response = self.client.get(f'/api/tests/{self.test.pk}/my_rank/')
+        self.assertEqual(response.status_code, 404)
+
+    def test_my_rank_validates_neighbours(self):
+        for i in range(30):
+            self.attempt(f'student{i}', Decimal(i), 600)
+        self.client.force_authenticate(User.objects.get(username='student15'))
+        url = f'/api/tests/{self.test.pk}/my_rank/'
+
+        response = self.client.get(url, {'neighbours': 'abc'})
+        self.assertEqual(response.status_code, 400)
+        response = self.client.get(url, {'neighbours': -3})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([row['student_name'] for row in response.data['neighbours']], ['Student15'])
+        response = self.client.get(url, {'neighbours': 1000})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data['neighbours']), 30)
+        self.assertEqual(leaderboards.standing(self.test.pk, response.data['entry']['attempt_id'], -3)['rank'], 15)
+
+
+@unittest.skipIf(fakeredis is None, 'fakeredis is not installed')
+class RedisLeaderboardTest(LeaderboardTest):
+    """The endpoint tests again, on RedisBackend."""
+
+    def setUp(self):
+        with mock.patch('redis.Redis.from_url', return_value=fakeredis.FakeRedis()):
+            redis_backend = leaderboards.RedisBackend('redis://localhost:6379/0')
+        patcher = mock.patch.object(leaderboards, '_backend', redis_backend)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        super().setUp()
+
+
+@unittest.skipIf(fakeredis is None, 'fakeredis is not installed')
+class RedisBackendTest(SimpleTestCase):
+    def setUp(self):
+        with mock.patch('redis.Redis.from_url', return_value=fakeredis.FakeRedis()):
+            self.backend = leaderboards.RedisBackend('redis://localhost:6379/0', ttl=30)
+        self.key = leaderboards.SET_KEY.format(test_id=1)
+
+    def item(self, attempt_id, score):
+        return attempt_id, float(score), {'attempt_id': attempt_id}
+
+    def members(self):
+        return [member for member, _, _ in self.backend.range(self.key, 0, -1)]
+
+    def test_rebuild_keeps_attempts_recorded_meanwhile(self):
+        self.backend.replace(self.key, lambda: [self.item(1, 10)])
+
+        def load():
+            # Read before attempt 3 was committed; it is recorded while the
+            # rebuild is still writing.
+            self.backend.add(self.key, *self.item(3, 30))
+            return [self.item(1, 10), self.item(2, 20)]
+
+        self.backend.replace(self.key, load)
+        self.assertEqual(self.members(), [3, 2, 1])
+        self.assertEqual(self.backend.range(self.key, 0, 0)[0][2], {'attempt_id': 3})
+        self.assertFalse(self.backend.client.exists(f'{self.key}:next', f'{self.key}:rebuild'))
+
+    def test_one_worker_rebuilds_at_a_time(self):
+        self.backend.replace(self.key, lambda: [self.item(1, 10)])
+        self.backend.client.delete(f'{self.key}:loaded')
+        self.backend.client.set(f'{self.key}:rebuild', 'other-worker')
+
+        load = mock.Mock(return_value=[])
+        self.backend.replace(self.key, load)
+        load.assert_not_called()
+        self.assertEqual(self.members(), [1])
+        self.assertFalse(self.backend.loaded(self.key))
+
+    def test_loaded_expires(self):
+        self.backend.replace(self.key, lambda: [])
+        self.assertTrue(self.backend.loaded(self.key))
+        self.assertGreater(self.backend.client.pttl(f'{self.key}:loaded'), 0)
+
+
+@override_settings(LEADERBOARD_BACKEND='memory')
+class MemoryBackendTest(TestCase):
+    def test_reloads_submissions_from_other_workers_after_ttl(self):
+        batch = Batch.objects.create(
+            name='JEE Batch', slug='jee-batch', description='Complete preparation batch',
+            target_exam='jee_main', target_class='class_12', start_date=date(2026, 4, 1)
+        )
+        physics = Subject.objects.create(name='Physics', slug='physics')
+        test = Test.objects.create(batch=batch, subject=physics, title='Mock test', status='live')
+
+        def submit(username, score):
+            student = User.objects.create_user(username=username, password='testpass123')
+            TestAttempt.objects.create(test=test, student=student, status='submitted', score=score)
+
+        submit('asha', Decimal('80'))
+        now = [1000.0]
+        with mock.patch.object(leaderboards, '_backend', leaderboards.MemoryBackend(ttl=30)), \
+                mock.patch('padhoplus.assessments.leaderboards.time.monotonic', lambda: now[0]):
+            self.assertEqual(len(leaderboards.top(test.pk)), 1)
+            # Saved by another worker: this process's set does not see it yet.
+            submit('ravi', Decimal('90'))
+            now[0] += 29
+            self.assertEqual(len(leaderboards.top(test.pk)), 1)
+            now[0] += 2
+            self.assertEqual([row['rank'] for row in leaderboards.top(test.pk)], [1, 2])
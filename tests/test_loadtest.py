@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Load Test Suite
+Tests the synthetic data generator and the in-process benchmark runner
+"""
+
+import os
+import sys
+import django
+from io import StringIO
+from unittest import mock
+from django.core.cache import cache
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db.models import F, Sum
+from django.test import TransactionTestCase, override_settings
+
+# Setup Django
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'padhoplus.settings')
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+django.setup()
+
+from padhoplus import counters, loadtest
+from padhoplus.assessments import ranking
+from padhoplus.content import watch_progress
+from padhoplus.users.models import User
+from padhoplus.batches.models import Batch, Enrollment
+from padhoplus.content.models import Lecture, WatchHistory
+from padhoplus.assessments.models import Test, TestAttempt
+from padhoplus.doubts.models import Doubt, DoubtResponse
+
+SMALL = {
+    'users': 40, 'batches': 4, 'lectures_per_batch': 5, 'questions': 60, 'tests_per_batch': 2,
+    'questions_per_test': 10, 'attempts': 30, 'watch_history': 150, 'doubts': 30, 'chunk_size': 25,
+}
+
+
+# Worker threads use their own connections, so the data has to be committed.
+@override_settings(REQUEST_METRICS_ENABLED=False)
+class LoadTest(TransactionTestCase):
+    def setUp(self):
+        cache.clear()
+        call_command('generate_load_data', stdout=StringIO(), **SMALL)
+
+    def tearDown(self):
+        for buffer in (counters.buffer, ranking.buffer, watch_progress.buffer):
+            buffer.flush()
+
+    def test_generates_the_requested_scale(self):
+        self.assertEqual(User.objects.filter(username__startswith='load_student_').count(), 40)
+        self.assertEqual(Batch.objects.count(), 4)
+        self.assertEqual(Lecture.objects.count(), 20)
+        self.assertEqual(Enrollment.objects.filter(status='active').count(), 80)
+        self.assertEqual(Test.objects.filter(status='live').count(), 4)
+        self.assertEqual(TestAttempt.objects.filter(status='submitted').count(), 30)
+        self.assertEqual(WatchHistory.objects.count(), 150)
+        self.assertEqual((Doubt.objects.count(), DoubtResponse.objects.count()), (30, 15))
+        # bulk_create skips the signals that keep enrollment counts; the command recomputes them.
+        self.assertEqual(Batch.objects.aggregate(total=Sum('active_enrollments_count'))['total'], 80)
+        # Watch history only covers lectures of the student's own batches.
+        self.assertFalse(WatchHistory.objects.exclude(
+            lecture__batch__enrollments__student=F('user')
+        ).exists())
+
+        with self.assertRaises(CommandError):
+            call_command('generate_load_data', stdout=StringIO(), **SMALL)
+
+    def test_benchmark_runs_every_scenario(self):
+        out = StringIO()
+        call_command('benchmark_load', iterations=24, concurrency=1, students=10, autosaves=2, stdout=out)
+        output = out.getvalue()
+        for endpoint in (
+            'GET batch-list', 'GET batch-detail', 'POST watch-history-heartbeats', 'POST test-start',
+            'POST test-attempt-save-responses', 'POST test-attempt-submit', 'GET doubt-list', 'GET doubt-detail',
+        ):
+            self.assertIn(endpoint, output)
+        self.assertIn(' 0 errors in ', output)
+
+    def test_mock_tests_are_sat_once_per_student(self):
+        population = loadtest.Population(students=10)
+        bench = loadtest.Benchmark(population, {'mock_test': 1}, concurrency=1)
+        pairs = len(population.takers)
+        bench.run(iterations=pairs + 3)
+        self.assertEqual(dict(bench.scenarios['mock_test']), {'runs': pairs, 'failures': 0, 'skipped': 3})
+        self.assertEqual(TestAttempt.objects.filter(test__status='live', status='submitted').count(), pairs)
+
+    def test_rejects_invalid_options(self):
+        for options in ({'autosaves': 0}, {'concurrency': 0}, {'mix': 'catalog=-1,doubts=2'}, {'duration': -5}):
+            with self.subTest(options), self.assertRaises(CommandError):
+                call_command('benchmark_load', stdout=StringIO(), **options)
+
+    def test_unexpected_errors_count_as_failures(self):
+        bench = loadtest.Benchmark(loadtest.Population(students=10), {'catalog': 1}, concurrency=2)
+        broken = mock.Mock(side_effect=KeyError('results'))
+        with mock.patch.dict(loadtest.SCENARIOS, {'catalog': broken}), self.assertLogs('padhoplus.loadtest', 'ERROR'):
+            bench.run(iterations=6)
+        self.assertEqual(dict(bench.scenarios['catalog']), {'runs': 6, 'failures': 6, 'skipped': 0})
@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+Materialized Leaderboard Test Suite
+Tests set-based leaderboard materialization and the keyset-paginated endpoint
+"""
+
+import os
+import sys
+import django
+from datetime import date, datetime
+from decimal import Decimal
+from django.test import TestCase
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+# Setup Django
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'padhoplus.settings')
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+django.setup()
+
+from padhoplus.users.models import User
+from padhoplus.batches.models import Subject, Batch
+from padhoplus.assessments.models import Test, TestAttempt
+from padhoplus.analytics.models import DailyActivity, Leaderboard
+from padhoplus.analytics.leaderboards import materialize
+
+TODAY = date(2026, 10, 14)
+
+
+class MaterializedLeaderboardTest(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        physics = Subject.objects.create(name='Physics', slug='physics')
+        self.batches = [
+            Batch.objects.create(
+                name=f'Batch {i}', slug=f'batch-{i}', description='Preparation batch',
+                target_exam='jee_main', target_class='class_12', start_date=date(2026, 4, 1)
+            )
+            for i in range(2)
+        ]
+        self.tests = [Test.objects.create(batch=batch, subject=physics, title='Mock') for batch in self.batches]
+        self.students = {
+            name: User.objects.create_user(username=name, password='testpass123', first_name=name.title())
+            for name in ('asha', 'ravi', 'meera')
+        }
+
+    def submit(self, name, test, score, day):
+        TestAttempt.objects.create(
+            test=test, student=self.students[name], status='submitted', score=Decimal(score),
+            submitted_at=timezone.make_aware(datetime.combine(day, datetime.min.time().replace(hour=12)))
+        )
+
+    def board(self, leaderboard_type, **filters):
+        return list(Leaderboard.objects.filter(leaderboard_type=leaderboard_type, **filters).order_by(
+            'batch_id', 'rank', 'user__username'
+        ).values_list('batch_id', 'user__username', 'rank', 'score'))
+
+    def test_scopes_rank_points(self):
+        self.submit('asha', self.tests[0], '60', TODAY)
+        self.submit('ravi', self.tests[0], '40', date(2026, 9, 20))
+        self.submit('ravi', self.tests[1], '50', TODAY)
+        self.submit('meera', self.tests[1], '50', date(2026, 10, 2))
+        DailyActivity.objects.create(user=self.students['meera'], date=TODAY, questions_practiced=10, lectures_watched=5)
+
+        self.assertEqual(materialize('overall', TODAY), 3)
+        self.assertEqual(self.board('overall'), [
+            (None, 'ravi', 1, Decimal('90.00')), (None, 'meera', 2, Decimal('70.00')),
+            (None, 'asha', 3, Decimal('60.00')),
+        ])
+
+        materialize('weekly', TODAY)
+        self.assertEqual(self.board('weekly'), [
+            (None, 'asha', 1, Decimal('60.00')), (None, 'ravi', 2, Decimal('50.00')),
+            (None, 'meera', 3, Decimal('20.00')),
+        ])
+        self.assertEqual(
+            set(Leaderboard.objects.filter(leaderboard_type='weekly').values_list('period_start', 'period_end')),
+            {(date(2026, 10, 12), date(2026, 10, 18))}
+        )
+
+        materialize('monthly', TODAY)
+        self.assertEqual([row[1:3] for row in self.board('monthly')], [('meera', 1), ('asha', 2), ('ravi', 3)])
+
+        materialize('batch', TODAY)
+        first, second = self.batches
+        self.assertEqual(self.board('batch'), [
+            (first.pk, 'asha', 1, Decimal('60.00')), (first.pk, 'ravi', 2, Decimal('40.00')),
+            (second.pk, 'meera', 1, Decimal('50.00')), (second.pk, 'ravi', 1, Decimal('50.00')),
+        ])
+
+    def test_rerun_replaces_only_the_current_period(self):
+        self.submit('asha', self.tests[0], '60', date(2026, 10, 7))
+        materialize('weekly', date(2026, 10, 7))
+        self.submit('ravi', self.tests[0], '30', TODAY)
+        materialize('weekly', TODAY)
+        materialize('weekly', TODAY)
+
+        self.assertEqual(Leaderboard.objects.filter(leaderboard_type='weekly').count(), 2)
+        self.client.force_authenticate(self.students['asha'])
+        response = self.client.get('/api/leaderboards/', {'type': 'weekly'})
+        self.assertEqual([row['student_name'] for row in response.data['results']], ['Ravi'])
+        response = self.client.get('/api/leaderboards/', {'type': 'weekly', 'period_start': '2026-10-05'})
+        self.assertEqual([row['student_name'] for row in response.data['results']], ['Asha'])
+
+    def test_endpoint_pages_with_cursor(self):
+        users = User.objects.bulk_create([User(username=f'student{i}') for i in range(120)])
+        DailyActivity.objects.bulk_create([
+            DailyActivity(user=user, date=TODAY, questions_practiced=i + 1) for i, user in enumerate(users)
+        ])
+        materialize('overall', TODAY)
+
+        self.client.force_authenticate(self.students['asha'])
+        seen = []
+        url, params = '/api/leaderboards/', {'type': 'overall'}
+        while url:
+            with self.assertNumQueries(1):
+                response = self.client.get(url, params)
+            seen.extend(row['rank'] for row in response.data['results'])
+            url, params = response.data['next'], None
+        self.assertEqual(seen, list(range(1, 121)))
+
+        self.assertEqual(self.client.get('/api/leaderboards/', {'type': 'batch'}).status_code, 400)
+        self.assertEqual(self.client.get('/api/leaderboards/', {'type': 'test'}).status_code, 400)
@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+Keyset Pagination Test Suite
+Tests cursor pages over doubts and test attempts, with and without counts
+"""
+
+import os
+import sys
+import django
+from datetime import date, timedelta
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+# Setup Django
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'padhoplus.settings')
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+django.setup()
+
+from padhoplus.users.models import User
+from padhoplus.batches.models import Subject, Batch
+from padhoplus.doubts.models import Doubt
+from padhoplus.assessments.models import Test, TestAttempt
+
+
+class KeysetPaginationTest(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.student = User.objects.create_user(username='student1', password='testpass123')
+        self.client.force_authenticate(self.student)
+        subject = Subject.objects.create(name='Physics', slug='physics')
+        Doubt.objects.bulk_create([
+            Doubt(student=self.student, subject=subject, title=f'Doubt {i}', description='Why?')
+            for i in range(45)
+        ])
+        # Pairs of doubts share a timestamp, so ties must be broken by id.
+        now = timezone.now()
+        for doubt in Doubt.objects.all():
+            Doubt.objects.filter(pk=doubt.pk).update(created_at=now - timedelta(minutes=doubt.pk // 2))
+        self.expected = list(Doubt.objects.order_by('-created_at', '-id').values_list('pk', flat=True))
+
+    def walk(self, url):
+        seen, pages = [], []
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            pages.append(response.data)
+            seen += [doubt['id'] for doubt in response.data['results']]
+            url = response.data['next']
+        return seen, pages
+
+    def list_counts(self, url):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+        count_sql = 'SELECT COUNT(*) AS "__count" FROM "doubts" '
+        return response, sum(query['sql'].startswith(count_sql) for query in queries.captured_queries)
+
+    def test_walks_every_row_once_in_order(self):
+        seen, pages = self.walk('/api/doubts/')
+        self.assertEqual(seen, self.expected)
+        self.assertEqual([len(page['results']) for page in pages], [20, 20, 5])
+        self.assertEqual(pages[0]['count'], 45)
+        self.assertIsNone(pages[0]['previous'])
+
+        # Going back from the last page returns the middle one.
+        back = self.client.get(pages[2]['previous']).data
+        self.assertEqual([doubt['id'] for doubt in back['results']], self.expected[20:40])
+        self.assertEqual(back['next'], pages[1]['next'])
+
+    def test_deep_pages_skip_the_count_on_request(self):
+        first = self.client.get('/api/doubts/', {'count': 'false', 'page_size': 10}).data
+        self.assertNotIn('count', first)
+        response, counts = self.list_counts(first['next'])
+        self.assertEqual([doubt['id'] for doubt in response.data['results']], self.expected[10:20])
+        self.assertEqual(counts, 0)
+        _, counts = self.list_counts(first['next'].replace('count=false', 'count=true'))
+        self.assertEqual(counts, 1)
+
+    def test_page_numbers_and_bad_cursors(self):
+        response = self.client.get('/api/doubts/', {'page': 3})
+        self.assertEqual([doubt['id'] for doubt in response.data['results']], self.expected[40:])
+        self.assertEqual(response.data['count'], 45)
+        self.assertEqual(self.client.get('/api/doubts/', {'cursor': 'not-a-cursor'}).status_code, 404)
+
+    def test_attempts_page_by_start_time(self):
+        batch = Batch.objects.create(
+            name='JEE Batch', slug='jee-batch', description='Complete preparation batch',
+            target_exam='jee_main', target_class='class_12', start_date=date(2026, 4, 1)
+        )
+        tests = Test.objects.bulk_create([Test(batch=batch, title=f'Test {i}') for i in range(25)])
+        TestAttempt.objects.bulk_create([TestAttempt(test=test, student=self.student) for test in tests])
+        expected = list(TestAttempt.objects.order_by('-started_at', '-id').values_list('pk', flat=True))
+
+        first = self.client.get('/api/test-attempts/').data
+        second = self.client.get(first['next']).data
+        self.assertEqual([attempt['id'] for attempt in first['results'] + second['results']], expected)
+        self.assertIsNone(second['next'])
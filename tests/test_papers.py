@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+Test Paper Bundle Test Suite
+Tests pre-rendered, answer-free test papers served to students
+"""
+
+import os
+import sys
+import gzip
+import json
+import django
+from datetime import date
+from unittest import mock
+from django.core.cache import cache
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+# Setup Django
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'padhoplus.settings')
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+django.setup()
+
+from padhoplus.users.models import User
+from padhoplus.batches.models import Subject, Batch, Enrollment
+from padhoplus.assessments import papers
+from padhoplus.assessments.models import Question, Test
+
+
+class PaperBundleTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.student = User.objects.create_user(username='student1', password='testpass123')
+        batch = Batch.objects.create(
+            name='JEE Batch', slug='jee-batch', description='Complete preparation batch',
+            target_exam='jee_main', target_class='class_12', start_date=date(2026, 4, 1)
+        )
+        Enrollment.objects.create(student=self.student, batch=batch, status='active')
+        physics = Subject.objects.create(name='Physics', slug='physics')
+        self.questions = [
+            Question.objects.create(
+                subject=physics, question_text=f'Question {i}', option_a='1', option_b='2',
+                correct_answer='B', solution='Because.'
+            )
+            for i in range(3)
+        ]
+        self.test = Test.objects.create(batch=batch, subject=physics, title='Mock test', duration_minutes=180)
+        self.test.questions.set(self.questions)
+        self.test.status = 'live'
+        with self.captureOnCommitCallbacks(execute=True):
+            self.test.save()
+        self.url = f'/api/tests/{self.test.pk}/'
+
+    def test_students_get_the_paper_without_answers(self):
+        self.client.force_authenticate(self.student)
+        self.client.get('/api/tests/upcoming/')  # Caches the student's enrollments.
+        with self.assertNumQueries(1):
+            response = self.client.get(self.url, HTTP_ACCEPT_ENCODING='gzip, deflate')
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertIn('Accept-Encoding', response['Vary'])
+        paper = json.loads(gzip.decompress(response.content))
+        self.assertEqual(paper['title'], 'Mock test')
+        self.assertEqual(paper['question_count'], 3)
+        self.assertEqual([q['question_text'] for q in paper['questions']], ['Question 0', 'Question 1', 'Question 2'])
+        for question in paper['questions']:
+            self.assertNotIn('correct_answer', question)
+            self.assertNotIn('solution', question)
+
+        plain = self.client.get(self.url)
+        self.assertFalse(plain.has_header('Content-Encoding'))
+        self.assertEqual(json.loads(plain.content), paper)
+
+        revalidated = self.client.get(self.url, HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(revalidated.status_code, 304)
+
+    def test_question_edits_replace_the_bundle(self):
+        self.client.force_authenticate(self.student)
+        etag = self.client.get(self.url)['ETag']
+
+        self.questions[0].question_text = 'Corrected question'
+        self.questions[0].save()
+        response = self.client.get(self.url)
+        self.assertNotEqual(response['ETag'], etag)
+        self.assertEqual(json.loads(response.content)['questions'][0]['question_text'], 'Corrected question')
+
+        self.test.questions.remove(self.questions[2])
+        self.assertEqual(json.loads(self.client.get(self.url).content)['question_count'], 2)
+
+    def test_bundle_built_during_an_edit_is_not_served(self):
+        self.client.force_authenticate(self.student)
+        self.client.get(self.url)
+        serializer = papers.TestPaperSerializer
+
+        def edited_meanwhile(test):
+            # Loaded before the edit, stored after the invalidation.
+            data = serializer(test).data
+            Question.objects.filter(pk=self.questions[0].pk).update(question_text='Corrected question')
+            papers.invalidate([self.test.pk])
+            return mock.Mock(data=data)
+
+        with mock.patch.object(papers, 'TestPaperSerializer', edited_meanwhile):
+            papers.build(self.test.pk)
+        response = self.client.get(self.url)
+        self.assertEqual(json.loads(response.content)['questions'][0]['question_text'], 'Corrected question')
+
+    def test_paper_sends_no_last_modified(self):
+        self.client.force_authenticate(self.student)
+        response = self.client.get(self.url)
+        self.assertIn('ETag', response)
+        self.assertNotIn('Last-Modified', response)
+
+    def test_staff_still_see_answers(self):
+        admin = User.objects.create_user(username='admin1', password='testpass123', role='admin')
+        self.client.force_authenticate(admin)
+        response = self.client.get(self.url)
+        self.assertEqual(response.data['questions'][0]['correct_answer'], 'B')
@@ -0,0 +1,346 @@
+#!/usr/bin/env python3
+"""
+Query Budget Test Suite
+Tests that every API read route, and the write actions that work on collections,
+stays within a fixed number of queries however many rows the dataset holds
+"""
+
+import os
+import sys
+import django
+from datetime import date, time, timedelta
+from unittest import mock
+from decimal import Decimal
+from django.core.cache import cache
+from django.db import connection, transaction
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+# Setup Django
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'padhoplus.settings')
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+django.setup()
+
+from padhoplus import counters
+from padhoplus.urls import router
+from padhoplus.assessments import leaderboards, ranking
+from padhoplus.content import watch_progress
+from padhoplus.payments import urls as payment_urls
+from padhoplus.users.models import User, Faculty, Testimonial, Result
+from padhoplus.batches.models import (
+    Subject, Topic, Batch, BatchFAQ, BatchReview, BatchSubjectFaculty, Enrollment, Schedule, Announcement
+)
+from padhoplus.content.models import Lecture, Note, Resource, WatchHistory, Bookmark
+from padhoplus.assessments.models import Question, Test, TestAttempt, TestResponse, PracticeSession
+from padhoplus.doubts.models import Doubt, DoubtResponse
+from padhoplus.analytics.models import UserProgress, DailyActivity, Streak, Achievement, UserAchievement, Leaderboard
+from padhoplus.payments.models import Payment
+
+# Dataset sizes the budgets are checked at; every collection a route reads grows between them.
+SIZES = (3, 6)
+
+# Most queries any role may run for a GET route, by URL name. Leaderboard routes start from
+# an empty leaderboard backend and include the query that loads the test's set.
+BUDGETS = {
+    'announcement-detail': 2, 'announcement-list': 3, 'auth-check': 0, 'batch-cache-stats': 0,
+    'batch-demo-lectures': 3, 'batch-detail': 8, 'batch-featured': 2, 'batch-list': 3, 'bookmark-detail': 1,
+    'bookmark-list': 2, 'dashboard-admin': 7, 'dashboard-parent': 0, 'dashboard-student-dashboard': 4,
+    'dashboard-teacher': 0, 'doubt-assigned-to-me': 1, 'doubt-detail': 2, 'doubt-list': 2, 'doubt-my-doubts': 1,
+    'doubt-pending': 1, 'doubt-response-detail': 1, 'doubt-response-list': 2, 'enrollment-detail': 1,
+    'enrollment-list': 2, 'enrollment-my-batches': 1, 'leaderboard-detail': 1, 'leaderboard-list': 1,
+    'lecture-demo': 1, 'lecture-detail': 4, 'lecture-list': 3, 'note-detail': 2, 'note-free-resources': 2,
+    'note-list': 4, 'payments:available_gateways': 0, 'payments:check_status': 1, 'payments:payment_history': 1,
+    'practice-session-detail': 2, 'practice-session-list': 3, 'progress-detail': 1, 'progress-list': 2,
+    'progress-strong-topics': 1, 'progress-summary': 1, 'progress-weak-topics': 1, 'question-detail': 1,
+    'question-list': 2, 'question-random': 2, 'resource-detail': 1, 'resource-list': 2, 'schedule-detail': 1,
+    'schedule-list': 2, 'subject-detail': 1, 'subject-list': 2, 'subject-topics': 2,
+    'test-analytics-performance': 3, 'test-analytics-subject-wise': 1, 'test-attempt-analysis': 4,
+    'test-attempt-detail': 3, 'test-attempt-list': 4, 'test-detail': 5, 'test-leaderboard': 3, 'test-list': 3,
+    'test-my-rank': 4, 'test-upcoming': 2, 'topic-detail': 2, 'topic-list': 5, 'user-detail': 1, 'user-faculty': 3,
+    'user-list': 2, 'user-me': 0, 'user-results': 2, 'user-testimonials': 2, 'watch-history-completed': 1,
+    'watch-history-continue-watching': 1, 'watch-history-detail': 1, 'watch-history-list': 2,
+}
+
+# Most queries a write action that works on a collection may run, by action. Every
+# save_responses claims the attempt row, with or without a sequence; submit loads the
+# test's leaderboard set before recording the attempt.
+WRITE_BUDGETS = {'save_responses': 6, 'submit': 16, 'practice_start': 4, 'heartbeats': 2}
+
+# Roles each GET route is requested as; routes not listed use the student and the admin.
+ROLES = {
+    'batch-cache-stats': ['admin'],
+    'bookmark-detail': ['student'],
+    'dashboard-admin': ['admin'],
+    'dashboard-parent': ['parent'],
+    'dashboard-teacher': ['teacher'],
+    'doubt-assigned-to-me': ['teacher'],
+    'doubt-pending': ['teacher', 'admin'],
+    'payments:check_status': ['student'],
+    'practice-session-detail': ['student'],
+    'test-my-rank': ['student'],
+    'watch-history-detail': ['student'],
+}
+
+# Routes that fail before this suite gets to count them: the teacher dashboard
+# filters on Batch.faculty, which the model does not have.
+KNOWN_ERRORS = {'dashboard-teacher'}
+
+
+def get_routes():
+    """URL names of GET routes on the API router and in payments/urls.py, with whether they take an object."""
+    routes = {}
+    for prefix, viewset, basename in router.registry:
+        if hasattr(viewset, 'list'):
+            routes[f'{basename}-list'] = (viewset, False)
+        if hasattr(viewset, 'retrieve'):
+            routes[f'{basename}-detail'] = (viewset, True)
+        for extra in viewset.get_extra_actions():
+            if 'get' in extra.mapping:
+                routes[f'{basename}-{extra.url_name}'] = (viewset, extra.detail)
+    for pattern in payment_urls.urlpatterns:
+        view = getattr(pattern.callback, 'cls', None)
+        if view is not None and 'get' in view.http_method_names:
+            routes[f'{payment_urls.app_name}:{pattern.name}'] = (None, bool(pattern.pattern.converters))
+    return routes
+
+
+class Dataset:
+    """A student, teacher, admin and parent, and everything they can see, grown ``count`` rows at a time."""
+
+    def __init__(self):
+        self.n = self.size = 0
+        self.student = User.objects.create_user(username='student', email='student@example.com', password='pass12345')
+        self.teacher = User.objects.create_user(username='teacher', email='teacher@example.com', role='teacher')
+        self.admin = User.objects.create_user(username='admin', email='admin@example.com', role='admin')
+        self.parent = User.objects.create_user(username='parent', email='parent@example.com', role='parent')
+        self.faculty = Faculty.objects.create(user=self.teacher, designation='Physics faculty', is_featured=True)
+        Streak.objects.create(user=self.student, current_streak=3)
+
+        self.subjects = [
+            Subject.objects.create(name=name, slug=name.lower()) for name in ('Physics', 'Chemistry', 'Mathematics')
+        ]
+        self.topics = [
+            Topic.objects.create(subject=subject, name=f'{subject.name} basics', slug='basics')
+            for subject in self.subjects
+        ]
+        self.faculty.subjects.add(*self.subjects)
+        self.batch = self.make_batch()
+        self.test = Test.objects.create(
+            batch=self.batch, subject=self.subjects[0], title='Mock test', status='live', test_type='mock'
+        )
+        self.open_test = Test.objects.create(batch=self.batch, subject=self.subjects[0], title='Open test', status='live')
+        self.practice = PracticeSession.objects.create(student=self.student, subject=self.subjects[0])
+        self.open_attempt = TestAttempt.objects.create(test=self.open_test, student=self.student)
+        self.grow(1)
+        self.lecture = Lecture.objects.filter(batch=self.batch).earliest('pk')
+        self.note = Note.objects.filter(batch=self.batch).earliest('pk')
+        self.doubt = Doubt.objects.filter(student=self.student).earliest('pk')
+        self.attempt = TestAttempt.objects.get(test=self.test, student=self.student)
+
+    def make_batch(self):
+        self.n += 1
+        batch = Batch.objects.create(
+            name=f'Batch {self.n}', slug=f'batch-{self.n}', description='Complete preparation batch',
+            target_exam='jee_main', target_class='class_12', start_date=date(2026, 4, 1), is_featured=True,
+            status='ongoing', price=Decimal('4999')
+        )
+        Enrollment.objects.create(student=self.student, batch=batch, status='active')
+        return batch
+
+    def user(self, role='student'):
+        self.n += 1
+        return User.objects.create(username=f'user{self.n}', email=f'user{self.n}@example.com', role=role)
+
+    def grow(self, count):
+        for _ in range(count):
+            self.grow_once()
+        self.size += count
+
+    def grow_once(self):
+        subject, topic = self.subjects[self.n % 3], self.topics[self.n % 3]
+        batch, other, teacher = self.make_batch(), self.user(), self.user('teacher')
+        Enrollment.objects.create(student=other, batch=self.batch, status='active')
+        faculty = Faculty.objects.create(user=teacher, designation='Faculty', is_featured=True)
+        faculty.subjects.add(subject)
+        for target in (self.batch, batch):
+            BatchSubjectFaculty.objects.create(batch=target, subject=subject, faculty=faculty)
+            Schedule.objects.create(batch=target, subject=subject, day='mon', start_time=time(9), end_time=time(10))
+            BatchFAQ.objects.create(batch=target, question='Is it live?', answer='Yes')
+            Announcement.objects.create(batch=target, author=self.teacher, title='Class moved', content='To 10am')
+        BatchReview.objects.create(batch=self.batch, student=other, rating=5)
+
+        lectures = [
+            Lecture.objects.create(
+                batch=target, subject=subject, topic=topic, teacher=self.teacher, title=f'Lecture {self.n}',
+                video_url='https://videos.padhoplus.com/lecture.mp4', is_demo=demo, is_free=demo
+            )
+            for target in (self.batch, batch) for demo in (True, False)
+        ]
+        for lecture in lectures:
+            Resource.objects.create(lecture=lecture, title='Slides', file='resources/slides.pdf')
+            WatchHistory.objects.create(user=self.student, lecture=lecture, is_completed=lecture.is_demo)
+            Bookmark.objects.create(user=self.student, lecture=lecture)
+        for free in (True, False):
+            Note.objects.create(
+                batch=self.batch, subject=subject, topic=topic, title=f'Note {self.n}', file='notes/note.pdf',
+                file_type='pyq' if free else 'notes', is_free=free
+            )
+
+        questions = [
+            Question.objects.create(
+                subject=subject, topic=topic, question_text=f'Q{self.n}.{i}', correct_answer='A',
+                difficulty=['easy', 'medium', 'hard'][i], option_a='1', option_b='2'
+            )
+            for i in range(3)
+        ]
+        test = Test.objects.create(batch=batch, subject=subject, title=f'Test {self.n}', status='completed')
+        for target in (self.test, self.open_test, test):
+            target.questions.add(*questions)
+        self.practice.questions.add(*questions)
+        TestResponse.objects.bulk_create([
+            TestResponse(attempt=self.open_attempt, question=question, selected_answer='B') for question in questions
+        ])
+        for student, target in ((self.student, self.test), (self.student, test), (other, self.test), (other, test)):
+            self.submit(TestAttempt.objects.get_or_create(test=target, student=student)[0], questions)
+
+        doubt = Doubt.objects.create(
+            student=self.student, subject=subject, topic=topic, title=f'Doubt {self.n}', description='Why?',
+            assigned_to=self.teacher
+        )
+        first = Doubt.objects.filter(student=self.student).earliest('pk')
+        for target in {first, doubt}:
+            DoubtResponse.objects.create(doubt=target, responder=self.teacher, content='Because.')
+
+        UserProgress.objects.create(user=self.student, batch=batch, subject=subject, tests_taken=1)
+        DailyActivity.objects.create(user=self.student, date=date(2026, 1, 1) + timedelta(days=self.n))
+        achievement = Achievement.objects.create(name=f'Achievement {self.n}', description='Earned')
+        UserAchievement.objects.create(user=self.student, achievement=achievement)
+        Leaderboard.objects.create(user=other, leaderboard_type='overall', rank=self.n, score=10)
+        Payment.objects.create(student=self.student, amount=Decimal('4999'), transaction_id=f'TXN{self.n}')
+        Testimonial.objects.create(name=f'Topper {self.n}', quote='Great batch', is_featured=True)
+        Result.objects.create(student_name=f'Topper {self.n}', exam='JEE', year=2026, rank=str(self.n), is_featured=True)
+
+    def submit(self, attempt, questions):
+        TestResponse.objects.bulk_create([
+            TestResponse(attempt=attempt, question=question, selected_answer='A') for question in questions
+        ], ignore_conflicts=True)
+        attempt.status = 'submitted'
+        attempt.submitted_at = timezone.now()
+        attempt.score = attempt.responses.count() * 4
+        attempt.save()
+
+    def targets(self):
+        return {
+            'user': self.student.pk, 'batch': self.batch.slug, 'subject': self.subjects[0].slug,
+            'topic': self.topics[0].pk, 'enrollment': Enrollment.objects.get(student=self.student, batch=self.batch).pk,
+            'schedule': Schedule.objects.filter(batch=self.batch).earliest('pk').pk,
+            'announcement': Announcement.objects.filter(batch=self.batch).earliest('pk').pk,
+            'lecture': self.lecture.pk, 'note': self.note.pk,
+            'resource': Resource.objects.filter(lecture=self.lecture).get().pk,
+            'watch-history': WatchHistory.objects.filter(user=self.student, lecture=self.lecture).get().pk,
+            'bookmark': Bookmark.objects.filter(user=self.student, lecture=self.lecture).get().pk,
+            'question': self.test.questions.earliest('pk').pk, 'test': self.test.pk,
+            'test-attempt': self.attempt.pk, 'practice-session': self.practice.pk,
+            'doubt': self.doubt.pk, 'doubt-response': self.doubt.responses.earliest('pk').pk,
+            'progress': UserProgress.objects.filter(user=self.student).earliest('pk').pk,
+            'leaderboard': Leaderboard.objects.earliest('pk').pk,
+            'payments': Payment.objects.earliest('pk').transaction_id,
+        }
+
+
+@override_settings(
+    COUNTER_FLUSH_INTERVAL=3600, WATCH_PROGRESS_FLUSH_INTERVAL=3600, RANKING_INTERVAL=3600,
+    REQUEST_METRICS_ENABLED=False,
+)
+class QueryBudgetTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        # Sets loaded by earlier tests would hide the rebuild queries, or
+        # answer for attempts this test's database no longer has.
+        patcher = mock.patch.object(leaderboards, '_backend', leaderboards.MemoryBackend())
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.client = APIClient(raise_request_exception=False)
+        self.data = Dataset()
+
+    def tearDown(self):
+        # Leave nothing for the flush at interpreter exit, when the test database is gone.
+        for buffer in (counters.buffer, ranking.buffer, watch_progress.buffer):
+            buffer.flush()
+
+    def queries(self, role, method, url, data=None):
+        """Queries run by one request, rolled back afterwards and with every cache cold."""
+        cache.clear()
+        leaderboards.backend().clear()
+        self.client.force_authenticate(getattr(self.data, role))
+        with transaction.atomic():
+            with CaptureQueriesContext(connection) as queries:
+                response = getattr(self.client, method)(url, data, format='json')
+            transaction.set_rollback(True)
+        return response, len(queries.captured_queries)
+
+    def measure_reads(self):
+        targets, counts = self.data.targets(), {}
+        for name, (viewset, detail) in get_routes().items():
+            kwargs = {}
+            if detail:
+                basename = name.rsplit(':', 1)[0] if viewset is None else next(
+                    basename for _, registered, basename in router.registry if registered is viewset
+                )
+                lookup = 'transaction_id' if viewset is None else viewset.lookup_field
+                kwargs = {lookup: targets[basename]}
+            url = reverse(name, kwargs=kwargs)
+            for role in ROLES.get(name, ['student', 'admin']):
+                response, counts[name, role] = self.queries(role, 'get', url)
+                if name not in KNOWN_ERRORS:
+                    self.assertLess(response.status_code, 400, f'GET {url} as {role}')
+        return counts
+
+    def measure_writes(self):
+        attempt, questions = self.data.open_attempt, list(self.data.open_test.questions.values_list('pk', flat=True))
+        lectures = Lecture.objects.filter(batch=self.data.batch).values_list('pk', flat=True)
+        requests = {
+            'save_responses': (reverse('test-attempt-save-responses', args=[attempt.pk]), {
+                'responses': [{'question_id': pk, 'selected_answer': 'A'} for pk in questions]
+            }),
+            'submit': (reverse('test-attempt-submit', args=[attempt.pk]), {'time_taken_seconds': 600}),
+            'practice_start': (reverse('practice-session-start'), {
+                'subject_id': self.data.subjects[0].pk, 'count': len(questions)
+            }),
+            'heartbeats': (reverse('watch-history-heartbeats'), {
+                'heartbeats': [{'lecture_id': pk, 'watched_duration': 30, 'last_position': 30} for pk in lectures]
+            }),
+        }
+        counts = {}
+        for name, (url, data) in requests.items():
+            response, counts[name, 'student'] = self.queries('student', 'post', url, data)
+            self.assertLess(response.status_code, 400, f'POST {url}: {response.content[:200]}')
+        return counts
+
+    def assertFlat(self, counts, budgets):
+        small, large = (counts[size] for size in SIZES)
+        for key in small:
+            name, role = key
+            with self.subTest(route=name, role=role):
+                self.assertLessEqual(large[key], small[key], f'{name} grows with the dataset')
+                self.assertLessEqual(large[key], budgets[name], f'{name} is over its budget')
+
+    def test_every_route_has_a_budget(self):
+        self.assertEqual(set(BUDGETS), set(get_routes()))
+
+    def test_read_routes(self):
+        counts = {}
+        for size in SIZES:
+            self.data.grow(size - self.data.size)
+            counts[size] = self.measure_reads()
+        self.assertFlat(counts, BUDGETS)
+
+    def test_write_actions(self):
+        counts = {}
+        for size in SIZES:
+            self.data.grow(size - self.data.size)
+            counts[size] = self.measure_writes()
+        self.assertFlat(counts, WRITE_BUDGETS)
@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+Query Plan Test Suite
+Tests that every registered hot query is planned through its index
+"""
+
+import os
+import sys
+import django
+from datetime import date
+from django.db import connection
+from django.test import TestCase
+
+# Setup Django
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'padhoplus.settings')
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+django.setup()
+
+from padhoplus import query_plans
+from padhoplus.users.models import User
+from padhoplus.batches.models import Subject, Topic, Batch, Enrollment
+from padhoplus.content.models import Lecture, Note, WatchHistory
+from padhoplus.assessments.models import Question, Test, TestAttempt
+from padhoplus.doubts.models import Doubt
+
+
+class QueryPlanTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        students = User.objects.bulk_create([
+            User(username=f'student{i}', email=f'student{i}@example.com') for i in range(200)
+        ])
+        subjects = Subject.objects.bulk_create([Subject(name=f'Subject {i}', slug=f'subject-{i}') for i in range(4)])
+        topics = Topic.objects.bulk_create([
+            Topic(subject=subject, name=f'Topic {i}', slug=f'topic-{i}') for subject in subjects for i in range(5)
+        ])
+        batches = Batch.objects.bulk_create([
+            Batch(
+                name=f'Batch {i}', slug=f'batch-{i}', description='Preparation batch',
+                target_exam='jee_main', target_class='class_12', start_date=date(2026, 4, 1)
+            )
+            for i in range(10)
+        ])
+        statuses = ['active', 'expired', 'cancelled', 'pending']
+        Enrollment.objects.bulk_create([
+            Enrollment(student=student, batch=batches[(i + j) % 10], status=statuses[(i + j) % 4])
+            for i, student in enumerate(students) for j in range(3)
+        ])
+        lectures = Lecture.objects.bulk_create([
+            Lecture(
+                batch=batches[i % 10], subject=subjects[i % 4], title=f'Lecture {i}',
+                video_url='https://videos.padhoplus.com/lecture.mp4', order=i,
+                is_demo=i % 25 == 0, is_free=i % 20 == 0, is_active=i % 7 != 0
+            )
+            for i in range(400)
+        ])
+        Note.objects.bulk_create([
+            Note(
+                batch=batches[i % 10], subject=subjects[i % 4], title=f'Note {i}', file='notes/note.pdf',
+                file_type=['notes', 'pdf', 'pyq', 'dpp'][i % 4], is_free=i % 5 == 0
+            )
+            for i in range(400)
+        ])
+        WatchHistory.objects.bulk_create([
+            WatchHistory(user=student, lecture=lectures[(i * 3 + j) % 400], is_completed=j % 2 == 0)
+            for i, student in enumerate(students) for j in range(4)
+        ])
+        Question.objects.bulk_create([
+            Question(
+                subject=topics[i % 20].subject, topic=topics[i % 20], question_text=f'Q{i}', correct_answer='A',
+                difficulty=['easy', 'medium', 'hard'][i % 3], is_active=i % 9 != 0
+            )
+            for i in range(600)
+        ])
+        tests = Test.objects.bulk_create([Test(batch=batches[i % 10], title=f'Test {i}') for i in range(20)])
+        TestAttempt.objects.bulk_create([
+            TestAttempt(
+                test=test, student=student, status=['submitted', 'started'][i % 2], score=i % 50,
+                time_taken_seconds=i * 7
+            )
+            for test in tests for i, student in enumerate(students[:60])
+        ])
+        Doubt.objects.bulk_create([
+            Doubt(
+                student=students[i % 200], subject=subjects[i % 4], title=f'Doubt {i}', description='Why?',
+                status=['pending', 'in_progress', 'answered', 'closed'][i % 4], is_resolved=i % 4 >= 2,
+                is_public=i % 3 != 0
+            )
+            for i in range(600)
+        ])
+        cls.ids = {
+            'student_id': students[17].pk, 'email': students[17].email, 'batch_id': batches[3].pk,
+            'subject_id': topics[7].subject_id, 'topic_id': topics[7].pk, 'test_id': tests[5].pk,
+        }
+
+    def setUp(self):
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE')
+            if connection.vendor == 'postgresql':
+                # The seeded tables are small enough that a sequential scan would
+                # win; the question here is whether the index can serve the query.
+                cursor.execute('SET LOCAL enable_seqscan = off')
+
+    def test_hot_queries_use_their_indexes(self):
+        self.assertTrue(query_plans.HOT_QUERIES)
+        for name, (index, build) in query_plans.HOT_QUERIES.items():
+            with self.subTest(name):
+                queryset = build(**self.ids)
+                self.assertTrue(
+                    query_plans.uses_index(queryset, index),
+                    f'{name} does not use {index}:\n{queryset.explain()}'
+                )
+                list(queryset)
@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""
+Ranking Test Suite
+Tests deferred, set-based rank and percentile computation
+"""
+
+import os
+import sys
+import time
+import django
+from datetime import date
+from decimal import Decimal
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+# Setup Django
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'padhoplus.settings')
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+django.setup()
+
+from padhoplus.users.models import User
+from padhoplus.batches.models import Subject, Batch
+from padhoplus.assessments import ranking
+from padhoplus.assessments.models import Question, Test, TestAttempt, TestResponse
+
+
+# A long interval keeps the background flusher idle so tests flush explicitly.
+@override_settings(RANKING_INTERVAL=3600)
+class RankingTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        ranking.buffer.flush()
+        self.client = APIClient()
+        batch = Batch.objects.create(
+            name='JEE Batch', slug='jee-batch', description='Complete preparation batch',
+            target_exam='jee_main', target_class='class_12', start_date=date(2026, 4, 1)
+        )
+        physics = Subject.objects.create(name='Physics', slug='physics')
+        self.test = Test.objects.create(batch=batch, subject=physics, title='Mock test')
+        self.question = Question.objects.create(subject=physics, question_text='?', correct_answer='A')
+        self.test.questions.add(self.question)
+
+    def attempt(self, username, score, time_taken):
+        student = User.objects.create_user(username=username, password='testpass123')
+        return TestAttempt.objects.create(
+            test=self.test, student=student, status='submitted', score=score, time_taken_seconds=time_taken
+        )
+
+    def submit(self, username, answer):
+        student = User.objects.create_user(username=username, password='testpass123')
+        attempt = TestAttempt.objects.create(test=self.test, student=student)
+        TestResponse.objects.create(attempt=attempt, question=self.question, selected_answer=answer)
+        self.client.force_authenticate(student)
+        response = self.client.post(f'/api/test-attempts/{attempt.pk}/submit/', {
+            'time_taken_seconds': 600
+        }, format='json')
+        self.assertEqual(response.status_code, 200)
+        return attempt
+
+    def test_rerank_orders_by_score_then_time(self):
+        fast = self.attempt('fast', Decimal('80'), 500)
+        slow = self.attempt('slow', Decimal('80'), 900)
+        tied = self.attempt('tied', Decimal('80'), 900)
+        low = self.attempt('low', Decimal('40'), 100)
+        TestAttempt.objects.create(
+            test=self.test, student=User.objects.create_user(username='busy', password='testpass123')
+        )
+
+        with self.assertNumQueries(1):
+            self.assertEqual(ranking.rerank(self.test.pk), 4)
+        ranks = {
+            pk: (rank, percentile)
+            for pk, rank, percentile in TestAttempt.objects.values_list('pk', 'rank', 'percentile')
+        }
+        self.assertEqual(ranks[fast.pk], (1, Decimal('75.00')))
+        self.assertEqual(ranks[slow.pk], (2, Decimal('50.00')))
+        self.assertEqual(ranks[tied.pk], (2, Decimal('50.00')))
+        self.assertEqual(ranks[low.pk], (4, Decimal('0.00')))
+        self.assertEqual(TestAttempt.objects.filter(rank__isnull=True).count(), 1)
+
+    def test_submissions_are_ranked_once_per_interval(self):
+        for i in range(3):
+            self.attempt(f'earlier{i}', Decimal(i), 600)
+        with CaptureQueriesContext(connection) as queries:
+            self.submit('student1', 'A')
+        self.assertFalse(any('RANK()' in query['sql'] for query in queries))
+        self.assertLessEqual(
+            sum(query['sql'].startswith('UPDATE "test_attempts"') for query in queries), 1
+        )
+        second = self.submit('student2', 'B')
+        self.assertIsNone(TestAttempt.objects.get(pk=second.pk).rank)
+
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(ranking.buffer.flush(), 5)
+        self.assertEqual(sum('RANK()' in query['sql'] for query in queries), 1)
+        self.assertEqual(
+            list(TestAttempt.objects.order_by('rank').values_list('student__username', 'rank')),
+            [('student1', 1), ('earlier2', 2), ('earlier1', 3), ('earlier0', 4), ('student2', 4)]
+        )
+
+    def test_workers_share_one_rerank_per_interval(self):
+        self.attempt('student1', Decimal('80'), 600)
+        other = ranking.RankingBuffer()
+
+        def reranks(buffer):
+            with CaptureQueriesContext(connection) as queries:
+                buffer.flush()
+            return sum('RANK()' in query['sql'] for query in queries)
+
+        ranking.buffer.add(self.test.pk, time.time() - 60)
+        other.add(self.test.pk, time.time() - 60)
+        self.assertEqual(reranks(ranking.buffer), 1)
+        # The other worker's mark predates that re-rank, so it is dropped.
+        self.assertEqual(reranks(other), 0)
+        self.assertEqual(reranks(other), 0)
+
+        # A later mark waits for the lock instead of re-ranking again.
+        other.add(self.test.pk, time.time() + 60)
+        self.assertEqual(reranks(other), 0)
+        cache.delete(ranking.RERANK_LOCK.format(test_id=self.test.pk))
+        self.assertEqual(reranks(other), 1)
+        self.assertEqual(reranks(other), 0)
@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+Question Sampling Test Suite
+Tests cached-pool random sampling for random questions and practice sessions
+"""
+
+import os
+import sys
+import django
+from django.core.cache import cache
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+# Setup Django
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'padhoplus.settings')
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+django.setup()
+
+from padhoplus.users.models import User
+from padhoplus.batches.models import Subject, Topic
+from padhoplus.assessments import sampling
+from padhoplus.assessments.models import PracticeSession, Question
+
+
+class SamplingTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.student = User.objects.create_user(username='student1', password='testpass123')
+        self.client.force_authenticate(self.student)
+        self.physics = Subject.objects.create(name='Physics', slug='physics')
+        self.chemistry = Subject.objects.create(name='Chemistry', slug='chemistry')
+        self.optics = Topic.objects.create(subject=self.physics, name='Optics', slug='optics')
+        Question.objects.bulk_create(
+            [Question(subject=self.physics, topic=self.optics, question_text=f'P{i}', correct_answer='A',
+                      difficulty='easy' if i % 2 else 'hard') for i in range(30)]
+            + [Question(subject=self.chemistry, question_text=f'C{i}', correct_answer='A') for i in range(10)]
+        )
+
+    def test_samples_are_distinct_and_filtered(self):
+        ids = sampling.sample_ids(12, subject__slug='physics', difficulty='easy')
+        self.assertEqual(len(ids), len(set(ids)))
+        self.assertEqual(len(ids), 12)
+        self.assertEqual(
+            set(Question.objects.filter(pk__in=ids).values_list('subject__slug', 'difficulty')),
+            {('physics', 'easy')}
+        )
+        self.assertEqual(len(sampling.sample_ids(50, subject__slug='physics', difficulty='easy')), 15)
+
+    def test_pool_is_cached_until_questions_change(self):
+        response = self.client.get('/api/questions/random/', {'subject': 'chemistry', 'count': 5})
+        self.assertEqual(len(response.data), 5)
+        with self.assertNumQueries(1):
+            response = self.client.get('/api/questions/random/', {'subject': 'chemistry', 'count': 5})
+        self.assertEqual(len(response.data), 5)
+
+        extra = Question.objects.create(subject=self.chemistry, question_text='New', correct_answer='B')
+        self.assertIn(extra.pk, sampling.sample_ids(11, subject__slug='chemistry'))
+        extra.is_active = False
+        extra.save()
+        self.assertNotIn(extra.pk, sampling.sample_ids(11, subject__slug='chemistry'))
+
+    def test_practice_session_keeps_the_sampled_questions(self):
+        response = self.client.post('/api/practice-sessions/start/', {
+            'subject_id': self.physics.pk, 'topic_id': self.optics.pk, 'count': 8
+        }, format='json')
+        self.assertEqual(response.status_code, 201)
+        session = PracticeSession.objects.get(pk=response.data['session']['id'])
+        returned = [question['id'] for question in response.data['questions']]
+        self.assertEqual(session.total_questions, 8)
+        self.assertEqual(set(session.questions.values_list('pk', flat=True)), set(returned))
+
+        response = self.client.post('/api/practice-sessions/start/', {
+            'subject_id': self.physics.pk, 'count': 22, 'exclude_attempted': True
+        }, format='json')
+        again = [question['id'] for question in response.data['questions']]
+        self.assertEqual(len(again), 22)
+        self.assertTrue(set(again).isdisjoint(returned))
+
+        # Only 30 questions exist, so the fresh 22 are topped up with repeats.
+        topped_up = sampling.sample_ids(30, exclude_attempted_by=self.student, subject_id=self.physics.pk)
+        self.assertEqual(len(set(topped_up)), 30)
@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""
+Search Test Suite
+Tests the search query params on batches, doubts and notes
+"""
+
+import os
+import sys
+import django
+from datetime import date
+from django.core.cache import cache
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+# Setup Django
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'padhoplus.settings')
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+django.setup()
+
+from padhoplus.users.models import User
+from padhoplus.batches.models import Subject, Batch
+from padhoplus.content.models import Note
+from padhoplus.doubts.models import Doubt
+
+
+class SearchTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.subject = Subject.objects.create(name='Physics', slug='physics')
+        self.student = User.objects.create_user(username='student1', password='testpass123')
+
+    def results(self, url):
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        return data['results'] if isinstance(data, dict) else data
+
+    def test_doubt_search(self):
+        Doubt.objects.create(
+            student=self.student, subject=self.subject,
+            title='Projectile motion range', description='Why is range maximum at 45 degrees?'
+        )
+        Doubt.objects.create(
+            student=self.student, subject=self.subject,
+            title='Capacitor energy', description='Energy stored between the plates'
+        )
+        titles = [d['title'] for d in self.results('/api/doubts/?search=projectile')]
+        self.assertEqual(titles, ['Projectile motion range'])
+
+    def test_batch_search(self):
+        for slug, name in (('jee-physics', 'JEE Physics Crash Course'), ('neet-bio', 'NEET Biology')):
+            Batch.objects.create(
+                name=name, slug=slug, description='Complete preparation batch',
+                target_exam='jee_main', target_class='class_12', start_date=date(2026, 4, 1)
+            )
+        names = [b['name'] for b in self.results('/api/batches/?search=physics')]
+        self.assertEqual(names, ['JEE Physics Crash Course'])
+
+    def test_note_search(self):
+        Note.objects.create(subject=self.subject, title='Kinematics formula sheet', is_free=True, file='notes/a.pdf')
+        Note.objects.create(subject=self.subject, title='Optics notes', is_free=True, file='notes/b.pdf')
+        titles = [n['title'] for n in self.results('/api/notes/?search=kinematics')]
+        self.assertEqual(titles, ['Kinematics formula sheet'])
+
+    def test_counter_saves_skip_vector_refresh(self):
+        doubt = Doubt.objects.create(student=self.student, subject=self.subject, title='Entropy', description='Why?')
+        doubt.views_count = 5
+        with self.assertNumQueries(1):
+            doubt.save(update_fields=['views_count'])
@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+User Progress Test Suite
+Tests incremental UserProgress updates and the set-based rebuild
+"""
+
+import os
+import sys
+import django
+from datetime import date, time
+from decimal import Decimal
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+
+# Setup Django
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'padhoplus.settings')
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+django.setup()
+
+from padhoplus.users.models import User
+from padhoplus.batches.models import Subject, Topic, Batch, Enrollment, Schedule
+from padhoplus.content.models import Lecture
+from padhoplus.assessments.models import Question, Test, TestAttempt, TestResponse
+from padhoplus.analytics.models import DailyActivity, UserProgress
+from padhoplus.analytics.progress import rebuild_progress
+
+FIELDS = (
+    'user_id', 'batch_id', 'subject_id', 'topic_id', 'lectures_watched', 'time_spent_minutes',
+    'questions_attempted', 'questions_correct', 'tests_taken', 'average_test_score'
+)
+
+
+@override_settings(WATCH_PROGRESS_FLUSH_INTERVAL=0, RANKING_INTERVAL=0)
+class UserProgressTest(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.student = User.objects.create_user(username='student1', password='testpass123')
+        self.client.force_authenticate(self.student)
+        self.batch = Batch.objects.create(
+            name='JEE Batch', slug='jee-batch', description='Complete preparation batch',
+            target_exam='jee_main', target_class='class_12', start_date=date(2026, 4, 1)
+        )
+        Enrollment.objects.create(student=self.student, batch=self.batch, status='active')
+        self.physics = Subject.objects.create(name='Physics', slug='physics')
+        self.kinematics = Topic.objects.create(subject=self.physics, name='Kinematics', slug='kinematics')
+        Schedule.objects.create(
+            batch=self.batch, subject=self.physics, day='mon', start_time=time(9), end_time=time(10)
+        )
+
+    def snapshot(self):
+        return sorted(
+            (tuple(str(v) if isinstance(v, Decimal) else v for v in row)
+             for row in UserProgress.objects.values_list(*FIELDS)),
+            key=lambda row: row[3] or 0
+        )
+
+    def take_test(self, answers):
+        test = Test.objects.create(batch=self.batch, subject=self.physics, title='Kinematics test', total_marks=8)
+        attempt = TestAttempt.objects.create(test=test, student=self.student)
+        for answer in answers:
+            question = Question.objects.create(
+                subject=self.physics, topic=self.kinematics, question_text='?', correct_answer='A'
+            )
+            test.questions.add(question)
+            TestResponse.objects.create(attempt=attempt, question=question, selected_answer=answer)
+        response = self.client.post(f'/api/test-attempts/{attempt.pk}/submit/', {}, format='json')
+        self.assertEqual(response.status_code, 200)
+
+    def test_events_update_progress_incrementally(self):
+        lecture = Lecture.objects.create(
+            batch=self.batch, subject=self.physics, topic=self.kinematics, title='Projectile motion',
+            video_url='https://videos.padhoplus.com/lecture.mp4'
+        )
+        self.client.post(f'/api/lectures/{lecture.pk}/update_progress/', {
+            'watched_duration': 610, 'is_completed': True
+        }, format='json')
+        self.take_test(['A', 'B'])
+        self.take_test(['A', 'A'])
+
+        session = self.client.post('/api/practice-sessions/start/', {
+            'subject_id': self.physics.pk, 'topic_id': self.kinematics.pk
+        }, format='json').json()['session']
+        for _ in range(2):
+            self.client.post(f'/api/practice-sessions/{session["id"]}/complete/', {
+                'correct_count': 3, 'incorrect_count': 1
+            }, format='json')
+
+        topic_row = UserProgress.objects.get(topic=self.kinematics)
+        self.assertEqual(topic_row.lectures_watched, 1)
+        self.assertEqual(topic_row.time_spent_minutes, 10)
+        self.assertEqual(topic_row.questions_attempted, 8)
+        self.assertEqual(topic_row.questions_correct, 6)
+        subject_row = UserProgress.objects.get(topic__isnull=True)
+        self.assertEqual(subject_row.tests_taken, 2)
+        # (3 / 8 + 8 / 8) / 2 of total_marks
+        self.assertEqual(subject_row.average_test_score, Decimal('68.75'))
+
+        activity = DailyActivity.objects.get(user=self.student)
+        self.assertEqual((activity.tests_taken, activity.questions_practiced), (2, 4))
+
+        incremental = self.snapshot()
+        self.assertEqual(rebuild_progress(), 2)
+        self.assertEqual(self.snapshot(), incremental)
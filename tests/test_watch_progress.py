@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+Watch Progress Test Suite
+Tests heartbeat ingestion into WatchHistory, DailyActivity and UserProgress
+"""
+
+import os
+import sys
+import django
+from datetime import date
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+# Setup Django
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'padhoplus.settings')
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+django.setup()
+
+from padhoplus.users.models import User
+from padhoplus.batches.models import Subject, Topic, Batch, Enrollment
+from padhoplus.content.models import Lecture, WatchHistory
+from padhoplus.content import watch_progress
+from padhoplus.analytics.models import DailyActivity, UserProgress
+
+
+@override_settings(WATCH_PROGRESS_FLUSH_INTERVAL=3600)
+class WatchProgressTest(TestCase):
+    def setUp(self):
+        watch_progress.buffer.flush()
+        self.client = APIClient()
+        self.student = User.objects.create_user(username='student1', password='testpass123')
+        self.client.force_authenticate(self.student)
+
+        self.batch = Batch.objects.create(
+            name='JEE Batch', slug='jee-batch', description='Complete preparation batch',
+            target_exam='jee_main', target_class='class_12', start_date=date(2026, 4, 1)
+        )
+        other_batch = Batch.objects.create(
+            name='NEET Batch', slug='neet-batch', description='Complete preparation batch',
+            target_exam='neet', target_class='class_12', start_date=date(2026, 4, 1)
+        )
+        Enrollment.objects.create(student=self.student, batch=self.batch, status='active')
+        self.subject = Subject.objects.create(name='Physics', slug='physics')
+        self.topic = Topic.objects.create(subject=self.subject, name='Kinematics', slug='kinematics')
+        self.lecture = self.make_lecture(self.batch, 'Projectile motion', topic=self.topic)
+        self.subject_lecture = self.make_lecture(self.batch, 'Physics overview')
+        self.locked = self.make_lecture(other_batch, 'Locked lecture')
+
+    def make_lecture(self, batch, title, **kwargs):
+        return Lecture.objects.create(
+            batch=batch, subject=self.subject, title=title,
+            video_url='https://videos.padhoplus.com/lecture.mp4', **kwargs
+        )
+
+    def progress(self, lecture):
+        row = UserProgress.objects.get(
+            user=self.student, batch=self.batch, subject=self.subject, topic=lecture.topic
+        )
+        return row.time_spent_minutes, row.lectures_watched
+
+    def test_update_progress_writes_through(self):
+        url = f'/api/lectures/{self.lecture.pk}/update_progress/'
+        response = self.client.post(url, {'watched_duration': 130, 'last_position': 130}, format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['watched_duration'], 130)
+
+        response = self.client.post(url, {'watched_duration': 100, 'last_position': 90}, format='json')
+        self.assertEqual(response.json()['watched_duration'], 130)
+        self.assertEqual(response.json()['last_position'], 90)
+
+        for _ in range(2):
+            response = self.client.post(url, {'watched_duration': 200, 'is_completed': True}, format='json')
+        self.assertTrue(response.json()['is_completed'])
+        self.assertEqual(self.progress(self.lecture), (3, 1))
+        activity = DailyActivity.objects.get(user=self.student)
+        self.assertEqual((activity.time_spent_minutes, activity.lectures_watched), (3, 1))
+
+        response = self.client.post(url, {'watched_duration': -5}, format='json')
+        self.assertEqual(response.status_code, 400)
+
+    def test_heartbeats_are_coalesced_and_upserted(self):
+        beats = [
+            {'lecture_id': self.lecture.pk, 'watched_duration': 60, 'last_position': 60},
+            {'lecture_id': self.lecture.pk, 'watched_duration': 50, 'last_position': 40},
+            {'lecture_id': self.subject_lecture.pk, 'watched_duration': 125, 'last_position': 125},
+            {'lecture_id': self.locked.pk, 'watched_duration': 10},
+        ]
+        response = self.client.post('/api/watch-history/heartbeats/', {'heartbeats': beats}, format='json')
+        self.assertEqual(response.status_code, 202)
+        self.assertEqual(response.json(), {'accepted': 2, 'rejected': [self.locked.pk]})
+        self.assertFalse(WatchHistory.objects.exists())
+
+        with CaptureQueriesContext(connection) as ctx:
+            self.assertEqual(watch_progress.buffer.flush(), 2)
+        inserts = [q['sql'] for q in ctx.captured_queries if q['sql'].startswith('INSERT INTO "watch_history"')]
+        self.assertEqual(len(inserts), 1)
+
+        history = WatchHistory.objects.get(lecture=self.lecture)
+        self.assertEqual((history.watched_duration, history.last_position), (60, 40))
+        self.assertEqual(self.progress(self.lecture), (1, 0))
+        self.assertEqual(self.progress(self.subject_lecture), (2, 0))
+
+        self.client.post('/api/watch-history/heartbeats/', {'heartbeats': [
+            {'lecture_id': self.subject_lecture.pk, 'watched_duration': 185, 'is_completed': True},
+        ]}, format='json')
+        watch_progress.buffer.flush()
+        self.assertEqual(self.progress(self.subject_lecture), (3, 1))
+        self.assertEqual(UserProgress.objects.filter(topic__isnull=True).count(), 1)
+        self.assertEqual(DailyActivity.objects.get(user=self.student).time_spent_minutes, 4)